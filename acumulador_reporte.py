@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+ACUMULADOR DE REPORTE EN LÍNEA - SCRAPER MERCADOLIBRE
+=====================================================
+
+Estadísticas del reporte híbrido calculadas incrementalmente: cada resultado
+se suma una sola vez al llegar (conteos, ejemplos, totales por categoría JSON
+y por andes_table_raw). snapshot() arma las secciones de 'estadisticas' en
+O(campos + categorías) en cualquier momento, sin recorrer los resultados.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+
+CAMPOS_UNIVERSALES = ['recamaras', 'banos', 'construccion', 'terreno', 'estacionamiento',
+                      'precio', 'moneda', 'direccion', 'tipo_propiedad', 'tipo_operacion']
+
+METADATOS_UNIVERSALES = ['ml_id', 'titulo', 'descripcion', 'estado', 'ciudad']
+
+# Claves de primer nivel que nunca son categorías JSON
+CAMPOS_EXCLUIDOS = {'ml_id', 'titulo', 'descripcion', 'estado', 'ciudad', 'pais', 'direccion',
+                    'precio', 'moneda', 'tipo_propiedad', 'tipo_operacion', 'recamaras', 'banos',
+                    'construccion', 'terreno', 'estacionamiento', 'andes_table_raw', 'tiempo_total',
+                    'url', 'property_number', 'status', 'timestamp', 'processing_time_seconds', 'error',
+                    'user_agent_usado', 'proxy_usado', 'latitud', 'longitud'}
+
+MAX_EJEMPLOS = 3
+
+
+class ReportAccumulator:
+    """
+    Acumulador de una pasada para generar_reporte_hibrido.
+
+    Examples:
+        >>> acumulador = ReportAccumulator()
+        >>> acumulador.agregar({'status': 'exitoso', 'precio': 2550000.0, 'servicios': {'agua': 'Sí'}})
+        >>> acumulador.agregar({'status': 'error'})
+        >>> estadisticas = acumulador.snapshot()
+        >>> estadisticas['generales']['tasa_exito'], estadisticas['campos_universales_estructurados']['precio']['extraidos']
+        (50.0, 1)
+        >>> estadisticas['categorias_json']['servicios']['total_campos']
+        1
+    """
+
+    def __init__(self, campos_universales: Optional[List[str]] = None,
+                 metadatos_universales: Optional[List[str]] = None):
+        """
+        Args:
+            campos_universales (Optional[List[str]]): Campos estructurados a contar
+            metadatos_universales (Optional[List[str]]): Metadatos a contar
+        """
+        self.campos_universales = campos_universales or CAMPOS_UNIVERSALES
+        self.metadatos_universales = metadatos_universales or METADATOS_UNIVERSALES
+        campos = self.campos_universales + self.metadatos_universales
+
+        self.total = 0
+        self.con_error = 0
+        self.extraidos: Dict[str, int] = {campo: 0 for campo in campos}
+        self.ejemplos: Dict[str, list] = {campo: [] for campo in campos}
+        # categoría → {'propiedades', 'campos', 'ejemplo'}
+        self.categorias: Dict[str, Dict] = {}
+        self.andes_propiedades = 0
+        self.andes_categorias = 0
+        self.andes_campos = 0
+
+    @classmethod
+    def desde_resultados(cls, resultados: Iterable[Dict]) -> 'ReportAccumulator':
+        """Acumulador poblado con una sola pasada sobre `resultados`."""
+        acumulador = cls()
+        for resultado in resultados:
+            acumulador.agregar(resultado)
+        return acumulador
+
+    def agregar(self, resultado: Dict) -> None:
+        """
+        Suma un resultado a todas las estadísticas.
+
+        Args:
+            resultado (Dict): Resultado definitivo de una propiedad
+        """
+        self.total += 1
+        if resultado.get('status') == 'error':
+            self.con_error += 1
+
+        for campo, ejemplos in self.ejemplos.items():
+            valor = resultado.get(campo)
+            if valor is not None:
+                self.extraidos[campo] += 1
+                if len(ejemplos) < MAX_EJEMPLOS:
+                    ejemplos.append(valor)
+
+        for clave, valor in resultado.items():
+            if clave not in CAMPOS_EXCLUIDOS and isinstance(valor, dict) and valor:
+                categoria = self.categorias.get(clave)
+                if categoria is None:
+                    categoria = self.categorias[clave] = {
+                        'propiedades': 0, 'campos': 0, 'ejemplo': list(valor.keys())[:5]
+                    }
+                categoria['propiedades'] += 1
+                categoria['campos'] += len(valor)
+
+        andes_raw = resultado.get('andes_table_raw')
+        if andes_raw and isinstance(andes_raw, dict):
+            metadata = andes_raw.get('metadata', {})
+            self.andes_propiedades += 1
+            self.andes_categorias += metadata.get('total_categorias', 0)
+            self.andes_campos += metadata.get('total_campos', 0)
+
+    def _porcentaje(self, parte: int) -> float:
+        return (parte / self.total * 100) if self.total else 0
+
+    def _presencia(self, campos: List[str]) -> Dict:
+        return {
+            campo: {
+                'extraidos': self.extraidos[campo],
+                'total': self.total,
+                'porcentaje': self._porcentaje(self.extraidos[campo]),
+                'ejemplos': list(self.ejemplos[campo])
+            }
+            for campo in campos
+        }
+
+    def snapshot(self, timestamp_reporte: Optional[str] = None, archivo_generado: Optional[str] = None) -> Dict:
+        """
+        Secciones de estadísticas del reporte híbrido en el estado actual.
+
+        Args:
+            timestamp_reporte (Optional[str]): Marca para 'generales'
+            archivo_generado (Optional[str]): Archivo del reporte para 'generales'
+
+        Returns:
+            Dict: generales, campos_universales_estructurados, metadatos_universales,
+                  categorias_json y andes_table_raw (solo si hay datos)
+        """
+        exitosas = self.total - self.con_error
+        estadisticas = {
+            'generales': {
+                'total_propiedades_procesadas': self.total,
+                'propiedades_exitosas': exitosas,
+                'propiedades_con_error': self.con_error,
+                'tasa_exito': self._porcentaje(exitosas),
+                'timestamp_reporte': timestamp_reporte,
+                'archivo_generado': archivo_generado
+            },
+            'campos_universales_estructurados': self._presencia(self.campos_universales),
+            'metadatos_universales': self._presencia(self.metadatos_universales),
+            'categorias_json': {
+                nombre: {
+                    'propiedades_con_datos': categoria['propiedades'],
+                    'total_propiedades': self.total,
+                    'porcentaje_propiedades': self._porcentaje(categoria['propiedades']),
+                    'total_campos': categoria['campos'],
+                    'promedio_campos_por_propiedad': categoria['campos'] / categoria['propiedades'],
+                    'ejemplo_campos': list(categoria['ejemplo'])
+                }
+                for nombre, categoria in self.categorias.items()
+            }
+        }
+
+        # Solo agregar andes_table_raw si hay datos
+        if self.andes_propiedades:
+            estadisticas['andes_table_raw'] = {
+                'propiedades_con_datos': self.andes_propiedades,
+                'total_propiedades': self.total,
+                'porcentaje_propiedades': self._porcentaje(self.andes_propiedades),
+                'total_categorias': self.andes_categorias,
+                'total_campos': self.andes_campos,
+                'promedio_categorias_por_propiedad': self.andes_categorias / self.andes_propiedades,
+                'promedio_campos_por_propiedad': self.andes_campos / self.andes_propiedades
+            }
+
+        return estadisticas
+
+    def resumen_progreso(self, campos: Iterable[str] = ('precio', 'direccion', 'recamaras', 'ml_id')) -> Dict[str, float]:
+        """
+        Cobertura (%) de algunos campos para el display de progreso.
+
+        Examples:
+            >>> acumulador = ReportAccumulator()
+            >>> acumulador.agregar({'precio': 1.0})
+            >>> acumulador.resumen_progreso(['precio', 'direccion'])
+            {'precio': 100.0, 'direccion': 0.0}
+        """
+        return {campo: round(self._porcentaje(self.extraidos.get(campo, 0)), 1) for campo in campos}
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+AGREGADOS DE MERCADO INCREMENTALES - SCRAPER MERCADOLIBRE
+=========================================================
+
+Mantiene tablas de agregados materializados que reemplazan el recálculo de
+la vista estadisticas_por_ciudad sobre toda la tabla `propiedades`. Igual que
+la vista original, solo cuentan las propiedades activas (is_active = 1):
+- agregados_mercado: por estado / ciudad / tipo_propiedad / tipo_operacion
+- agregados_mercado_diario: lo mismo por fecha de alta de la propiedad
+
+RepositorioPropiedades aplica, dentro de la transacción de cada upsert, la
+contribución restada de la fila anterior y sumada de la nueva (conteos y
+sumas). Una fila inactiva no aporta: al reactivarse se suma y al desactivarse
+(RepositorioPropiedades.desactivar) se resta. MIN/MAX de precio solo se
+recalculan con una consulta cuando la fila que salió del grupo tenía el valor
+extremo.
+"""
+
+import sqlite3
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+
+DIMENSIONES = ('estado', 'ciudad', 'tipo_propiedad', 'tipo_operacion')
+
+# tabla → columnas de la clave (fecha = date(created_at) de la propiedad)
+TABLAS_AGREGADOS = {
+    'agregados_mercado': DIMENSIONES,
+    'agregados_mercado_diario': ('fecha',) + DIMENSIONES,
+}
+
+METRICAS_ADITIVAS = ('total', 'con_precio', 'suma_precio', 'suma_superficie_total',
+                     'con_precio_m2', 'suma_precio_m2')
+
+
+def fecha_alta_actual() -> str:
+    """Fecha UTC de hoy, igual que date(CURRENT_TIMESTAMP) en SQLite."""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+
+def contribucion(fila: Dict) -> Dict[str, float]:
+    """
+    Métricas aditivas que aporta una fila de `propiedades`.
+
+    Reason: precio 0 es el default de "sin precio" y no entra en promedios ni
+    extremos; precio por m² requiere superficie construida.
+
+    Examples:
+        >>> contribucion({'precio': 3000000.0, 'superficie_total': 200.0, 'superficie_construida': 150.0})
+        {'total': 1, 'con_precio': 1, 'suma_precio': 3000000.0, 'suma_superficie_total': 200.0, 'con_precio_m2': 1, 'suma_precio_m2': 20000.0}
+    """
+    precio = fila.get('precio') or 0
+    construida = fila.get('superficie_construida') or 0
+    con_precio = precio > 0
+    con_m2 = con_precio and construida > 0
+    return {
+        'total': 1,
+        'con_precio': int(con_precio),
+        'suma_precio': float(precio) if con_precio else 0.0,
+        'suma_superficie_total': float(fila.get('superficie_total') or 0),
+        'con_precio_m2': int(con_m2),
+        'suma_precio_m2': precio / construida if con_m2 else 0.0,
+    }
+
+
+def _sql_aplicar(tabla: str, claves: Tuple[str, ...]) -> str:
+    columnas = claves + METRICAS_ADITIVAS + ('min_precio', 'max_precio')
+    return (
+        f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES ({', '.join('?' for _ in columnas)}) "
+        f"ON CONFLICT({', '.join(claves)}) DO UPDATE SET "
+        + ', '.join(f"{m} = {m} + excluded.{m}" for m in METRICAS_ADITIVAS)
+        + ", min_precio = CASE WHEN excluded.min_precio IS NULL THEN min_precio "
+          "WHEN min_precio IS NULL THEN excluded.min_precio ELSE MIN(min_precio, excluded.min_precio) END"
+        + ", max_precio = CASE WHEN excluded.max_precio IS NULL THEN max_precio "
+          "WHEN max_precio IS NULL THEN excluded.max_precio ELSE MAX(max_precio, excluded.max_precio) END"
+        + ", actualizado_en = CURRENT_TIMESTAMP"
+    )
+
+
+def _filtro_grupo(claves: Tuple[str, ...]) -> str:
+    return ' AND '.join('date(created_at) = ?' if c == 'fecha' else f"{c} = ?" for c in claves)
+
+
+class DeltasAgregados:
+    """
+    Deltas acumulados de un lote de upserts.
+
+    Examples:
+        >>> deltas = DeltasAgregados()
+        >>> fila = {'estado': 'Morelos', 'ciudad': 'Cuernavaca', 'tipo_propiedad': 'casa',
+        ...         'tipo_operacion': 'venta', 'precio': 100.0}
+        >>> deltas.sumar(fila, '2025-01-31')
+        >>> deltas.restar(dict(fila, precio=80.0), '2025-01-31')
+        >>> grupo = deltas.grupos['agregados_mercado'][('Morelos', 'Cuernavaca', 'casa', 'venta')]
+        >>> grupo['total'], grupo['suma_precio'], grupo['precios_retirados']
+        (0, 20.0, [80.0])
+    """
+
+    def __init__(self):
+        # tabla → clave → métricas + precios agregados/retirados
+        self.grupos: Dict[str, Dict[tuple, Dict]] = {tabla: {} for tabla in TABLAS_AGREGADOS}
+
+    def _grupo(self, tabla: str, fila: Dict, fecha_alta: str) -> Dict:
+        clave = tuple(fecha_alta if c == 'fecha' else fila[c] for c in TABLAS_AGREGADOS[tabla])
+        grupo = self.grupos[tabla].get(clave)
+        if grupo is None:
+            grupo = self.grupos[tabla][clave] = dict.fromkeys(METRICAS_ADITIVAS, 0)
+            grupo.update(precios_agregados=[], precios_retirados=[])
+        return grupo
+
+    def _acumular(self, fila: Dict, fecha_alta: str, signo: int) -> None:
+        aporte = contribucion(fila)
+        for tabla in TABLAS_AGREGADOS:
+            grupo = self._grupo(tabla, fila, fecha_alta)
+            for metrica, valor in aporte.items():
+                grupo[metrica] += signo * valor
+            if aporte['con_precio']:
+                destino = 'precios_agregados' if signo > 0 else 'precios_retirados'
+                grupo[destino].append(aporte['suma_precio'])
+
+    def sumar(self, fila: Dict, fecha_alta: str) -> None:
+        """Agrega la contribución de una fila nueva o actualizada."""
+        self._acumular(fila, fecha_alta, 1)
+
+    def restar(self, fila: Dict, fecha_alta: str) -> None:
+        """Retira la contribución de la versión anterior de una fila."""
+        self._acumular(fila, fecha_alta, -1)
+
+    def aplicar(self, conexion: sqlite3.Connection) -> None:
+        """
+        Escribe los deltas (llamar dentro de la transacción, después del upsert).
+
+        Args:
+            conexion (sqlite3.Connection): Conexión con `propiedades` ya actualizada
+        """
+        for tabla, claves in TABLAS_AGREGADOS.items():
+            grupos = self.grupos[tabla]
+            if not grupos:
+                continue
+            conexion.executemany(_sql_aplicar(tabla, claves), [
+                clave + tuple(grupo[m] for m in METRICAS_ADITIVAS)
+                + (min(grupo['precios_agregados'], default=None), max(grupo['precios_agregados'], default=None))
+                for clave, grupo in grupos.items()
+            ])
+
+            filtro = _filtro_grupo(claves)
+            for clave, grupo in grupos.items():
+                retirados = grupo['precios_retirados']
+                if not retirados:
+                    continue
+                fila = conexion.execute(
+                    f"SELECT min_precio, max_precio FROM {tabla} WHERE "
+                    + ' AND '.join(f"{c} = ?" for c in claves), clave
+                ).fetchone()
+                # Reason: solo si salió un valor extremo hace falta leer `propiedades`
+                if fila and (fila[0] is None or min(retirados) <= fila[0] or max(retirados) >= fila[1]):
+                    conexion.execute(
+                        f"UPDATE {tabla} SET (min_precio, max_precio) = "
+                        f"(SELECT MIN(precio), MAX(precio) FROM propiedades WHERE {filtro} AND precio > 0 "
+                        f"AND is_active = 1) "
+                        f"WHERE " + ' AND '.join(f"{c} = ?" for c in claves), clave + clave
+                    )
+
+            conexion.execute(f"DELETE FROM {tabla} WHERE total <= 0")
+
+
+def reconstruir_agregados(conexion: sqlite3.Connection, tabla: Optional[str] = None) -> None:
+    """
+    Recalcula los agregados desde cero con un solo GROUP BY (bases existentes o reparación).
+
+    Args:
+        conexion (sqlite3.Connection): Conexión a la base de propiedades
+        tabla (Optional[str]): Tabla a reconstruir (default: todas)
+    """
+    for nombre, claves in TABLAS_AGREGADOS.items():
+        if tabla and nombre != tabla:
+            continue
+        seleccion = ', '.join('date(created_at)' if c == 'fecha' else c for c in claves)
+        with conexion:
+            conexion.execute(f"DELETE FROM {nombre}")
+            conexion.execute(
+                f"INSERT INTO {nombre} ({', '.join(claves + METRICAS_ADITIVAS)}, min_precio, max_precio) "
+                f"SELECT {seleccion}, COUNT(*), SUM(precio > 0), "
+                "SUM(CASE WHEN precio > 0 THEN precio ELSE 0 END), "
+                "SUM(superficie_total), SUM(precio > 0 AND superficie_construida > 0), "
+                "SUM(CASE WHEN precio > 0 AND superficie_construida > 0 THEN precio * 1.0 / superficie_construida ELSE 0 END), "
+                "MIN(CASE WHEN precio > 0 THEN precio END), MAX(CASE WHEN precio > 0 THEN precio END) "
+                f"FROM propiedades WHERE is_active = 1 GROUP BY {seleccion}"
+            )
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+BACKFILL HISTÓRICO - SCRAPER MERCADOLIBRE
+=========================================
+
+Carga masiva de reportes históricos (scraping_masivo_*.json,
+test_hibrido_morelos_*.json) en la base SQLite de propiedades:
+- Parseo en streaming del arreglo 'resultados' con ijson (nunca se carga
+  el archivo completo)
+- Archivos en paralelo (un proceso por archivo) que devuelven filas ya
+  normalizadas con fila_desde_resultado
+- Deduplicación por ml_id en una tabla temporal de staging conservando el
+  timestamp más reciente
+- Deltas de precio_historial/cambios_atributos para las filas ya guardadas
+  que el histórico reemplaza (mismo calcular_deltas que upsert_lote),
+  fechados con el timestamp del reporte
+- Un solo INSERT ... SELECT ... ON CONFLICT hacia `propiedades` y
+  reconstrucción de agregados al final
+
+Uso:
+    python backfill_historico.py [propiedades.db] [reportes o patrones glob ...]
+"""
+
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import ijson
+
+from agregados_mercado import reconstruir_agregados
+from repositorio_propiedades import (
+    COLUMNAS_JSON_BD, COLUMNAS_PROPIEDADES, USAR_JSONB, RepositorioPropiedades, calcular_deltas,
+    fila_desde_resultado
+)
+
+
+PATRONES_REPORTES = ('scraping_masivo_*.json', 'test_hibrido_morelos_*.json')
+
+# Filas por transacción de staging
+TAMANO_LOTE_STAGING = 50_000
+
+# Filas reemplazadas leídas por vuelta al calcular deltas
+TAMANO_LOTE_DELTAS = 5_000
+
+SQL_STAGING_TABLA = (
+    f"CREATE TEMP TABLE IF NOT EXISTS backfill_staging ("
+    f"{', '.join(c + (' TEXT PRIMARY KEY' if c == 'ml_id' else '') for c in COLUMNAS_PROPIEDADES)}, "
+    f"marca TEXT NOT NULL, primera_marca TEXT NOT NULL)"
+)
+
+# Reason: conserva la versión con timestamp más reciente entre todos los archivos
+# y la primera vez que se vio cada ml_id (created_at)
+SQL_STAGING_INSERTAR = (
+    f"INSERT INTO backfill_staging ({', '.join(COLUMNAS_PROPIEDADES)}, marca, primera_marca) "
+    f"VALUES ({', '.join('?' for _ in COLUMNAS_PROPIEDADES)}, ?, ?) "
+    f"ON CONFLICT(ml_id) DO UPDATE SET "
+    + ', '.join(f"{c} = iif(excluded.marca > marca, excluded.{c}, {c})" for c in COLUMNAS_PROPIEDADES if c != 'ml_id')
+    + ", marca = MAX(marca, excluded.marca), primera_marca = MIN(primera_marca, excluded.primera_marca)"
+)
+
+# Reason: created_at/last_scraped toman las fechas históricas; una fila ya presente
+# solo se reemplaza si el histórico es más reciente que su último scraping
+SQL_CARGAR_PROPIEDADES = (
+    f"INSERT INTO propiedades ({', '.join(COLUMNAS_PROPIEDADES)}, created_at, updated_at, last_scraped) "
+    f"SELECT {', '.join(f'jsonb({c})' if USAR_JSONB and c in COLUMNAS_JSON_BD else c for c in COLUMNAS_PROPIEDADES)}, "
+    f"primera_marca, marca, marca FROM backfill_staging WHERE true "
+    f"ON CONFLICT(ml_id) DO UPDATE SET "
+    + ', '.join(f"{c} = excluded.{c}" for c in COLUMNAS_PROPIEDADES if c != 'ml_id')
+    + ", updated_at = excluded.updated_at, last_scraped = excluded.last_scraped "
+      "WHERE excluded.last_scraped > propiedades.last_scraped"
+)
+
+
+# Reason: mismas filas que SQL_CARGAR_PROPIEDADES va a sobrescribir; la huella
+# descarta las que llegan idénticas sin leer sus columnas en Python
+SQL_STAGING_REEMPLAZOS = (
+    f"SELECT {', '.join(f's.{c}' for c in COLUMNAS_PROPIEDADES)}, s.marca, "
+    f"{', '.join(f'json(p.{c})' if c in COLUMNAS_JSON_BD else f'p.{c}' for c in COLUMNAS_PROPIEDADES)} "
+    f"FROM backfill_staging s JOIN propiedades p ON p.ml_id = s.ml_id "
+    f"WHERE s.marca > p.last_scraped AND s.huella IS NOT p.huella"
+)
+
+SQL_PRECIO_HISTORIAL_FECHADO = (
+    "INSERT INTO precio_historial (ml_id, ciudad, precio_anterior, precio_nuevo, moneda_anterior, moneda_nueva, fecha) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+SQL_CAMBIO_ATRIBUTO_FECHADO = (
+    "INSERT INTO cambios_atributos (ml_id, ciudad, campo, valor_anterior, valor_nuevo, fecha) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+
+def normalizar_marca(timestamp: Optional[str]) -> str:
+    """
+    Timestamp ISO del resultado → UTC en formato de CURRENT_TIMESTAMP ('YYYY-MM-DD HH:MM:SS').
+
+    Reason: los reportes guardan datetime.now().isoformat() (hora local sin zona),
+    mientras que last_scraped/created_at y CURRENT_TIMESTAMP están en UTC
+
+    Examples:
+        >>> normalizar_marca('2025-01-31T10:15:02.123456-06:00')
+        '2025-01-31 16:15:02'
+        >>> local = datetime(2025, 1, 31, 10, 15, 2).astimezone(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        >>> normalizar_marca('2025-01-31T10:15:02.123456') == local
+        True
+        >>> normalizar_marca(None)
+        '1970-01-01 00:00:00'
+    """
+    if not timestamp:
+        return '1970-01-01 00:00:00'
+    try:
+        # Reason: fromisoformat de Python < 3.11 no acepta el sufijo 'Z'
+        momento = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    except ValueError:
+        return timestamp.replace('T', ' ')[:19]
+    # Reason: astimezone interpreta un datetime sin zona como hora local
+    return momento.astimezone(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def leer_reporte(ruta: str) -> Tuple[str, List[tuple], int]:
+    """
+    Lee en streaming los resultados exitosos de un reporte (se ejecuta en un proceso hijo).
+
+    Args:
+        ruta (str): Archivo de reporte generado por generar_reporte_hibrido
+
+    Returns:
+        Tuple[str, List[tuple], int]: (ruta, fila + marca + primera marca por ml_id, resultados leídos)
+    """
+    # Reason: deduplicar dentro del archivo reduce lo que viaja al proceso principal
+    filas: Dict[str, tuple] = {}
+    primeras: Dict[str, str] = {}
+    leidos = 0
+    with open(ruta, 'rb') as f:
+        for resultado in ijson.items(f, 'resultados.item', use_float=True):
+            leidos += 1
+            # Reason: el escritor en vivo solo persiste extracciones exitosas
+            if resultado.get('status') != 'exitoso':
+                continue
+            fila = fila_desde_resultado(resultado)
+            if fila is None:
+                continue
+            marca = normalizar_marca(resultado.get('timestamp'))
+            anterior = filas.get(fila[0])
+            if anterior is None or marca >= anterior[-1]:
+                filas[fila[0]] = fila + (marca,)
+            primeras[fila[0]] = min(marca, primeras.get(fila[0], marca))
+    return ruta, [fila + (primeras[ml_id],) for ml_id, fila in filas.items()], leidos
+
+
+def registrar_deltas(conexion) -> Tuple[int, int]:
+    """
+    Escribe el historial de las filas de `propiedades` que la carga del staging va a reemplazar.
+
+    Reason: SQL_CARGAR_PROPIEDADES sobrescribe en bloque; sin esto los cambios que
+    upsert_lote registraría quedan perdidos. Debe correr antes de la carga y en su
+    misma transacción
+
+    Args:
+        conexion: Conexión con backfill_staging ya poblada
+
+    Returns:
+        Tuple[int, int]: (filas de precio_historial, filas de cambios_atributos)
+
+    Examples:
+        >>> repo = RepositorioPropiedades(':memory:')
+        >>> repo.upsert_lote([{'url': 'https://x/MLM-1-a', 'precio': 100.0, 'recamaras': 2}])
+        (1, 0)
+        >>> _ = repo.conexion.execute(SQL_STAGING_TABLA)
+        >>> fila = fila_desde_resultado({'url': 'https://x/MLM-1-a', 'precio': 90.0, 'recamaras': 3})
+        >>> _ = repo.conexion.execute(SQL_STAGING_INSERTAR, fila + ('2999-01-01 00:00:00', '2999-01-01 00:00:00'))
+        >>> registrar_deltas(repo.conexion)
+        (1, 1)
+        >>> repo.conexion.execute("SELECT precio_anterior, precio_nuevo, fecha FROM precio_historial").fetchall()
+        [(100, 90, '2999-01-01 00:00:00')]
+    """
+    total_precios = total_atributos = 0
+    cursor = conexion.execute(SQL_STAGING_REEMPLAZOS)
+    columnas = len(COLUMNAS_PROPIEDADES)
+    while True:
+        filas = cursor.fetchmany(TAMANO_LOTE_DELTAS)
+        if not filas:
+            break
+        precios, atributos = [], []
+        for fila in filas:
+            nueva, marca = fila[:columnas], fila[columnas]
+            anterior = dict(zip(COLUMNAS_PROPIEDADES, fila[columnas + 1:]))
+            delta_precio, delta_atributos = calcular_deltas(anterior, nueva)
+            precios.extend(delta + (marca,) for delta in delta_precio)
+            atributos.extend(delta + (marca,) for delta in delta_atributos)
+        conexion.executemany(SQL_PRECIO_HISTORIAL_FECHADO, precios)
+        conexion.executemany(SQL_CAMBIO_ATRIBUTO_FECHADO, atributos)
+        total_precios += len(precios)
+        total_atributos += len(atributos)
+    return total_precios, total_atributos
+
+
+def expandir_rutas(patrones: List[str]) -> List[str]:
+    """Archivos que coinciden con los patrones (o PATRONES_REPORTES si no hay)."""
+    rutas = set()
+    for patron in patrones or PATRONES_REPORTES:
+        rutas.update(glob.glob(patron) if any(ch in patron for ch in '*?[') else [patron])
+    return sorted(rutas)
+
+
+def cargar_historico(rutas: List[str], ruta_bd: str = "propiedades.db",
+                     procesos: Optional[int] = None) -> Dict:
+    """
+    Carga reportes históricos en `propiedades`.
+
+    Args:
+        rutas (List[str]): Archivos de reporte
+        ruta_bd (str): Base SQLite destino (schema.sql)
+        procesos (Optional[int]): Procesos de parseo (default: CPUs disponibles)
+
+    Returns:
+        Dict: Métricas de la carga
+    """
+    inicio = time.perf_counter()
+    repositorio = RepositorioPropiedades(ruta_bd)
+    conexion = repositorio.conexion
+    conexion.execute("PRAGMA temp_store=MEMORY")
+    conexion.execute(SQL_STAGING_TABLA)
+
+    leidos_total = 0
+    filas_staging = 0
+    pendientes: List[tuple] = []
+
+    def _volcar():
+        with conexion:
+            conexion.executemany(SQL_STAGING_INSERTAR, pendientes)
+        pendientes.clear()
+
+    procesos = procesos or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        for ruta, filas, leidos in pool.map(leer_reporte, rutas):
+            print(f"📥 {os.path.basename(ruta)}: {leidos} resultados, {len(filas)} propiedades exitosas")
+            leidos_total += leidos
+            filas_staging += len(filas)
+            pendientes.extend(filas)
+            if len(pendientes) >= TAMANO_LOTE_STAGING:
+                _volcar()
+    if pendientes:
+        _volcar()
+
+    unicas = conexion.execute("SELECT COUNT(*) FROM backfill_staging").fetchone()[0]
+    with conexion:
+        cambios_precio, cambios_atributos = registrar_deltas(conexion)
+        cursor = conexion.execute(SQL_CARGAR_PROPIEDADES)
+    escritas = cursor.rowcount
+    conexion.execute("DROP TABLE backfill_staging")
+
+    reconstruir_agregados(conexion)
+    repositorio.cerrar()
+
+    return {
+        'archivos': len(rutas),
+        'resultados_leidos': leidos_total,
+        'filas_staging': filas_staging,
+        'ml_ids_unicos': unicas,
+        'filas_escritas': escritas,
+        'cambios_precio': cambios_precio,
+        'cambios_atributos': cambios_atributos,
+        'tiempo_s': round(time.perf_counter() - inicio, 2),
+    }
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    ruta_bd = argumentos.pop(0) if argumentos and argumentos[0].endswith('.db') else "propiedades.db"
+
+    rutas = expandir_rutas(argumentos)
+    if not rutas:
+        print("❌ No se encontraron reportes para cargar")
+        print("Uso: python backfill_historico.py [propiedades.db] [reportes o patrones glob ...]")
+        sys.exit(1)
+
+    print(f"🚚 Backfill de {len(rutas)} reportes → {ruta_bd}")
+    metricas = cargar_historico(rutas, ruta_bd)
+    print(f"✅ {metricas['ml_ids_unicos']} propiedades únicas de {metricas['resultados_leidos']} resultados, "
+          f"{metricas['filas_escritas']} escritas en {metricas['tiempo_s']} s")
+    print(f"📈 Historial: {metricas['cambios_precio']} cambios de precio, "
+          f"{metricas['cambios_atributos']} cambios de atributos")
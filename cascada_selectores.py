@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+CASCADAS ADAPTATIVAS DE SELECTORES - SCRAPER MERCADOLIBRE
+=========================================================
+
+Registro compartido de estadísticas por selector (aciertos, fallos, latencia)
+para todas las cascadas CSS del sistema: precio, subtitle, vendedor, títulos
+de tablas y enlaces del listado.
+
+Las cascadas del listado (enlaces, tarjetas, paginación) se reordenan para
+probar primero el selector que más gana; ahí cualquier selector con
+resultados es equivalente. Los campos de la página de detalle (`evaluar`)
+conservan su orden de prioridad fijo y solo registran estadísticas, para que
+el valor extraído no dependa del historial. Los conteos usan decaimiento
+exponencial: tras un cambio de layout el nuevo ganador sube al primer lugar en
+pocas páginas. Las estadísticas se persisten en JSON entre ejecuciones y se
+exponen en el reporte final.
+"""
+
+import json
+import os
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, List, Optional
+
+
+@dataclass
+class EstadisticaSelector:
+    """
+    Estadística acumulada de un selector dentro de una cascada.
+
+    Attributes:
+        aciertos_recientes: Aciertos con decaimiento exponencial
+        intentos_recientes: Intentos con decaimiento exponencial
+        aciertos_totales: Aciertos históricos sin decaimiento
+        fallos_totales: Fallos históricos sin decaimiento
+        latencia_promedio_ms: Media móvil exponencial de latencia
+    """
+    aciertos_recientes: float = 0.0
+    intentos_recientes: float = 0.0
+    aciertos_totales: int = 0
+    fallos_totales: int = 0
+    latencia_promedio_ms: float = 0.0
+
+    def puntaje(self) -> float:
+        """Tasa de acierto reciente con suavizado de Laplace (0.5 sin datos)."""
+        return (self.aciertos_recientes + 1) / (self.intentos_recientes + 2)
+
+
+class RegistroCascadas:
+    """
+    Registro de cascadas de selectores con auto-reordenamiento por tasa de acierto.
+
+    Examples:
+        >>> registro = RegistroCascadas(archivo=None)
+        >>> for _ in range(3):
+        ...     registro.registrar('precio', ['.a', '.b'], ganador='.b')
+        >>> registro.ordenar('precio', ['.a', '.b'])
+        ['.b', '.a']
+    """
+
+    # Reason: memoria efectiva de ~10 observaciones para converger rápido tras cambios de layout
+    DECAIMIENTO = 0.9
+    ALFA_LATENCIA = 0.2
+
+    def __init__(self, archivo: Optional[str] = "selector_stats.json"):
+        """
+        Inicializa registro y carga estadísticas persistidas si existen.
+
+        Args:
+            archivo (Optional[str]): Ruta JSON de persistencia; None para solo memoria
+        """
+        self.archivo = archivo
+        self.cascadas: Dict[str, Dict[str, EstadisticaSelector]] = {}
+        self.cargar()
+
+    def _stats(self, nombre: str, selector: str) -> EstadisticaSelector:
+        return self.cascadas.setdefault(nombre, {}).setdefault(selector, EstadisticaSelector())
+
+    def ordenar(self, nombre: str, selectores: Iterable[str]) -> List[str]:
+        """
+        Devuelve la cascada ordenada por puntaje (empates conservan el orden original).
+
+        Args:
+            nombre (str): Nombre de la cascada ('precio', 'vendedor', ...)
+            selectores (Iterable[str]): Selectores en su orden por defecto
+
+        Returns:
+            List[str]: Selectores reordenados
+        """
+        selectores = list(selectores)
+        stats = self.cascadas.get(nombre, {})
+        defecto = EstadisticaSelector()
+        return sorted(selectores, key=lambda s: -stats.get(s, defecto).puntaje())
+
+    def registrar(self, nombre: str, probados: List[str], ganador: Optional[str] = None,
+                  latencias_ms: Optional[Dict[str, float]] = None) -> None:
+        """
+        Registra una evaluación de la cascada.
+
+        Args:
+            nombre (str): Nombre de la cascada
+            probados (List[str]): Selectores efectivamente probados, en orden
+            ganador (Optional[str]): Selector que produjo valor válido (None si ninguno)
+            latencias_ms (Optional[Dict[str, float]]): Latencia medida por selector
+        """
+        latencias_ms = latencias_ms or {}
+        for selector in probados:
+            stats = self._stats(nombre, selector)
+            acierto = selector == ganador
+            stats.aciertos_recientes = stats.aciertos_recientes * self.DECAIMIENTO + (1 if acierto else 0)
+            stats.intentos_recientes = stats.intentos_recientes * self.DECAIMIENTO + 1
+            if acierto:
+                stats.aciertos_totales += 1
+            else:
+                stats.fallos_totales += 1
+
+            latencia = latencias_ms.get(selector)
+            if latencia is not None:
+                if stats.aciertos_totales + stats.fallos_totales == 1:
+                    stats.latencia_promedio_ms = latencia
+                else:
+                    stats.latencia_promedio_ms += self.ALFA_LATENCIA * (latencia - stats.latencia_promedio_ms)
+
+    def evaluar(self, nombre: str, selectores: Iterable[str], resultados: List[list], es_valido) -> Optional[tuple]:
+        """
+        Recorre resultados del payload en el orden fijo de la cascada y registra la evaluación.
+
+        Reason: en la página de detalle los selectores son prioridades (el más
+        específico primero); reordenar por tasa de acierto cambiaría qué texto
+        gana cuando varios coinciden, así que aquí solo se registran estadísticas.
+
+        Args:
+            nombre (str): Nombre de la cascada
+            selectores (Iterable[str]): Cascada en orden de prioridad
+            resultados (List[list]): Entradas [selector, texto, latencia_ms] del payload
+            es_valido (Callable[[str], bool]): Validación del texto de cada selector
+
+        Returns:
+            Optional[tuple]: (selector, texto) ganador o None
+
+        Examples:
+            >>> registro = RegistroCascadas(archivo=None)
+            >>> for _ in range(5):
+            ...     registro.registrar('vendedor', ['.a', '.b'], ganador='.b')
+            >>> registro.evaluar('vendedor', ['.a', '.b'], [['.a', 'Inmobiliaria'], ['.b', 'Ana']], bool)
+            ('.a', 'Inmobiliaria')
+        """
+        por_selector = {r[0]: r for r in resultados}
+        probados = []
+        latencias = {}
+
+        for selector in selectores:
+            entrada = por_selector.get(selector)
+            if entrada is None:
+                continue
+            probados.append(selector)
+            if len(entrada) > 2 and entrada[2] is not None:
+                latencias[selector] = entrada[2]
+            texto = entrada[1]
+            if texto and es_valido(texto):
+                self.registrar(nombre, probados, selector, latencias)
+                return selector, texto
+
+        self.registrar(nombre, probados, None, latencias)
+        return None
+
+    def cargar(self) -> None:
+        """Carga estadísticas persistidas; ignora archivos ausentes o corruptos."""
+        if not self.archivo or not os.path.exists(self.archivo):
+            return
+        try:
+            with open(self.archivo, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+            self.cascadas = {
+                nombre: {sel: EstadisticaSelector(**st) for sel, st in selectores.items()}
+                for nombre, selectores in datos.get('cascadas', {}).items()
+            }
+        except Exception as e:
+            print(f"⚠️ No se pudieron cargar estadísticas de selectores: {e}")
+
+    def guardar(self) -> None:
+        """Persiste estadísticas con escritura atómica."""
+        if not self.archivo:
+            return
+        try:
+            temporal = f"{self.archivo}.tmp"
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump({'cascadas': {
+                    nombre: {sel: asdict(st) for sel, st in selectores.items()}
+                    for nombre, selectores in self.cascadas.items()
+                }}, f, ensure_ascii=False, indent=2)
+            os.replace(temporal, self.archivo)
+        except Exception as e:
+            print(f"⚠️ No se pudieron guardar estadísticas de selectores: {e}")
+
+    def resumen(self) -> Dict:
+        """
+        Genera resumen para el reporte final.
+
+        Returns:
+            Dict: Por cascada, orden actual y métricas de cada selector
+        """
+        resumen = {}
+        for nombre, selectores in self.cascadas.items():
+            orden = self.ordenar(nombre, selectores.keys())
+            resumen[nombre] = {
+                'orden_actual': orden,
+                'selectores': {
+                    sel: {
+                        'aciertos': selectores[sel].aciertos_totales,
+                        'fallos': selectores[sel].fallos_totales,
+                        'tasa_acierto_reciente': round(selectores[sel].puntaje() * 100, 1),
+                        'latencia_promedio_ms': round(selectores[sel].latencia_promedio_ms, 3),
+                    }
+                    for sel in orden
+                }
+            }
+        return resumen
+
+
+_REGISTRO_POR_DEFECTO: Optional[RegistroCascadas] = None
+
+
+def obtener_registro_cascadas() -> RegistroCascadas:
+    """Registro compartido por defecto cuando no se inyecta uno explícito."""
+    global _REGISTRO_POR_DEFECTO
+    if _REGISTRO_POR_DEFECTO is None:
+        _REGISTRO_POR_DEFECTO = RegistroCascadas()
+    return _REGISTRO_POR_DEFECTO
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+COLA DE RASTREO PERSISTENTE - SCRAPER MERCADOLIBRE
+==================================================
+
+Frontera durable en SQLite para scraping masivo reanudable:
+- Tabla cola_rastreo: una fila por ml_id con estado, intentos, próximo intento
+  y lease del trabajador que la procesa
+- Tabla progreso_semillas: última página de listado visitada por semilla
+- Tabla ejecuciones: id de cada rastreo y si terminó limpiamente
+- Solo estado y último error por item; los resultados van al sumidero JSONL
+
+Si el proceso muere, la siguiente ejecución retoma ese mismo rastreo: libera
+los leases huérfanos y continúa desde la última página de cada semilla. Un rastreo terminado no se
+reanuda: la siguiente ejecución empieza uno nuevo con la cola y el progreso
+de semillas vacíos (re-scraping diario).
+"""
+
+import sqlite3
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+from frontera import clave_canonica
+
+
+ESQUEMA_COLA = """
+CREATE TABLE IF NOT EXISTS cola_rastreo (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ml_id TEXT NOT NULL UNIQUE,
+    url TEXT NOT NULL,
+    estado TEXT NOT NULL DEFAULT 'pendiente'
+        CHECK (estado IN ('pendiente', 'en_proceso', 'completado', 'fallido')),
+    intentos INTEGER NOT NULL DEFAULT 0,
+    proximo_intento_en REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expira_en REAL,
+    error TEXT,
+    creado_en REAL NOT NULL,
+    actualizado_en REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_cola_listos ON cola_rastreo(estado, proximo_intento_en);
+
+CREATE TABLE IF NOT EXISTS progreso_semillas (
+    semilla TEXT PRIMARY KEY,
+    url_siguiente TEXT,
+    numero_pagina INTEGER NOT NULL DEFAULT 0,
+    generadas INTEGER NOT NULL DEFAULT 0,
+    completada INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS ejecuciones (
+    id TEXT PRIMARY KEY,
+    iniciada_en REAL NOT NULL,
+    terminada_en REAL
+);
+"""
+
+
+class ColaPersistente:
+    """
+    Cola de URLs con leases y reintentos persistida en SQLite.
+
+    Examples:
+        >>> cola = ColaPersistente(':memory:')
+        >>> cola.encolar("https://casa.mercadolibre.com.mx/MLM-1-x-_JM")
+        True
+        >>> cola.encolar("https://inmuebles.mercadolibre.com.mx/MLM-1-x-_JM?tracking_id=y")
+        False
+        >>> numero, url, ml_id = cola.arrendar('trabajador-0')
+        >>> cola.completar(ml_id)
+        >>> cola.resumen()['completado']
+        1
+
+        Un rastreo terminado no se reanuda; el siguiente empieza con la cola vacía:
+
+        >>> ejecucion, reanudada = cola.iniciar_ejecucion()
+        >>> cola.terminar_ejecucion(ejecucion)
+        >>> cola.iniciar_ejecucion()[1], cola.resumen()['completado']
+        (False, 0)
+    """
+
+    def __init__(self, ruta: str = "crawl_queue.db", max_intentos: int = 3,
+                 duracion_lease_s: float = 600, backoff_base_s: float = 30):
+        """
+        Args:
+            ruta (str): Archivo SQLite (':memory:' para pruebas)
+            max_intentos (int): Intentos antes de marcar 'fallido'
+            duracion_lease_s (float): Vigencia de un lease antes de poder re-arrendarse
+            backoff_base_s (float): Base del backoff exponencial entre reintentos
+        """
+        self.ruta = ruta
+        self.max_intentos = max_intentos
+        self.duracion_lease_s = duracion_lease_s
+        self.backoff_base_s = backoff_base_s
+        # Reason: isolation_level=None para controlar transacciones con BEGIN IMMEDIATE
+        self.conexion = sqlite3.connect(ruta, isolation_level=None)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.executescript(ESQUEMA_COLA)
+
+    def cerrar(self) -> None:
+        """Cierra la conexión SQLite."""
+        self.conexion.close()
+
+    def ejecucion_pendiente(self) -> Optional[str]:
+        """Id del último rastreo que no terminó limpiamente (None si no hay)."""
+        fila = self.conexion.execute(
+            "SELECT id FROM ejecuciones WHERE terminada_en IS NULL ORDER BY iniciada_en DESC LIMIT 1"
+        ).fetchone()
+        return fila[0] if fila else None
+
+    def iniciar_ejecucion(self, reanudar: bool = True) -> Tuple[str, bool]:
+        """
+        Retoma el rastreo interrumpido o empieza uno nuevo.
+
+        Args:
+            reanudar (bool): False fuerza un rastreo nuevo aunque haya uno interrumpido
+
+        Returns:
+            Tuple[str, bool]: (id de ejecución, True si se reanudó)
+        """
+        pendiente = self.ejecucion_pendiente()
+        if reanudar and pendiente:
+            return pendiente, True
+
+        ahora = time.time()
+        # Reason: id único aunque dos rastreos empiecen en el mismo segundo
+        ejecucion = time.strftime('%Y%m%d_%H%M%S', time.localtime(ahora))
+        anteriores = self.conexion.execute(
+            "SELECT COUNT(*) FROM ejecuciones WHERE id = ? OR id LIKE ?", (ejecucion, f"{ejecucion}_%")
+        ).fetchone()[0]
+        if anteriores:
+            ejecucion = f"{ejecucion}_{anteriores + 1}"
+
+        # Reason: la cola y el progreso de semillas pertenecen a un solo rastreo;
+        # los resultados ya quedaron en JSONL/SQLite
+        self.conexion.execute("BEGIN IMMEDIATE")
+        try:
+            self.conexion.execute("DELETE FROM cola_rastreo")
+            self.conexion.execute("DELETE FROM progreso_semillas")
+            self.conexion.execute("UPDATE ejecuciones SET terminada_en = ? WHERE terminada_en IS NULL", (ahora,))
+            self.conexion.execute("INSERT INTO ejecuciones (id, iniciada_en) VALUES (?, ?)", (ejecucion, ahora))
+            self.conexion.execute("COMMIT")
+        except Exception:
+            self.conexion.execute("ROLLBACK")
+            raise
+        return ejecucion, False
+
+    def terminar_ejecucion(self, ejecucion: str) -> None:
+        """Marca el rastreo como terminado: la siguiente ejecución empezará uno nuevo."""
+        self.conexion.execute("UPDATE ejecuciones SET terminada_en = ? WHERE id = ?", (time.time(), ejecucion))
+
+    def recuperar_leases(self) -> int:
+        """
+        Devuelve a 'pendiente' los items que quedaron 'en_proceso' (ejecución anterior caída).
+
+        Returns:
+            int: Items recuperados
+        """
+        cursor = self.conexion.execute(
+            "UPDATE cola_rastreo SET estado = 'pendiente', lease_owner = NULL, lease_expira_en = NULL, "
+            "actualizado_en = ? WHERE estado = 'en_proceso'", (time.time(),)
+        )
+        return cursor.rowcount
+
+    def encolar(self, url: str) -> bool:
+        """
+        Agrega una URL si su ml_id no está en la cola.
+
+        Returns:
+            bool: True si se insertó (ml_id nuevo)
+        """
+        ahora = time.time()
+        cursor = self.conexion.execute(
+            "INSERT OR IGNORE INTO cola_rastreo (ml_id, url, creado_en, actualizado_en) VALUES (?, ?, ?, ?)",
+            (clave_canonica(url), url, ahora, ahora)
+        )
+        return cursor.rowcount == 1
+
+    def arrendar(self, propietario: str) -> Optional[Tuple[int, str, str]]:
+        """
+        Toma el siguiente item listo y lo marca 'en_proceso' a nombre del propietario.
+
+        Args:
+            propietario (str): Identificador del trabajador
+
+        Returns:
+            Optional[Tuple[int, str, str]]: (id, url, ml_id) o None si no hay items listos
+        """
+        ahora = time.time()
+        self.conexion.execute("BEGIN IMMEDIATE")
+        try:
+            fila = self.conexion.execute(
+                "SELECT id, url, ml_id FROM cola_rastreo "
+                "WHERE (estado = 'pendiente' AND proximo_intento_en <= ?) "
+                "   OR (estado = 'en_proceso' AND lease_expira_en < ?) "
+                "ORDER BY proximo_intento_en, id LIMIT 1", (ahora, ahora)
+            ).fetchone()
+            if fila:
+                self.conexion.execute(
+                    "UPDATE cola_rastreo SET estado = 'en_proceso', lease_owner = ?, lease_expira_en = ?, "
+                    "actualizado_en = ? WHERE id = ?",
+                    (propietario, ahora + self.duracion_lease_s, ahora, fila[0])
+                )
+            self.conexion.execute("COMMIT")
+            return fila
+        except Exception:
+            self.conexion.execute("ROLLBACK")
+            raise
+
+    def completar(self, ml_id: str) -> None:
+        """Marca el item como 'completado'."""
+        self.conexion.execute(
+            "UPDATE cola_rastreo SET estado = 'completado', intentos = intentos + 1, lease_owner = NULL, "
+            "lease_expira_en = NULL, error = NULL, actualizado_en = ? WHERE ml_id = ?",
+            (time.time(), ml_id)
+        )
+
+    def agotaria_intentos(self, ml_id: str) -> bool:
+        """True si un fallo más dejaría el item 'fallido' (sin otro reintento)."""
+        fila = self.conexion.execute("SELECT intentos FROM cola_rastreo WHERE ml_id = ?", (ml_id,)).fetchone()
+        return (fila[0] if fila else 0) + 1 >= self.max_intentos
+
+    def fallar(self, ml_id: str, resultado: Dict) -> str:
+        """
+        Registra un intento fallido: reintento con backoff o 'fallido' al agotar intentos.
+
+        Solo se guarda el texto del error; el resultado completo va al sumidero JSONL.
+
+        Returns:
+            str: Nuevo estado del item
+        """
+        fila = self.conexion.execute("SELECT intentos FROM cola_rastreo WHERE ml_id = ?", (ml_id,)).fetchone()
+        intentos = (fila[0] if fila else 0) + 1
+        estado = 'fallido' if intentos >= self.max_intentos else 'pendiente'
+        ahora = time.time()
+        self.conexion.execute(
+            "UPDATE cola_rastreo SET estado = ?, intentos = ?, proximo_intento_en = ?, lease_owner = NULL, "
+            "lease_expira_en = NULL, error = ?, actualizado_en = ? WHERE ml_id = ?",
+            (estado, intentos, ahora + self.backoff_base_s * (2 ** (intentos - 1)),
+             str(resultado.get('error') or resultado.get('status')), ahora, ml_id)
+        )
+        return estado
+
+    def total(self) -> int:
+        """Items registrados en este rastreo (URLs ya generadas por el crawler)."""
+        return self.conexion.execute("SELECT COUNT(*) FROM cola_rastreo").fetchone()[0]
+
+    def listos(self) -> int:
+        """Items pendientes que pueden arrendarse ya."""
+        return self.conexion.execute(
+            "SELECT COUNT(*) FROM cola_rastreo WHERE estado = 'pendiente' AND proximo_intento_en <= ?",
+            (time.time(),)
+        ).fetchone()[0]
+
+    def hay_trabajo_activo(self) -> bool:
+        """True si quedan items pendientes (incluso en backoff) o en proceso."""
+        return self.conexion.execute(
+            "SELECT EXISTS(SELECT 1 FROM cola_rastreo WHERE estado IN ('pendiente', 'en_proceso'))"
+        ).fetchone()[0] == 1
+
+    def urls_conocidas(self) -> Iterator[str]:
+        """URLs ya registradas (para sembrar la frontera al reanudar)."""
+        for (url,) in self.conexion.execute("SELECT url FROM cola_rastreo"):
+            yield url
+
+    def progreso_semilla(self, semilla: str) -> Optional[Dict]:
+        """Progreso guardado de una semilla de listado o None si no se ha visitado."""
+        fila = self.conexion.execute(
+            "SELECT url_siguiente, numero_pagina, generadas, completada FROM progreso_semillas WHERE semilla = ?",
+            (semilla,)
+        ).fetchone()
+        if not fila:
+            return None
+        return {'url_siguiente': fila[0], 'numero_pagina': fila[1], 'generadas': fila[2], 'completada': bool(fila[3])}
+
+    def guardar_progreso_semilla(self, semilla: str, url_siguiente: Optional[str], numero_pagina: int,
+                                 generadas: int, completada: bool) -> None:
+        """Persiste la siguiente página a visitar de una semilla."""
+        self.conexion.execute(
+            "INSERT INTO progreso_semillas (semilla, url_siguiente, numero_pagina, generadas, completada) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT(semilla) DO UPDATE SET url_siguiente = excluded.url_siguiente, "
+            "numero_pagina = excluded.numero_pagina, generadas = excluded.generadas, completada = excluded.completada",
+            (semilla, url_siguiente, numero_pagina, generadas, int(completada))
+        )
+
+    def resumen(self) -> Dict:
+        """Conteo de items por estado para el reporte final."""
+        conteos = {'pendiente': 0, 'en_proceso': 0, 'completado': 0, 'fallido': 0}
+        for estado, total in self.conexion.execute("SELECT estado, COUNT(*) FROM cola_rastreo GROUP BY estado"):
+            conteos[estado] = total
+        return conteos
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+CRAWLER DE LISTADOS PAGINADOS - SCRAPER MERCADOLIBRE
+====================================================
+
+Generador asíncrono que recorre todas las semillas de URLS_BUSQUEDA_MORELOS
+siguiendo la paginación ("Siguiente" o offsets _Desde_N) y entrega cada URL de
+propiedad en cuanto se parsea su página de listado.
+
+PoolPaginas consume el generador directamente como productor de su cola, de
+modo que la extracción de detalle empieza con la primera página de resultados
+en lugar de esperar a que termine la recolección. En modo solo_tarjetas el
+generador entrega directamente registros leídos de las tarjetas del listado
+(monitoreo de mercado sin páginas de detalle).
+"""
+
+import re
+import time
+from typing import AsyncIterator, Dict, List, Optional, Union
+
+from models import ConfiguracionHibridaUltraAvanzada
+from frontera import FronteraURLs
+
+
+# Selectores del enlace "Siguiente" en la paginación andes
+SELECTORES_SIGUIENTE = [
+    'li.andes-pagination__button--next a',
+    '.andes-pagination__button--next a',
+    'a[title="Siguiente"]',
+    'a.andes-pagination__link:has-text("Siguiente")',
+]
+
+PATRON_DESDE = re.compile(r'_Desde_\d+')
+
+# Páginas consecutivas sin URLs nuevas antes de abandonar una semilla
+MAX_PAGINAS_SIN_NUEVAS = 3
+
+
+def construir_url_pagina(semilla: str, desde: int) -> str:
+    """
+    Construye la URL de listado con offset _Desde_N.
+
+    Args:
+        semilla (str): URL de búsqueda base
+        desde (int): Posición (1-based) del primer resultado de la página
+
+    Returns:
+        str: URL paginada (la semilla misma si desde <= 1)
+
+    Examples:
+        >>> construir_url_pagina("https://inmuebles.mercadolibre.com.mx/casas/venta/morelos/", 49)
+        'https://inmuebles.mercadolibre.com.mx/casas/venta/morelos/_Desde_49_NoIndex_True'
+    """
+    base = PATRON_DESDE.sub('', semilla.split('?')[0]).replace('_NoIndex_True', '').rstrip('/')
+    if desde <= 1:
+        return f"{base}/"
+    return f"{base}/_Desde_{desde}_NoIndex_True"
+
+
+class CrawlerListados:
+    """Recorre semillas de búsqueda con paginación y cuotas por semilla"""
+
+    def __init__(self, navigator, config: Optional[ConfiguracionHibridaUltraAvanzada] = None,
+                 frontera: Optional[FronteraURLs] = None, progreso=None):
+        """
+        Args:
+            navigator: NavigatorStealth (navegación, popups y extracción de enlaces)
+            config: Configuración con semillas, cuotas y tamaño de página
+            frontera: Frontera de deduplicación por ml_id (default: una nueva por ejecución)
+            progreso: ColaPersistente para reanudar cada semilla desde su última página (opcional)
+        """
+        self.navigator = navigator
+        self.config = config or navigator.config
+        self.frontera = frontera or FronteraURLs(
+            self.config.FRONTERA_UMBRAL_EXACTO,
+            self.config.FRONTERA_CAPACIDAD_BLOOM,
+            self.config.FRONTERA_TASA_FALSOS_POSITIVOS,
+        )
+        self.progreso = progreso
+        self.paginas_visitadas = 0
+
+    async def recorrer(self, page, max_total: int, semillas: Optional[List[str]] = None,
+                       solo_tarjetas: bool = False) -> AsyncIterator[Union[str, Dict]]:
+        """
+        Genera URLs de propiedades a medida que se descubren.
+
+        Args:
+            page: Página dedicada al listado (no la usan los trabajadores de detalle)
+            max_total (int): Máximo de URLs a generar entre todas las semillas
+            semillas (Optional[List[str]]): Semillas (default: URLS_BUSQUEDA_MORELOS)
+            solo_tarjetas (bool): Modo monitoreo: generar registros de las tarjetas
+                del listado en lugar de URLs para visitar
+
+        Yields:
+            Union[str, Dict]: URL de propiedad cuyo ml_id no se había visto en la
+            frontera (o su registro de tarjeta con solo_tarjetas)
+        """
+        semillas = semillas or self.config.URLS_BUSQUEDA_MORELOS
+        # Reason: al reanudar, las URLs ya encoladas cuentan para max_total (la cola
+        # tiene también las generadas en una página cuyo progreso no llegó a guardarse)
+        generadas = self.progreso.total() if self.progreso else 0
+
+        for semilla in semillas:
+            if generadas >= max_total:
+                break
+
+            # Reanudación: continuar desde la última página guardada de la semilla
+            previo = self.progreso.progreso_semilla(semilla) if self.progreso else None
+            if previo and previo['completada']:
+                print(f"⏭️ Semilla ya completada antes de la interrupción: {semilla}")
+                continue
+            generadas_semilla = previo['generadas'] if previo else 0
+            url_pagina = previo['url_siguiente'] if previo else semilla
+            pagina_inicial = previo['numero_pagina'] + 1 if previo else 1
+
+            cuota = min(self.config.CUOTA_POR_SEMILLA, generadas_semilla + max_total - generadas)
+            urls_pagina_anterior = None
+            paginas_sin_nuevas = 0
+            print(f"🌱 Semilla: {semilla} (página {pagina_inicial}, {generadas_semilla}/{cuota})")
+
+            for numero_pagina in range(pagina_inicial, self.config.MAX_PAGINAS_POR_SEMILLA + 1):
+                if generadas_semilla >= cuota or not url_pagina:
+                    break
+
+                if not await self.navigator.navigate_safely(page, url_pagina):
+                    print(f"⚠️ No se pudo abrir página {numero_pagina} de la semilla")
+                    break
+                if numero_pagina == pagina_inicial:
+                    await self.navigator.handle_popup_and_cookies(page)
+                self.paginas_visitadas += 1
+
+                # Reason: se pide la página completa; la cuota se aplica tras deduplicar
+                elementos = await self.navigator.extract_property_urls_from_listing(
+                    page, self.config.RESULTADOS_POR_PAGINA, solo_tarjetas=solo_tarjetas
+                )
+                urls = [e['url'] for e in elementos] if solo_tarjetas else elementos
+                nuevas = 0
+                for url, elemento in zip(urls, elementos):
+                    if generadas_semilla >= cuota:
+                        break
+                    if not self.frontera.agregar(url):
+                        continue
+                    nuevas += 1
+                    generadas += 1
+                    generadas_semilla += 1
+                    yield elemento
+
+                print(f"📄 Página {numero_pagina}: {nuevas} URLs nuevas ({generadas_semilla}/{cuota} de la semilla)")
+
+                # Reason: semillas solapadas repiten páginas enteras; se tolera hasta
+                # MAX_PAGINAS_SIN_NUEVAS seguidas y se corta si la página está vacía
+                # o es idéntica a la anterior (offset ignorado por el sitio)
+                firma = frozenset(urls)
+                paginas_sin_nuevas = 0 if nuevas else paginas_sin_nuevas + 1
+                fin_semilla = (not urls or firma == urls_pagina_anterior
+                               or paginas_sin_nuevas >= MAX_PAGINAS_SIN_NUEVAS)
+                urls_pagina_anterior = firma
+
+                url_pagina = None if fin_semilla else await self._siguiente_pagina(page, semilla, numero_pagina)
+                if self.progreso:
+                    self.progreso.guardar_progreso_semilla(
+                        semilla, url_pagina, numero_pagina, generadas_semilla,
+                        completada=url_pagina is None or generadas_semilla >= self.config.CUOTA_POR_SEMILLA
+                    )
+
+        print(f"✅ Crawler de listados: {generadas} URLs en {self.paginas_visitadas} páginas")
+
+    async def _siguiente_pagina(self, page, semilla: str, numero_pagina: int) -> Optional[str]:
+        """
+        URL de la siguiente página: enlace "Siguiente" o, si no existe, offset _Desde_N.
+        """
+        registro = self.navigator.registro_cascadas
+        probados = []
+        for selector in registro.ordenar('paginacion_siguiente', SELECTORES_SIGUIENTE):
+            inicio = time.perf_counter()
+            probados.append(selector)
+            try:
+                enlace = await page.query_selector(selector)
+                href = await enlace.get_attribute('href') if enlace else None
+            except Exception:
+                href = None
+            if href and href.startswith('http'):
+                registro.registrar('paginacion_siguiente', probados, selector,
+                                   {selector: (time.perf_counter() - inicio) * 1000})
+                return href
+        registro.registrar('paginacion_siguiente', probados, None)
+
+        # Reason: paginación presente sin "Siguiente" significa última página
+        if await page.query_selector('.andes-pagination'):
+            return None
+        return construir_url_pagina(semilla, numero_pagina * self.config.RESULTADOS_POR_PAGINA + 1)
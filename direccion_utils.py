@@ -7,15 +7,67 @@ Funciones especializadas para procesamiento de direcciones y ubicaciones.
 Refactorizado desde extractors.py siguiendo principios de separación de responsabilidades.
 """
 
-from typing import Dict, Optional
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Pattern
 
+from nomenclator_mexico import estado_canonico, resolver_ubicacion
 
+
+# ❌ FILTROS ESTRICTOS - No debe contener:
+FILTROS_PROHIBIDOS = (
+    'mercado libre', 'mercadolibre', 'ml', 'mlm-', 'contraseña', 'pin',
+    'whatsapp', 'email', 'características', 'publicación', 'precio', 'venta',
+    'compra', 'casa', 'inmueble', 'metros cuadrados', 'm²', 'm2', 'recámara',
+    'baño', 'estacionamiento', 'terreno', 'construcción', 'superficie', 'pisos'
+)
+
+# ✅ INDICADORES POSITIVOS de vías
+INDICADORES_VIA = (
+    'colonia', 'col.', 'calle', 'c.', 'avenida', 'av.', 'privada', 'priv.',
+    'boulevard', 'blvd', 'fraccionamiento', 'fracc', 'calzada', 'calz.',
+    'andador', 'circuito', 'paseo', 'plaza', 'glorieta'
+)
+
+# ✅ INDICADORES DE UBICACIÓN
+INDICADORES_UBICACION = (
+    'cuernavaca', 'morelos', 'cdmx', 'ciudad de méxico', 'méxico', 'estado de méxico',
+    'nezahualcóyotl', 'nezahualcoyotl', 'tecámac', 'tecamac', 'atizapán', 'atizapan',
+    'coyoacán', 'coyoacan', 'zapopan', 'guadalajara', 'mérida', 'merida', 'yucatán',
+    'metropolitana', 'villa del real', 'mayorazgos', 'distrito federal', 'alvaro obregón', 'queretaro',
+    'oaxaca', 'chiapas', 'tuxtla gutierrez', 'tapachula', 'campeche', 'quintana roo', 'cancun',
+    'playa del carmen', 'tabasco', 'villahermosa', 'veracruz', 'xalapa', 'coatzacoalcos',
+    'puebla', 'tlaxcala', 'guerrero', 'acapulco', 'chilpancingo', 'hidalgo', 'pachuca',
+    'guanajuato', 'leon', 'irapuato', 'celaya', 'michoacan', 'morelia', 'lazaro cardenas'
+)
+
+
+def _compilar_terminos(terminos: Iterable[str]) -> Pattern:
+    """
+    Una sola regex por clase de términos: search() equivale a any(t in texto).
+
+    Reason: alternativas más largas primero para que el motor no retroceda de más;
+    el resultado (hay o no coincidencia) no depende del orden
+    """
+    return re.compile('|'.join(re.escape(t) for t in sorted(set(terminos), key=len, reverse=True)))
+
+
+_PATRON_PROHIBIDOS = _compilar_terminos(FILTROS_PROHIBIDOS)
+# Reason: vía y ubicación solo se usan unidas por OR → un solo recorrido
+_PATRON_INDICADORES = _compilar_terminos(INDICADORES_VIA + INDICADORES_UBICACION)
+
+# Textos distintos recordados (líneas repetidas de innerText entre páginas)
+TAMANO_CACHE_DIRECCIONES = 16_384
+
+
+@lru_cache(maxsize=TAMANO_CACHE_DIRECCIONES)
 def es_probable_direccion(text: str) -> bool:
     """
     Determina si un texto es probablemente una dirección válida.
     
     Aplica filtros estrictos y validaciones para identificar direcciones reales
-    vs texto descriptivo o metadata de la página.
+    vs texto descriptivo o metadata de la página. Los términos de cada clase
+    están precompilados en una regex y el resultado se memoriza por texto.
     
     Args:
         text (str): Texto a evaluar
@@ -34,67 +86,60 @@ def es_probable_direccion(text: str) -> bool:
         
     text_lower = text.lower().strip()
     
-    # ❌ FILTROS ESTRICTOS - No debe contener:
-    filtros_prohibidos = [
-        'mercado libre', 'mercadolibre', 'ml', 'mlm-', 'contraseña', 'pin', 
-        'whatsapp', 'email', 'características', 'publicación', 'precio', 'venta', 
-        'compra', 'casa', 'inmueble', 'metros cuadrados', 'm²', 'm2', 'recámara', 
-        'baño', 'estacionamiento', 'terreno', 'construcción', 'superficie', 'pisos'
-    ]
-    
-    if any(filtro in text_lower for filtro in filtros_prohibidos):
+    # ❌ FILTROS ESTRICTOS - No debe contener ningún término prohibido
+    if _PATRON_PROHIBIDOS.search(text_lower):
         return False
     
     # ❌ No aceptar textos que son principalmente números
-    if len([c for c in text if c.isdigit()]) > len(text) * 0.5:
+    # Reason: str.isdigit (no \d) para contar también dígitos como '²'
+    digitos = sum(map(str.isdigit, text))
+    if digitos > len(text) * 0.5:
         return False
         
     # ❌ No aceptar textos muy cortos sin estructura
     if len(text.split()) < 3:
         return False
     
-    # ✅ INDICADORES POSITIVOS de vías
-    indicadores_via = [
-        'colonia', 'col.', 'calle', 'c.', 'avenida', 'av.', 'privada', 'priv.',
-        'boulevard', 'blvd', 'fraccionamiento', 'fracc', 'calzada', 'calz.',
-        'andador', 'circuito', 'paseo', 'plaza', 'glorieta'
-    ]
-    
-    # ✅ INDICADORES DE UBICACIÓN
-    indicadores_ubicacion = [
-        'cuernavaca', 'morelos', 'cdmx', 'ciudad de méxico', 'méxico', 'estado de méxico',
-        'nezahualcóyotl', 'nezahualcoyotl', 'tecámac', 'tecamac', 'atizapán', 'atizapan',
-        'coyoacán', 'coyoacan', 'zapopan', 'guadalajara', 'mérida', 'merida', 'yucatán',
-        'metropolitana', 'villa del real', 'mayorazgos', 'distrito federal', 'alvaro obregón', 'queretaro',
-        'oaxaca', 'chiapas', 'tuxtla gutierrez', 'tapachula', 'campeche', 'quintana roo', 'cancun',
-        'playa del carmen', 'tabasco', 'villahermosa', 'veracruz', 'xalapa', 'coatzacoalcos',
-        'puebla', 'tlaxcala', 'guerrero', 'acapulco', 'chilpancingo', 'hidalgo', 'pachuca',
-        'guanajuato', 'leon', 'irapuato', 'celaya', 'michoacan', 'morelia', 'lazaro cardenas'
-    ]
-    
     # Debe tener AL MENOS un indicador de vía O ubicación
-    tiene_indicador_via = any(indicador in text_lower for indicador in indicadores_via)
-    tiene_ubicacion = any(ubicacion in text_lower for ubicacion in indicadores_ubicacion)
+    tiene_indicador = _PATRON_INDICADORES.search(text_lower) is not None
     
     # ✅ ESTRUCTURA de dirección (flexible)
     tiene_estructura = (
-        (',' in text and len(text.split(',')) >= 2) or  # Separadores de dirección
-        any(char.isdigit() for char in text) or  # Algún número
+        ',' in text or  # Separadores de dirección
+        digitos > 0 or  # Algún número
         'minutos' in text_lower  # Referencias de distancia
     )
     
     # ✅ DECISIÓN FINAL: Debe cumplir criterios básicos
-    es_direccion = (tiene_indicador_via or tiene_ubicacion) and tiene_estructura
-    
-    return es_direccion
+    return tiene_indicador and tiene_estructura
+
+
+def clasificar_direcciones(textos: Iterable[str]) -> List[bool]:
+    """
+    Clasifica una lista de líneas candidatas en una sola llamada.
+
+    Args:
+        textos (Iterable[str]): Líneas candidatas (ej. innerText del body)
+
+    Returns:
+        List[bool]: es_probable_direccion de cada texto, en el mismo orden
+
+    Examples:
+        >>> clasificar_direcciones(["Av. Morelos 5, Col. Centro", "Precio de venta", "Av. Morelos 5, Col. Centro"])
+        [True, False, True]
+    """
+    # Reason: los duplicados dentro del lote se evalúan una vez
+    vistos: Dict[str, bool] = {}
+    return [vistos[t] if t in vistos else vistos.setdefault(t, es_probable_direccion(t)) for t in textos]
 
 
 def parsear_ubicacion_completa(direccion_raw: str) -> Dict[str, Optional[str]]:
     """
     Parsea dirección en componentes geográficos estructurados.
     
-    Utiliza enfoque simple basado en últimos elementos separados por comas
-    para extraer estado y ciudad de direcciones mexicanas.
+    Resuelve estado y municipio con el nomenclátor offline (autómata sobre
+    estados, municipios, alias y colonias, con caché LRU). Si no reconoce
+    ningún nombre, usa los últimos elementos separados por comas.
     
     Args:
         direccion_raw (str): Dirección completa en string
@@ -106,7 +151,9 @@ def parsear_ubicacion_completa(direccion_raw: str) -> Dict[str, Optional[str]]:
         >>> parsear_ubicacion_completa("Privada Los Pinos 45, Centro, Cuernavaca, Morelos")
         {'pais': 'México', 'estado': 'Morelos', 'ciudad': 'Cuernavaca'}
         >>> parsear_ubicacion_completa("Colonia del Valle, CDMX")
-        {'pais': 'México', 'estado': 'Ciudad de México', 'ciudad': 'Colonia del Valle'}
+        {'pais': 'México', 'estado': 'Ciudad de México', 'ciudad': 'Benito Juárez'}
+        >>> parsear_ubicacion_completa("Calle Morelos 5, Tejalpa, Jiutepec, Mor., México")
+        {'pais': 'México', 'estado': 'Morelos', 'ciudad': 'Jiutepec'}
     """
     ubicacion = {
         'pais': 'México',
@@ -126,6 +173,17 @@ def parsear_ubicacion_completa(direccion_raw: str) -> Dict[str, Optional[str]]:
         direccion_limpia = direccion_limpia.replace(' ,', ',')  # Espacios antes de comas
         direccion_limpia = direccion_limpia.replace(', ', ',')  # Normalizar separadores
         
+        # ✅ NOMENCLÁTOR: estado/municipio reconocidos en cualquier posición
+        resuelta = resolver_ubicacion(direccion_limpia)
+        if resuelta.estado or resuelta.ciudad:
+            ubicacion['estado'] = resuelta.estado
+            ubicacion['ciudad'] = resuelta.ciudad
+            if resuelta.ciudad is None and resuelta.segmento_estado:
+                # Reason: municipio fuera del catálogo → elemento anterior al estado
+                anteriores = [p.strip() for p in direccion_limpia.split(',')[:resuelta.segmento_estado] if p.strip()]
+                ubicacion['ciudad'] = anteriores[-1].title() if anteriores else None
+            return ubicacion
+        
         # ✅ SEPARAR POR COMAS
         partes = [parte.strip() for parte in direccion_limpia.split(',') if parte.strip()]
         
@@ -159,7 +217,7 @@ def normalizar_estado(estado_raw: str) -> str:
     Normaliza nombre de estado con mapeo de variantes comunes.
     
     Convierte abreviaciones y variantes comunes a nombres oficiales
-    de estados mexicanos.
+    de estados mexicanos (alias de nomenclator_mexico.ESTADOS).
     
     Args:
         estado_raw (str): Nombre de estado en formato original
@@ -175,25 +233,5 @@ def normalizar_estado(estado_raw: str) -> str:
         >>> normalizar_estado("Yucatan")
         "Yucatán"
     """
-    estado_lower = estado_raw.lower().strip()
-    
-    # ✅ MAPEO SIMPLE solo para casos comunes
-    normalizaciones = {
-        'distrito federal': 'Ciudad de México',
-        'df': 'Ciudad de México',
-        'cdmx': 'Ciudad de México',
-        'ciudad de méxico': 'Ciudad de México',
-        'estado de méxico': 'Estado de México',
-        'mexico': 'Estado de México',
-        'edomex': 'Estado de México',
-        'morelos': 'Morelos',
-        'estado de morelos': 'Morelos',
-        'yucatan': 'Yucatán',
-        'yucatán': 'Yucatán',
-        'queretaro': 'Querétaro',
-        'querétaro': 'Querétaro',
-        'jalisco': 'Jalisco',
-        'sinaloa': 'Sinaloa'
-    }
-    
-    return normalizaciones.get(estado_lower, estado_raw.title()) 
\ No newline at end of file
+    # ✅ ALIAS DEL NOMENCLÁTOR (32 entidades, abreviaturas y nombres oficiales)
+    return estado_canonico(estado_raw) or estado_raw.title() 
\ No newline at end of file
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+ESPERAS POR CONDICIÓN - SCRAPER MERCADOLIBRE
+============================================
+
+Reemplaza sleeps fijos del hot path por esperas sobre condiciones concretas
+(contenedor presente, filas estables, botón desaparecido, popup visible), cada
+una acotada por un límite superior.
+
+Registra cuánto tardó realmente cada espera frente al presupuesto fijo que
+usaba el código anterior para cuantificar el ahorro por propiedad.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from models import ConfiguracionHibridaUltraAvanzada
+from script_extraccion import SELECTORES_PDP
+
+
+# ✅ CONDICIONES DE LISTO
+SELECTOR_CONTENEDOR_SPECS = SELECTORES_PDP['contenedor_specs']
+SELECTOR_FILAS_SPECS = f"{SELECTORES_PDP['contenedor_specs']} {SELECTORES_PDP['tabla_specs']} tr"
+SELECTOR_RESULTADOS_LISTADO = '.ui-search-results a[href*="MLM-"]'
+
+# Reason: el contador vive en window para que wait_for_function compare
+# lecturas sucesivas sin round-trips adicionales desde Python
+SCRIPT_FILAS_ESTABLES = """
+({selector, lecturas}) => {
+    const total = document.querySelectorAll(selector).length;
+    const estado = window.__esperaFilasEstables || (window.__esperaFilasEstables = {total: -1, repeticiones: 0});
+    if (total > 0 && total === estado.total) {
+        estado.repeticiones += 1;
+    } else {
+        estado.total = total;
+        estado.repeticiones = 0;
+    }
+    if (estado.repeticiones >= lecturas) {
+        delete window.__esperaFilasEstables;
+        return true;
+    }
+    return false;
+}
+"""
+
+
+@dataclass
+class EstadisticaEspera:
+    """
+    Acumulado de una espera por condición.
+
+    Attributes:
+        ejecuciones: Veces que se ejecutó la espera
+        cumplidas: Veces que la condición se cumplió antes del límite
+        tiempo_real_ms: Tiempo total realmente esperado
+        presupuesto_fijo_ms: Tiempo total que habría costado el sleep fijo anterior
+    """
+    ejecuciones: int = 0
+    cumplidas: int = 0
+    tiempo_real_ms: float = 0.0
+    presupuesto_fijo_ms: float = 0.0
+
+
+class GestorEsperas:
+    """
+    Esperas acotadas por condición con contabilidad frente a sleeps fijos.
+
+    Cada método devuelve True si la condición se cumplió dentro del límite y
+    False si se agotó; nunca lanza excepciones al flujo de scraping.
+    """
+
+    def __init__(self, presupuestos: Optional[Dict[str, tuple]] = None):
+        """
+        Args:
+            presupuestos (Optional[Dict[str, tuple]]): nombre → (sleep_fijo_anterior_ms, limite_ms)
+        """
+        self.presupuestos = presupuestos or ConfiguracionHibridaUltraAvanzada.ESPERAS_LISTO
+        self.estadisticas: Dict[str, EstadisticaEspera] = {}
+
+    def _limite(self, nombre: str, limite_ms: Optional[float]) -> float:
+        if limite_ms is not None:
+            return limite_ms
+        return self.presupuestos.get(nombre, (1000, 1000))[1]
+
+    def _registrar(self, nombre: str, inicio: float, cumplida: bool) -> None:
+        stats = self.estadisticas.setdefault(nombre, EstadisticaEspera())
+        stats.ejecuciones += 1
+        stats.cumplidas += 1 if cumplida else 0
+        stats.tiempo_real_ms += (time.perf_counter() - inicio) * 1000
+        stats.presupuesto_fijo_ms += self.presupuestos.get(nombre, (0, 0))[0]
+
+    async def esperar_selector(self, page, nombre: str, selector: str, estado: str = 'attached',
+                               limite_ms: Optional[float] = None) -> bool:
+        """
+        Espera a que un selector alcance un estado ('attached', 'visible', 'hidden', 'detached').
+
+        Args:
+            page: Página de Playwright
+            nombre (str): Nombre de la espera para estadísticas/presupuesto
+            selector (str): Selector a observar
+            estado (str): Estado objetivo de Playwright
+            limite_ms (Optional[float]): Límite superior (default: presupuesto configurado)
+
+        Returns:
+            bool: True si se cumplió antes del límite
+        """
+        inicio = time.perf_counter()
+        try:
+            await page.wait_for_selector(selector, state=estado, timeout=self._limite(nombre, limite_ms))
+            cumplida = True
+        except Exception:
+            cumplida = False
+        self._registrar(nombre, inicio, cumplida)
+        return cumplida
+
+    async def esperar_elemento(self, elemento, nombre: str, estado: str = 'hidden',
+                               limite_ms: Optional[float] = None) -> bool:
+        """
+        Espera a que un ElementHandle ya localizado alcance un estado (ej. botón oculto tras click).
+
+        Returns:
+            bool: True si se cumplió antes del límite (un elemento desacoplado cuenta como oculto)
+        """
+        inicio = time.perf_counter()
+        try:
+            await elemento.wait_for_element_state(estado, timeout=self._limite(nombre, limite_ms))
+            cumplida = True
+        except Exception:
+            cumplida = False
+        self._registrar(nombre, inicio, cumplida)
+        return cumplida
+
+    async def esperar_filas_estables(self, page, nombre: str, selector_filas: str, lecturas: int = 2,
+                                     intervalo_ms: int = 100, limite_ms: Optional[float] = None) -> bool:
+        """
+        Espera a que el número de filas sea > 0 y se mantenga igual en lecturas consecutivas.
+
+        Args:
+            page: Página de Playwright
+            nombre (str): Nombre de la espera
+            selector_filas (str): Selector de las filas a contar
+            lecturas (int): Lecturas iguales consecutivas requeridas
+            intervalo_ms (int): Intervalo de polling en el browser
+            limite_ms (Optional[float]): Límite superior
+
+        Returns:
+            bool: True si el conteo se estabilizó antes del límite
+        """
+        inicio = time.perf_counter()
+        try:
+            await page.wait_for_function(
+                SCRIPT_FILAS_ESTABLES, arg={'selector': selector_filas, 'lecturas': lecturas},
+                polling=intervalo_ms, timeout=self._limite(nombre, limite_ms)
+            )
+            cumplida = True
+        except Exception:
+            cumplida = False
+            try:
+                await page.evaluate("() => { delete window.__esperaFilasEstables; }")
+            except Exception:
+                pass
+        self._registrar(nombre, inicio, cumplida)
+        return cumplida
+
+    async def esperar_carga(self, page, nombre: str, estado: str = 'load',
+                            limite_ms: Optional[float] = None) -> bool:
+        """
+        Espera un load state de Playwright ('load', 'domcontentloaded', 'networkidle').
+
+        Returns:
+            bool: True si se alcanzó antes del límite
+        """
+        inicio = time.perf_counter()
+        try:
+            await page.wait_for_load_state(estado, timeout=self._limite(nombre, limite_ms))
+            cumplida = True
+        except Exception:
+            cumplida = False
+        self._registrar(nombre, inicio, cumplida)
+        return cumplida
+
+    def resumen(self) -> Dict:
+        """
+        Resumen de esperas para reportes.
+
+        Returns:
+            Dict: Por espera, promedio real vs sleep fijo anterior y ahorro total
+        """
+        resumen = {}
+        for nombre, stats in self.estadisticas.items():
+            n = stats.ejecuciones or 1
+            resumen[nombre] = {
+                'ejecuciones': stats.ejecuciones,
+                'condicion_cumplida': stats.cumplidas,
+                'promedio_real_ms': round(stats.tiempo_real_ms / n, 1),
+                'sleep_fijo_anterior_ms': round(stats.presupuesto_fijo_ms / n, 1),
+                'ahorro_total_s': round((stats.presupuesto_fijo_ms - stats.tiempo_real_ms) / 1000, 2),
+            }
+        return resumen
+
+
+_GESTOR_POR_DEFECTO: Optional[GestorEsperas] = None
+
+
+def obtener_gestor_esperas() -> GestorEsperas:
+    """Gestor compartido por defecto cuando no se inyecta uno explícito."""
+    global _GESTOR_POR_DEFECTO
+    if _GESTOR_POR_DEFECTO is None:
+        _GESTOR_POR_DEFECTO = GestorEsperas()
+    return _GESTOR_POR_DEFECTO
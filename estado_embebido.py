@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+ESTADO EMBEBIDO Y XHR - SCRAPER MERCADOLIBRE
+============================================
+
+Extracción desde datos estructurados en lugar del DOM renderizado:
+- Bloques JSON-LD (<script type="application/ld+json">)
+- Estado precargado (__PRELOADED_STATE__ y similares)
+- Respuestas XHR/fetch JSON interceptadas con page.on("response")
+
+Los valores se mapean directamente a los campos de ResultadoPropiedad; las
+cascadas DOM de extractors.py solo cubren lo que aquí no se encuentre.
+"""
+
+import asyncio
+import json
+import re
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+from indice_espacial import coordenadas_validas
+from utils import parse_numeric
+
+
+# ✅ ATRIBUTOS DE LA API DE ITEMS → CAMPOS UNIVERSALES
+ATRIBUTOS_A_CAMPOS = {
+    'BEDROOMS': 'recamaras',
+    'FULL_BATHROOMS': 'banos',
+    'BATHROOMS': 'banos',
+    'COVERED_AREA': 'construccion',
+    'TOTAL_AREA': 'terreno',
+    'PARKING_LOTS': 'estacionamiento',
+}
+
+# Campos enteros según ResultadoPropiedad
+CAMPOS_ENTEROS = {'recamaras', 'estacionamiento'}
+
+# Marcadores de scripts inline con estado precargado
+MARCADORES_ESTADO = ('__PRELOADED_STATE__', '__NORDIC_RENDERING_CTX__', '__NEXT_DATA__')
+
+# Tipos JSON-LD relevantes para una publicación inmobiliaria
+TIPOS_JSON_LD = {'product', 'offer', 'house', 'singlefamilyresidence', 'apartment', 'residence', 'realestatelisting'}
+
+PATRON_ITEM_ID = re.compile(r'^MLM-?(\d+)$')
+
+# Reason: evitar recorridos patológicos sobre estados muy grandes
+MAX_NODOS_RECORRIDO = 200_000
+
+
+def _normalizar_ml_id(valor: Any) -> Optional[str]:
+    """Convierte 'MLM123' o 'MLM-123' al formato 'MLM-123' usado en las URLs."""
+    if not isinstance(valor, str):
+        return None
+    match = PATRON_ITEM_ID.match(valor.strip())
+    return f"MLM-{match.group(1)}" if match else None
+
+
+def _decodificar_script(texto: str) -> Optional[Any]:
+    """
+    Decodifica el JSON de un script, sea JSON puro o asignación 'window.X = {...};'.
+
+    Args:
+        texto (str): Contenido textual del <script>
+
+    Returns:
+        Optional[Any]: Objeto JSON o None si no se pudo decodificar
+    """
+    if not texto:
+        return None
+    texto = texto.strip()
+    try:
+        if texto[:1] in '{[':
+            return json.loads(texto)
+        for marcador in MARCADORES_ESTADO:
+            posicion = texto.find(marcador)
+            if posicion >= 0:
+                inicio = texto.find('{', posicion)
+                if inicio >= 0:
+                    return json.JSONDecoder().raw_decode(texto, inicio)[0]
+    except (ValueError, TypeError):
+        return None
+    return None
+
+
+def _recorrer(raiz: Any) -> Iterable[dict]:
+    """Recorre iterativamente todos los dicts anidados de un objeto JSON."""
+    pila = [raiz]
+    visitados = 0
+    while pila and visitados < MAX_NODOS_RECORRIDO:
+        nodo = pila.pop()
+        visitados += 1
+        if isinstance(nodo, dict):
+            yield nodo
+            pila.extend(v for v in nodo.values() if isinstance(v, (dict, list)))
+        elif isinstance(nodo, list):
+            pila.extend(v for v in nodo if isinstance(v, (dict, list)))
+
+
+def _valor_atributo(campo: str, atributo: dict) -> Optional[float]:
+    """Obtiene valor numérico de un atributo de la API (value_struct o value_name)."""
+    estructura = atributo.get('value_struct') or {}
+    valor = estructura.get('number') if isinstance(estructura, dict) else None
+    if valor is None:
+        valor = parse_numeric(str(atributo.get('value_name') or ''))
+    if valor is None:
+        return None
+    return int(valor) if campo in CAMPOS_ENTEROS else valor
+
+
+def _coordenadas(objeto: Any) -> Optional[tuple]:
+    """(latitud, longitud) de un nodo {latitude, longitude} (item.location, JSON-LD geo)."""
+    if not isinstance(objeto, dict):
+        return None
+    return coordenadas_validas(objeto.get('latitude'), objeto.get('longitude'))
+
+
+def _aplicar_coordenadas(coordenadas: Optional[tuple], estado: Dict) -> None:
+    if coordenadas and estado.get('latitud') is None:
+        estado['latitud'], estado['longitud'] = coordenadas
+
+
+def _aplicar_item(item: dict, estado: Dict) -> None:
+    """Mapea un objeto con forma de item de MercadoLibre a campos universales."""
+    ml_id = _normalizar_ml_id(item.get('id'))
+    if ml_id and not estado.get('ml_id'):
+        estado['ml_id'] = ml_id
+
+    precio = item.get('price')
+    if isinstance(precio, (int, float)) and precio > 0 and estado.get('precio') is None:
+        estado['precio'] = float(precio)
+        moneda = item.get('currency_id')
+        if isinstance(moneda, str) and moneda:
+            estado['moneda'] = moneda.upper()
+
+    titulo = item.get('title')
+    if isinstance(titulo, str) and titulo.strip() and not estado.get('titulo'):
+        estado['titulo'] = titulo.strip()
+
+    vendedor = item.get('seller')
+    if isinstance(vendedor, dict):
+        nickname = vendedor.get('nickname') or vendedor.get('name')
+        if isinstance(nickname, str) and nickname.strip() and not estado.get('vendedor'):
+            estado['vendedor'] = nickname.strip()
+
+    _aplicar_coordenadas(_coordenadas(item.get('location')) or _coordenadas(item.get('geolocation')), estado)
+
+    atributos = item.get('attributes')
+    if isinstance(atributos, list):
+        for atributo in atributos:
+            if not isinstance(atributo, dict):
+                continue
+            nombre = atributo.get('name')
+            valor_texto = atributo.get('value_name')
+            if isinstance(nombre, str) and isinstance(valor_texto, str) and nombre and valor_texto:
+                estado['atributos'].setdefault(nombre.strip(), valor_texto.strip())
+
+            campo = ATRIBUTOS_A_CAMPOS.get(str(atributo.get('id', '')).upper())
+            if campo and estado.get(campo) is None:
+                estado[campo] = _valor_atributo(campo, atributo)
+
+
+def _aplicar_json_ld(objeto: dict, estado: Dict, ml_id_esperado: Optional[str]) -> None:
+    """Mapea un nodo JSON-LD (Product/Offer/Residence) a campos universales."""
+    tipo = objeto.get('@type')
+    tipos = tipo if isinstance(tipo, list) else [tipo]
+    if not any(isinstance(t, str) and t.lower() in TIPOS_JSON_LD for t in tipos):
+        return
+
+    for clave in ('sku', 'productID'):
+        ml_id = _normalizar_ml_id(objeto.get(clave))
+        if ml_id and ml_id_esperado and ml_id != ml_id_esperado:
+            return
+        if ml_id and not estado.get('ml_id'):
+            estado['ml_id'] = ml_id
+
+    nombre = objeto.get('name')
+    if isinstance(nombre, str) and nombre.strip() and not estado.get('titulo'):
+        estado['titulo'] = nombre.strip()
+
+    descripcion = objeto.get('description')
+    if isinstance(descripcion, str) and len(descripcion.strip()) > 20 and not estado.get('descripcion'):
+        estado['descripcion'] = descripcion.strip()
+
+    _aplicar_coordenadas(_coordenadas(objeto.get('geo')), estado)
+
+    ofertas = objeto.get('offers')
+    for oferta in (ofertas if isinstance(ofertas, list) else [ofertas]):
+        if not isinstance(oferta, dict) or estado.get('precio') is not None:
+            continue
+        precio = oferta.get('price')
+        precio = precio if isinstance(precio, (int, float)) else parse_numeric(str(precio or ''))
+        if precio:
+            estado['precio'] = float(precio)
+            moneda = oferta.get('priceCurrency')
+            if isinstance(moneda, str) and moneda:
+                estado['moneda'] = moneda.upper()
+
+
+def _es_item(nodo: dict, ml_id_esperado: Optional[str]) -> bool:
+    """
+    Heurística: dict con id MLM y precio o atributos.
+
+    Reason: el estado y los XHR incluyen items recomendados; si se conoce el
+    ml_id de la URL solo se acepta ese item.
+    """
+    ml_id = _normalizar_ml_id(nodo.get('id'))
+    if not ml_id or ('price' not in nodo and 'attributes' not in nodo):
+        return False
+    return ml_id_esperado is None or ml_id == ml_id_esperado
+
+
+def extraer_estado_embebido(scripts: Optional[Dict], respuestas: Optional[List[Dict]] = None,
+                            ml_id_esperado: Optional[str] = None) -> Dict:
+    """
+    Construye campos universales desde scripts embebidos y respuestas XHR.
+
+    Args:
+        scripts (Optional[Dict]): {'json_ld': [...], 'estado': [...]} con textos de <script>
+        respuestas (Optional[List[Dict]]): Payloads JSON interceptados ({'url', 'json'})
+        ml_id_esperado (Optional[str]): ml_id de la URL ('MLM-123') para descartar otros items
+
+    Returns:
+        Dict: Campos encontrados (precio, moneda, ml_id, recamaras, banos,
+              construccion, terreno, estacionamiento, vendedor, titulo,
+              descripcion, latitud, longitud) más 'atributos' {nombre: valor} y 'fuentes'
+
+    Examples:
+        >>> item = {'id': 'MLM123', 'price': 2500000, 'currency_id': 'MXN',
+        ...         'location': {'latitude': 18.92, 'longitude': -99.22},
+        ...         'attributes': [{'id': 'BEDROOMS', 'name': 'Recámaras', 'value_name': '3'}]}
+        >>> estado = extraer_estado_embebido(None, [{'url': 'x', 'json': item}])
+        >>> estado['ml_id'], estado['precio'], estado['recamaras'], estado['latitud']
+        ('MLM-123', 2500000.0, 3, 18.92)
+    """
+    estado = {'atributos': {}, 'fuentes': []}
+    scripts = scripts or {}
+
+    for texto in scripts.get('json_ld') or []:
+        documento = _decodificar_script(texto)
+        if documento is None:
+            continue
+        for nodo in _recorrer(documento):
+            _aplicar_json_ld(nodo, estado, ml_id_esperado)
+        estado['fuentes'].append('json_ld')
+
+    documentos = [(_decodificar_script(t), 'estado_precargado') for t in scripts.get('estado') or []]
+    documentos += [(r.get('json'), 'xhr') for r in respuestas or []]
+
+    for documento, fuente in documentos:
+        if documento is None:
+            continue
+        encontrado = False
+        for nodo in _recorrer(documento):
+            if _es_item(nodo, ml_id_esperado):
+                _aplicar_item(nodo, estado)
+                encontrado = True
+        if encontrado:
+            estado['fuentes'].append(fuente)
+
+    estado['fuentes'] = sorted(set(estado['fuentes']))
+    return estado
+
+
+def estado_es_suficiente(estado: Dict) -> bool:
+    """
+    Indica si el estado embebido cubre los campos que motivan expandir tablas.
+
+    Returns:
+        bool: True si hay precio y al menos recámaras o superficie construida
+    """
+    return (estado.get('precio') is not None and
+            (estado.get('recamaras') is not None or estado.get('construccion') is not None))
+
+
+class CapturadorRespuestas:
+    """
+    Intercepta respuestas XHR/fetch JSON de MercadoLibre para una página.
+
+    Se registra una vez por página (ScraperPrincipal._setup_session) y se
+    limpia antes de cada navegación para asociar payloads a la propiedad actual.
+    """
+
+    DOMINIOS = ('mercadolibre.com', 'mercadolibre.com.mx', 'mlstatic.com')
+    TIPOS_RECURSO = ('xhr', 'fetch')
+
+    def __init__(self, max_respuestas: int = 50, max_bytes: int = 2_000_000):
+        """Inicializa capturador con límites de memoria por página."""
+        self.respuestas = deque(maxlen=max_respuestas)
+        self.max_bytes = max_bytes
+        self._pendientes = set()
+
+    def registrar(self, page) -> None:
+        """Registra el listener page.on("response")."""
+        page.on("response", self._on_response)
+
+    def limpiar(self) -> None:
+        """Descarta respuestas de la navegación anterior."""
+        self.respuestas.clear()
+
+    def _on_response(self, response) -> None:
+        try:
+            if response.request.resource_type not in self.TIPOS_RECURSO:
+                return
+            if not any(dominio in response.url for dominio in self.DOMINIOS):
+                return
+            if 'json' not in (response.headers.get('content-type') or ''):
+                return
+            tarea = asyncio.ensure_future(self._guardar(response))
+            self._pendientes.add(tarea)
+            tarea.add_done_callback(self._pendientes.discard)
+        except Exception:
+            # Reason: un listener nunca debe interrumpir la navegación
+            pass
+
+    async def _guardar(self, response) -> None:
+        try:
+            cuerpo = await response.body()
+            if len(cuerpo) > self.max_bytes:
+                return
+            self.respuestas.append({'url': response.url, 'json': json.loads(cuerpo)})
+        except Exception:
+            pass
+
+    async def obtener_respuestas(self, timeout: float = 2.0) -> List[Dict]:
+        """
+        Espera lecturas de cuerpo en curso y devuelve los payloads capturados.
+
+        Args:
+            timeout (float): Espera máxima en segundos para cuerpos pendientes
+
+        Returns:
+            List[Dict]: Respuestas {'url', 'json'} de la página actual
+        """
+        if self._pendientes:
+            await asyncio.wait(list(self._pendientes), timeout=timeout)
+        return list(self.respuestas)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+EXPORTADOR PARQUET - SCRAPER MERCADOLIBRE
+=========================================
+
+Exporta resultados de extracción a un dataset Parquet (Arrow) columnar:
+- Columnas universales de ResultadoPropiedad con tipos fijos
+  (precio float64, recamaras int16, ...)
+- Categorías JSON como columnas map<string, string>
+- andes_table_raw como texto JSON (estructura libre)
+- Particiones hive por fecha de scraping, estado y ciudad
+
+Lee los resultados en streaming (ej. ResultadosJSONL) y escribe por lotes,
+de modo que la memoria no depende del tamaño de la ejecución.
+
+Uso:
+    python exportador_parquet.py resultados_jsonl/ dataset_parquet/
+"""
+
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from direccion_utils import parsear_ubicacion_completa
+from repositorio_propiedades import CATEGORIAS_A_COLUMNAS
+from utils import extraer_ml_id
+
+
+ESTADO_NO_ESPECIFICADO = 'No especificado'
+CIUDAD_NO_ESPECIFICADA = 'No especificada'
+
+TIPO_CATEGORIA = pa.map_(pa.string(), pa.string())
+
+# ✅ ESQUEMA DEL DATASET (columnas universales + categorías + particiones)
+ESQUEMA_PARQUET = pa.schema([
+    ('ml_id', pa.string()),
+    ('url', pa.string()),
+    ('titulo', pa.string()),
+    ('descripcion', pa.string()),
+    ('precio', pa.float64()),
+    ('moneda', pa.string()),
+    ('tipo_operacion', pa.string()),
+    ('tipo_propiedad', pa.string()),
+    ('recamaras', pa.int16()),
+    ('banos', pa.float32()),
+    ('construccion', pa.float64()),
+    ('terreno', pa.float64()),
+    ('estacionamiento', pa.int16()),
+    ('direccion', pa.string()),
+    ('vendedor', pa.string()),
+    ('pais', pa.string()),
+    ('latitud', pa.float64()),
+    ('longitud', pa.float64()),
+    *((columna, TIPO_CATEGORIA) for columna in CATEGORIAS_A_COLUMNAS),
+    ('andes_table_raw', pa.large_string()),
+    ('status', pa.string()),
+    ('error', pa.string()),
+    ('timestamp', pa.timestamp('ms')),
+    ('processing_time_seconds', pa.float32()),
+    ('property_number', pa.int32()),
+    # Columnas de partición
+    ('fecha', pa.string()),
+    ('estado', pa.string()),
+    ('ciudad', pa.string()),
+])
+
+PARTICIONES = ['fecha', 'estado', 'ciudad']
+
+RANGO_INT16 = (-2 ** 15, 2 ** 15 - 1)
+
+
+def _entero(valor, rango: tuple = RANGO_INT16) -> Optional[int]:
+    """Entero dentro del rango de la columna o None (nulo) si no es convertible."""
+    try:
+        numero = int(float(valor))
+    except (TypeError, ValueError):
+        return None
+    return numero if rango[0] <= numero <= rango[1] else None
+
+
+def _flotante(valor) -> Optional[float]:
+    try:
+        return float(valor) if valor is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _texto(valor) -> Optional[str]:
+    return None if valor is None else str(valor)
+
+
+def _mapa(valor) -> Optional[List[tuple]]:
+    """Categoría dict → pares (clave, valor) para map<string, string>."""
+    if not isinstance(valor, dict) or not valor:
+        return None
+    return [(str(k), None if v is None else str(v)) for k, v in valor.items()]
+
+
+def _fecha_hora(valor) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(valor) if valor else None
+    except (TypeError, ValueError):
+        return None
+
+
+def fila_parquet(resultado: Dict) -> Dict:
+    """
+    Convierte un resultado en una fila tipada de ESQUEMA_PARQUET.
+
+    Examples:
+        >>> fila = fila_parquet({'url': 'https://casa.mercadolibre.com.mx/MLM-7-x', 'recamaras': '3',
+        ...                      'direccion': 'Centro, Cuernavaca, Morelos', 'timestamp': '2025-01-31T10:00:00',
+        ...                      'servicios': {'Agua': 'Sí'}})
+        >>> fila['ml_id'], fila['recamaras'], fila['fecha'], fila['estado'], fila['ciudad'], fila['servicios']
+        ('MLM-7', 3, '2025-01-31', 'Morelos', 'Cuernavaca', [('Agua', 'Sí')])
+    """
+    estado, ciudad = resultado.get('estado'), resultado.get('ciudad')
+    if not (estado and ciudad) and resultado.get('direccion'):
+        ubicacion = parsear_ubicacion_completa(resultado['direccion'])
+        estado, ciudad = estado or ubicacion['estado'], ciudad or ubicacion['ciudad']
+
+    momento = _fecha_hora(resultado.get('timestamp'))
+    andes_raw = resultado.get('andes_table_raw')
+
+    fila = {
+        'ml_id': resultado.get('ml_id') or extraer_ml_id(resultado.get('url')),
+        'url': resultado.get('url'),
+        'titulo': _texto(resultado.get('titulo')),
+        'descripcion': _texto(resultado.get('descripcion')),
+        'precio': _flotante(resultado.get('precio')),
+        'moneda': _texto(resultado.get('moneda')),
+        'tipo_operacion': _texto(resultado.get('tipo_operacion')),
+        'tipo_propiedad': _texto(resultado.get('tipo_propiedad')),
+        'recamaras': _entero(resultado.get('recamaras')),
+        'banos': _flotante(resultado.get('banos')),
+        'construccion': _flotante(resultado.get('construccion')),
+        'terreno': _flotante(resultado.get('terreno')),
+        'estacionamiento': _entero(resultado.get('estacionamiento')),
+        'direccion': _texto(resultado.get('direccion')),
+        'vendedor': _texto(resultado.get('vendedor')),
+        'pais': _texto(resultado.get('pais')),
+        'latitud': _flotante(resultado.get('latitud')),
+        'longitud': _flotante(resultado.get('longitud')),
+        'andes_table_raw': json.dumps(andes_raw, ensure_ascii=False) if andes_raw else None,
+        'status': _texto(resultado.get('status')),
+        'error': _texto(resultado.get('error')),
+        'timestamp': momento,
+        'processing_time_seconds': _flotante(resultado.get('processing_time_seconds')),
+        'property_number': _entero(resultado.get('property_number'), (-2 ** 31, 2 ** 31 - 1)),
+        'fecha': (momento or datetime.now()).strftime('%Y-%m-%d'),
+        'estado': estado or ESTADO_NO_ESPECIFICADO,
+        'ciudad': ciudad or CIUDAD_NO_ESPECIFICADA,
+    }
+    for columna, categoria in CATEGORIAS_A_COLUMNAS.items():
+        fila[columna] = _mapa(resultado.get(categoria))
+    return fila
+
+
+def lotes_arrow(resultados: Iterable[Dict], tamano_lote: int = 10_000) -> Iterator[pa.RecordBatch]:
+    """
+    Agrupa resultados en RecordBatch de ESQUEMA_PARQUET.
+
+    Args:
+        resultados (Iterable[Dict]): Resultados (lista o stream)
+        tamano_lote (int): Filas por lote
+
+    Yields:
+        pa.RecordBatch: Lote tipado
+    """
+    filas = []
+    for resultado in resultados:
+        filas.append(fila_parquet(resultado))
+        if len(filas) >= tamano_lote:
+            yield pa.RecordBatch.from_pylist(filas, schema=ESQUEMA_PARQUET)
+            filas = []
+    if filas:
+        yield pa.RecordBatch.from_pylist(filas, schema=ESQUEMA_PARQUET)
+
+
+def exportar_parquet(resultados: Iterable[Dict], directorio_salida: str = "dataset_parquet",
+                     tamano_lote: int = 10_000) -> Dict:
+    """
+    Escribe resultados como dataset Parquet particionado fecha=/estado=/ciudad=.
+
+    Args:
+        resultados (Iterable[Dict]): Resultados (lista o stream, ej. ResultadosJSONL)
+        directorio_salida (str): Raíz del dataset
+        tamano_lote (int): Filas por lote en memoria
+
+    Returns:
+        Dict: Métricas de la exportación
+
+    Examples:
+        >>> import tempfile, pyarrow.dataset as ds
+        >>> destino = tempfile.mkdtemp()
+        >>> exportar_parquet([{'url': 'u', 'precio': 1.5, 'estado': 'Morelos', 'ciudad': 'Cuernavaca',
+        ...                    'timestamp': '2025-01-31T10:00:00'}], destino)['filas']
+        1
+        >>> ds.dataset(destino, format='parquet', partitioning='hive').to_table(columns=['precio']).to_pylist()
+        [{'precio': 1.5}]
+    """
+    contador = {'filas': 0}
+
+    def _contar(lotes):
+        for lote in lotes:
+            contador['filas'] += lote.num_rows
+            yield lote
+
+    # Reason: un nombre por exportación evita sobrescribir archivos de
+    # exportaciones anteriores en las mismas particiones
+    marca = datetime.now().strftime('%Y%m%d_%H%M%S')
+    ds.write_dataset(
+        _contar(lotes_arrow(resultados, tamano_lote)),
+        directorio_salida,
+        schema=ESQUEMA_PARQUET,
+        format='parquet',
+        partitioning=ds.partitioning(ESQUEMA_PARQUET.empty_table().select(PARTICIONES).schema, flavor='hive'),
+        basename_template=f"parte-{marca}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore',
+        file_options=ds.ParquetFileFormat().make_write_options(compression='zstd'),
+    )
+    return {'directorio': directorio_salida, 'filas': contador['filas']}
+
+
+if __name__ == "__main__":
+    from sumidero_jsonl import ResultadosJSONL
+
+    if len(sys.argv) < 2:
+        print("Uso: python exportador_parquet.py <directorio_jsonl> [directorio_salida]")
+        sys.exit(1)
+
+    # Reason: main.py escribe cada rastreo en su subdirectorio ejecucion_<id>
+    archivos = sorted(str(p) for p in Path(sys.argv[1]).rglob("*.jsonl"))
+    salida = sys.argv[2] if len(sys.argv) > 2 else "dataset_parquet"
+    metricas = exportar_parquet(ResultadosJSONL(archivos), salida)
+    print(f"✅ {metricas['filas']} propiedades exportadas a {salida}")
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+EXTRACCIÓN OFFLINE DESDE HTML - SCRAPER MERCADOLIBRE
+====================================================
+
+Backend sin browser para ExtractorHibridoOptimizado: construye desde HTML crudo
+el mismo payload que SCRIPT_EXTRACCION_PDP devuelve en una página viva, usando
+selectolax (parser Lexbor en C).
+
+Permite re-extraer páginas archivadas en un pool de procesos sin lanzar
+Chromium y probar la lógica de campos sin Playwright.
+"""
+
+import asyncio
+import contextlib
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from selectolax.lexbor import LexborHTMLParser
+
+from estado_embebido import MARCADORES_ESTADO
+from script_extraccion import SELECTORES_PDP, LONGITUD_MINIMA_DIRECCION
+
+
+@dataclass
+class DocumentoHTML:
+    """
+    Documento HTML (archivado o descargado) aceptado por extraer_datos_hibrido.
+
+    Attributes:
+        html: Contenido HTML completo de la página de detalle
+        url: URL original de la propiedad (se usa para ml_id)
+    """
+    html: str
+    url: str = ""
+
+    @classmethod
+    def desde_archivo(cls, ruta: str, url: Optional[str] = None) -> "DocumentoHTML":
+        """
+        Carga documento desde disco usando la URL canónica si no se indica una.
+
+        Args:
+            ruta (str): Ruta del archivo .html archivado
+            url (Optional[str]): URL original; si falta se toma de <link rel="canonical">
+
+        Returns:
+            DocumentoHTML: Documento listo para extracción
+        """
+        html = Path(ruta).read_text(encoding='utf-8', errors='replace')
+        if not url:
+            arbol = LexborHTMLParser(html)
+            canonical = arbol.css_first('link[rel="canonical"]') or arbol.css_first('meta[property="og:url"]')
+            if canonical is not None:
+                url = canonical.attributes.get('href') or canonical.attributes.get('content')
+        return cls(html=html, url=url or "")
+
+
+def _descendientes(raiz, selector: str) -> list:
+    """querySelectorAll: Lexbor incluye el propio nodo raíz si coincide, el DOM no."""
+    try:
+        return [n for n in raiz.css(selector) if n.mem_id != raiz.mem_id]
+    except Exception:
+        return []
+
+
+def _primero(raiz, selector: str):
+    """querySelector: primer descendiente que coincide o None"""
+    nodos = _descendientes(raiz, selector)
+    return nodos[0] if nodos else None
+
+
+def _texto(nodo) -> Optional[str]:
+    """Equivalente a textContent"""
+    return nodo.text(deep=True) if nodo is not None else None
+
+
+def _texto_visible(nodo) -> Optional[str]:
+    """Aproximación a innerText: un salto de línea por nodo de texto"""
+    return nodo.text(deep=True, separator='\n', strip=True) if nodo is not None else None
+
+
+def _cascada(selectores: List[str], raiz) -> List[list]:
+    resultados = []
+    for selector in selectores:
+        inicio = time.perf_counter()
+        valor = _texto(_primero(raiz, selector))
+        resultados.append([selector, valor, (time.perf_counter() - inicio) * 1000])
+    return resultados
+
+
+def _candidatos_direccion(raiz, selector: str) -> List[str]:
+    textos = (_texto(n) for n in _descendientes(raiz, selector))
+    return [t for t in textos if t and len(t.strip()) >= LONGITUD_MINIMA_DIRECCION]
+
+
+def _filas_tabla(tabla) -> List[list]:
+    """Replica el formato [clave_th, valor_td, celda_0, celda_1] del script en página"""
+    filas = []
+    for fila in _descendientes(tabla, 'tr'):
+        th = _primero(fila, 'th')
+        td = _primero(fila, 'td')
+        celdas = _descendientes(fila, 'th, td')
+        especifica = th is not None and td is not None
+        generica = len(celdas) >= 2
+        filas.append([
+            _texto(_primero(th, 'div') or th) if especifica else None,
+            _texto(_primero(td, 'span') or td) if especifica else None,
+            _texto(celdas[0]) if generica else None,
+            _texto(celdas[1]) if generica else None,
+        ])
+    return filas
+
+
+def _scripts_estado(raiz, sel: Dict) -> Dict[str, List[str]]:
+    """Textos de scripts JSON-LD y de estado precargado (mismo filtro que en página)"""
+    json_ld = _descendientes(raiz, sel['json_ld'])
+    ids_json_ld = {n.mem_id for n in json_ld}
+    ids_estado = {n.mem_id for n in _descendientes(raiz, sel['estado_precargado'])}
+
+    estado = []
+    for script in _descendientes(raiz, 'script'):
+        if script.mem_id in ids_json_ld:
+            continue
+        texto = _texto(script) or ''
+        if script.mem_id in ids_estado or any(m in texto for m in MARCADORES_ESTADO):
+            estado.append(texto)
+
+    return {'json_ld': [_texto(n) for n in json_ld], 'estado': estado}
+
+
+def construir_payload_html(html: str, selectores: Dict = None) -> Dict:
+    """
+    Construye el payload de extracción a partir de HTML crudo.
+
+    Args:
+        html (str): HTML completo de la página de detalle
+        selectores (Dict): Cascadas de selectores (por defecto SELECTORES_PDP)
+
+    Returns:
+        Dict: Payload con la misma forma que SCRIPT_EXTRACCION_PDP
+
+    Examples:
+        >>> payload = construir_payload_html('<h1>Casa en Venta</h1>')
+        >>> payload['titulo_texto']
+        'Casa en Venta'
+    """
+    sel = selectores or SELECTORES_PDP
+    arbol = LexborHTMLParser(html)
+    raiz = arbol.root
+
+    h1 = _primero(raiz, sel['titulo'])
+    contenedor = _primero(raiz, sel['contenedor_specs'])
+
+    tablas = None
+    if contenedor is not None:
+        tablas = [
+            {'titulos': _cascada(sel['titulo_tabla'], tabla), 'filas': _filas_tabla(tabla)}
+            for tabla in _descendientes(contenedor, sel['tabla_specs'])
+        ]
+
+    payload = {
+        'titulo_inner': _texto_visible(h1),
+        'titulo_texto': _texto(h1),
+        'descripcion': _texto_visible(_primero(raiz, sel['descripcion'])),
+        'precio': _cascada(sel['precio'], raiz),
+        'subtitulo': _cascada(sel['subtitulo'], raiz),
+        'vendedor': _cascada(sel['vendedor'], raiz),
+        'direccion': {
+            'especifica': _candidatos_direccion(raiz, sel['direccion_especifica']),
+            'general': [[s, _candidatos_direccion(raiz, s)] for s in sel['direccion_general']],
+            'lineas': [],
+        },
+        'tablas': tablas,
+        'scripts': _scripts_estado(raiz, sel),
+        'tiempo_ms': 0.0,
+    }
+
+    # Reason: innerText excluye scripts y estilos; se eliminan al final porque
+    # strip_tags modifica el árbol
+    arbol.strip_tags(['script', 'style', 'noscript', 'template'])
+    cuerpo = arbol.body.text(deep=True, separator='\n') if arbol.body is not None else ''
+    payload['direccion']['lineas'] = [
+        linea.strip() for linea in cuerpo.split('\n')
+        if len(linea.strip()) >= LONGITUD_MINIMA_DIRECCION
+    ]
+
+    return payload
+
+
+def extraer_desde_html(html: str, url: str = "", incluir_andes_raw: bool = False,
+                       silencioso: bool = True) -> Dict:
+    """
+    Ejecuta la extracción híbrida completa sobre HTML sin browser.
+
+    Args:
+        html (str): HTML de la página de detalle
+        url (str): URL original de la propiedad
+        incluir_andes_raw (bool): Incluir andes_table_raw en el resultado
+        silencioso (bool): Suprimir los logs de consola del extractor
+
+    Returns:
+        Dict: Mismo formato que ExtractorHibridoOptimizado.extraer_datos_hibrido
+    """
+    from extractors import ExtractorHibridoOptimizado
+
+    extractor = ExtractorHibridoOptimizado()
+    documento = DocumentoHTML(html=html, url=url)
+    salida = io.StringIO() if silencioso else None
+
+    with contextlib.redirect_stdout(salida) if silencioso else contextlib.nullcontext():
+        return asyncio.run(extractor.extraer_datos_hibrido(documento, incluir_andes_raw=incluir_andes_raw))
+
+
+def _extraer_archivo(ruta: str, incluir_andes_raw: bool) -> Dict:
+    """Worker de proceso: extrae un archivo archivado y anota su origen."""
+    try:
+        documento = DocumentoHTML.desde_archivo(ruta)
+        datos = extraer_desde_html(documento.html, documento.url, incluir_andes_raw)
+    except Exception as e:
+        datos = {'error': str(e), 'status': 'error'}
+    datos['archivo_origen'] = ruta
+    return datos
+
+
+def extraer_archivos_html(rutas: Iterable[str], max_workers: Optional[int] = None,
+                          incluir_andes_raw: bool = False) -> List[Dict]:
+    """
+    Re-extrae páginas archivadas en paralelo con un pool de procesos.
+
+    Args:
+        rutas (Iterable[str]): Archivos .html a procesar
+        max_workers (Optional[int]): Procesos del pool (default: núcleos de CPU)
+        incluir_andes_raw (bool): Incluir andes_table_raw en cada resultado
+
+    Returns:
+        List[Dict]: Resultados en el mismo orden que las rutas
+    """
+    rutas = list(rutas)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_extraer_archivo, rutas, [incluir_andes_raw] * len(rutas), chunksize=16))
@@ -5,31 +5,63 @@ EXTRACTORES DE DATOS - SCRAPER MERCADOLIBRE
 
 Lógica de extracción híbrida de datos de propiedades.
 Refactorizado con funciones utilitarias modulares.
+
+La lectura del DOM se hace en un solo page.evaluate (script_extraccion.py) o,
+sin browser, desde HTML crudo (extraccion_html.py); el resto del procesamiento
+ocurre en Python sobre el mismo payload. El estado embebido (JSON-LD, estado
+precargado, XHR) tiene prioridad y las cascadas DOM actúan como fallback.
 """
 
-import re
 import asyncio
 from datetime import datetime
 from typing import Dict, Optional
 from playwright.async_api import Page
 
 # Importar funciones utilitarias refactorizadas
-from utils import parse_numeric
-from direccion_utils import es_probable_direccion, parsear_ubicacion_completa
+from utils import extraer_ml_id
+from mapeo_campos import campos_basicos, categoria_estandar
+from direccion_utils import clasificar_direcciones, es_probable_direccion, parsear_ubicacion_completa
+from script_extraccion import SCRIPT_EXTRACCION_PDP, SELECTORES_PDP, argumentos_script
+from extraccion_html import DocumentoHTML, construir_payload_html
+from estado_embebido import extraer_estado_embebido, estado_es_suficiente
+from cascada_selectores import RegistroCascadas, obtener_registro_cascadas
+from esperas import GestorEsperas, obtener_gestor_esperas, SELECTOR_FILAS_SPECS
 
 
 class ExtractorHibridoOptimizado:
     """Extractor híbrido optimizado para MercadoLibre"""
     
-    def __init__(self):
-        """Inicializa extractor"""
-        pass
+    def __init__(self, registro_cascadas: Optional[RegistroCascadas] = None,
+                 esperas: Optional[GestorEsperas] = None):
+        """
+        Inicializa extractor
+        
+        Args:
+            registro_cascadas: Registro compartido de estadísticas de selectores
+            esperas: Gestor compartido de esperas por condición
+        """
+        self.registro_cascadas = registro_cascadas or obtener_registro_cascadas()
+        self.esperas = esperas or obtener_gestor_esperas()
     
     async def extraer_andes_table_completa_json(self, page, navigator=None) -> dict:
         """Extrae tablas andes como JSON estructurado con expansión automática"""
         
         print("🔄 Iniciando extracción completa de tablas andes...")
         
+        try:
+            await self._expandir_caracteristicas(page, navigator)
+            await self.esperas.esperar_filas_estables(page, 'filas_specs_completo', SELECTOR_FILAS_SPECS)
+            payload = await self._obtener_payload(page)
+            return self._construir_andes_desde_payload(payload.get('tablas'))
+            
+        except Exception as e:
+            print(f"❌ Error en extracción: {e}")
+            andes_data = self._construir_andes_desde_payload(None, verbose=False)
+            andes_data["error"] = str(e)
+            return andes_data
+
+    def _construir_andes_desde_payload(self, tablas, verbose: bool = True) -> dict:
+        """Construye andes_table_raw desde las tablas del payload en página"""
         andes_data = {
             "categorias": {},
             "metadata": {
@@ -39,161 +71,128 @@ class ExtractorHibridoOptimizado:
             }
         }
         
-        try:
-            # 🎯 EXPANDIR CARACTERÍSTICAS usando NavigatorStealth si está disponible
-            if navigator and hasattr(navigator, 'click_expand_characteristics_button'):
-                expansion_success = await navigator.click_expand_characteristics_button(page)
-                if expansion_success:
-                    print("✅ Expansión de características exitosa")
-                else:
-                    print("⚠️ No se pudo expandir características, continuando...")
-            else:
-                # Fallback: método original de expansión
-                print("🔍 Usando método de expansión fallback...")
-                await self._expand_characteristics_fallback(page)
-            
-            await page.wait_for_timeout(1000)
-            
-            # 🎯 BUSCAR CONTENEDOR PRINCIPAL DE ESPECIFICACIONES TÉCNICAS
-            main_container = await page.query_selector('.ui-pdp-container__row.ui-pdp-container__row--technical-specifications')
-            
-            if not main_container:
+        if tablas is None:
+            if verbose:
                 print("⚠️ No se encontró contenedor principal de especificaciones técnicas")
-                return andes_data
-            
-            print("✅ Contenedor principal encontrado")
-            
-            # 📦 EXTRAER CATEGORÍAS USANDO ESTRUCTURA CORRECTA
-            category_tables = await main_container.query_selector_all('.ui-vpp-striped-specs__table')
-            
-            if not category_tables:
-                print("⚠️ No se encontraron tablas de categorías (.ui-vpp-striped-specs__table)")
-                return andes_data
-            
-            print(f"✅ Encontradas {len(category_tables)} categorías")
-            
-            total_categories = 0
-            total_fields = 0
-            
-            for category_table in category_tables:
-                try:
-                    # 🏷️ EXTRAER TÍTULO DE CATEGORÍA
-                    category_name = "categoria_sin_nombre"
-                    
-                    # Buscar título de categoría (puede estar en h3, h4, o elementos con clases específicas)
-                    title_selectors = [
-                        'h3', 'h4', 'h2',
-                        '.ui-vpp-striped-specs__header',
-                        '[class*="header"]',
-                        '[class*="title"]'
-                    ]
-                    
-                    for selector in title_selectors:
-                        title_element = await category_table.query_selector(selector)
-                        if title_element:
-                            title_text = await title_element.text_content()
-                            if title_text and len(title_text.strip()) > 0:
-                                category_name = title_text.strip().lower().replace(' ', '_').replace('ñ', 'n').replace(':', '').replace('-', '_')
-                                break
-                    
-                    # Si no encontró título, usar índice
-                    if category_name == "categoria_sin_nombre":
-                        category_name = f"categoria_{total_categories + 1}"
-                    
-                    print(f"   📋 Procesando categoría: '{category_name}'")
-                    
-                    # 📊 EXTRAER FILAS DE DATOS
-                    category_data = {}
-                    
-                    # Buscar todas las filas de la tabla
-                    rows = await category_table.query_selector_all('tr')
-                    
-                    for row in rows:
-                        try:
-                            # Buscar th y td según la estructura descrita
-                            th_element = await row.query_selector('th')
-                            td_element = await row.query_selector('td')
-                            
-                            if th_element and td_element:
-                                # Extraer nombre del campo (th + div)
-                                field_name_div = await th_element.query_selector('div')
-                                if field_name_div:
-                                    field_name = await field_name_div.text_content()
-                                else:
-                                    field_name = await th_element.text_content()
-                                
-                                # Extraer valor del campo (td + span)
-                                field_value_span = await td_element.query_selector('span')
-                                if field_value_span:
-                                    field_value = await field_value_span.text_content()
-                                else:
-                                    field_value = await td_element.text_content()
-                                
-                                # Limpiar y validar
-                                if field_name and field_value:
-                                    field_name_clean = field_name.strip()
-                                    field_value_clean = field_value.strip()
-                                    
-                                    if (field_name_clean and field_value_clean and 
-                                        field_name_clean != field_value_clean and 
-                                        len(field_name_clean) > 1):
-                                        
-                                        category_data[field_name_clean] = field_value_clean
-                                        
-                        except Exception as row_error:
-                            # Si falla la estructura específica, intentar método genérico
-                            try:
-                                cells = await row.query_selector_all('th, td')
-                                if len(cells) >= 2:
-                                    key = await cells[0].text_content()
-                                    value = await cells[1].text_content()
-                                    
-                                    if key and value:
-                                        key_clean = key.strip()
-                                        value_clean = value.strip()
-                                        
-                                        if (key_clean and value_clean and 
-                                            key_clean != value_clean and 
-                                            len(key_clean) > 1):
-                                            category_data[key_clean] = value_clean
-                            except:
-                                continue
-                    
-                    # 💾 GUARDAR CATEGORÍA SI TIENE DATOS
-                    if category_data:
-                        andes_data["categorias"][category_name] = category_data
-                        total_categories += 1
-                        total_fields += len(category_data)
-                        print(f"     ✅ {len(category_data)} campos extraídos")
-                    else:
-                        print(f"     ⚠️ No se encontraron datos en esta categoría")
-                        
-                except Exception as category_error:
-                    print(f"     ❌ Error procesando categoría: {category_error}")
-                    continue
-            
-            andes_data["metadata"]["total_categorias"] = total_categories
-            andes_data["metadata"]["total_campos"] = total_fields
-            
-            print(f"✅ Extracción completa: {total_categories} categorías, {total_fields} campos")
-            
             return andes_data
-            
-        except Exception as e:
-            print(f"❌ Error en extracción: {e}")
-            andes_data["error"] = str(e)
+        
+        if not tablas:
+            print("⚠️ No se encontraron tablas de categorías (.ui-vpp-striped-specs__table)")
+            return andes_data
+        
+        print(f"✅ Encontradas {len(tablas)} categorías")
+        
+        total_categories = 0
+        total_fields = 0
+        
+        for tabla in tablas:
+            # 🏷️ TÍTULO DE CATEGORÍA (h3, h4, h2 o elementos con clases de header/title)
+            category_name = self._nombre_categoria(tabla.get('titulos', []), SELECTORES_PDP['titulo_tabla'])
+            if not category_name:
+                category_name = f"categoria_{total_categories + 1}"
+            
+            print(f"   📋 Procesando categoría: '{category_name}'")
+            
+            # 📊 FILAS: estructura específica th > div / td > span
+            category_data = {}
+            for clave, valor, _, _ in tabla.get('filas', []):
+                self._agregar_campo_tabla(category_data, clave, valor)
+            
+            # 💾 GUARDAR CATEGORÍA SI TIENE DATOS
+            if category_data:
+                andes_data["categorias"][category_name] = category_data
+                total_categories += 1
+                total_fields += len(category_data)
+                print(f"     ✅ {len(category_data)} campos extraídos")
+            else:
+                print(f"     ⚠️ No se encontraron datos en esta categoría")
+        
+        andes_data["metadata"]["total_categorias"] = total_categories
+        andes_data["metadata"]["total_campos"] = total_fields
+        
+        print(f"✅ Extracción completa: {total_categories} categorías, {total_fields} campos")
         
         return andes_data
 
-    async def extraer_datos_hibrido(self, page, descripcion_respaldo: str = None, navigator=None, incluir_andes_raw=True) -> dict:
+    def _nombre_categoria(self, titulos, selectores_permitidos) -> Optional[str]:
+        """Normaliza el primer título de tabla disponible según el orden de la cascada"""
+        ganador = self.registro_cascadas.evaluar(
+            'titulo_tabla', selectores_permitidos, titulos, lambda t: len(t.strip()) > 0
+        )
+        if not ganador:
+            return None
+        return ganador[1].strip().lower().replace(' ', '_').replace('ñ', 'n').replace(':', '').replace('-', '_')
+
+    @staticmethod
+    def _agregar_campo_tabla(categoria_data: dict, key, value) -> None:
+        """Agrega par clave/valor de una fila si pasa las validaciones básicas"""
+        if not key or not value:
+            return
+        
+        key_clean = key.strip()
+        value_clean = value.strip()
+        
+        if (key_clean and value_clean and 
+            key_clean != value_clean and 
+            len(key_clean) > 1):
+            categoria_data[key_clean] = value_clean
+
+    # Campos que el estado embebido puede aportar (prioridad sobre el DOM)
+    CAMPOS_ESTADO_EMBEBIDO = ['ml_id', 'titulo', 'descripcion', 'precio', 'moneda', 'vendedor',
+                              'recamaras', 'banos', 'construccion', 'terreno', 'estacionamiento',
+                              'latitud', 'longitud']
+
+    def _aplicar_estado_embebido(self, estado: dict, datos: dict) -> None:
+        """Sobrescribe con valores del estado embebido; el DOM queda como fallback"""
+        aplicados = 0
+        for campo in self.CAMPOS_ESTADO_EMBEBIDO:
+            if estado.get(campo) is not None:
+                datos[campo] = estado[campo]
+                aplicados += 1
+        if aplicados:
+            print(f"   🧬 {aplicados} campos tomados del estado embebido")
+
+    async def _expandir_caracteristicas(self, page, navigator=None) -> bool:
+        """Expande características usando NavigatorStealth si está disponible"""
+        if navigator and hasattr(navigator, 'click_expand_characteristics_button'):
+            expansion_success = await navigator.click_expand_characteristics_button(page)
+            if expansion_success:
+                print("✅ Expansión de características exitosa")
+            else:
+                print("⚠️ No se pudo expandir características, continuando...")
+            return expansion_success
+        
+        # Fallback: método original de expansión
+        print("🔍 Usando método de expansión fallback...")
+        return await self._expand_characteristics_fallback(page)
+
+    async def _obtener_payload(self, fuente) -> dict:
+        """
+        Captura todos los textos necesarios desde una página viva o un DocumentoHTML
+        
+        Ambos backends devuelven el mismo payload: page.evaluate del script en
+        página o parsing offline con selectolax.
+        """
+        if isinstance(fuente, DocumentoHTML):
+            payload = construir_payload_html(fuente.html)
+            print("   ⚡ Payload construido desde HTML offline")
+            return payload
+        
+        payload = await fuente.evaluate(SCRIPT_EXTRACCION_PDP, argumentos_script())
+        print(f"   ⚡ DOM capturado en un round-trip ({payload.get('tiempo_ms', 0):.1f} ms en página)")
+        return payload
+
+    async def extraer_datos_hibrido(self, page, descripcion_respaldo: str = None, navigator=None, incluir_andes_raw=True,
+                                    respuestas_xhr: list = None) -> dict:
         """
         Extracción híbrida completa con bypass integrado
         
         Args:
-            page: Página de Playwright
+            page: Página de Playwright o DocumentoHTML (backend offline sin browser)
             descripcion_respaldo: Descripción de respaldo (opcional)
             navigator: NavigatorStealth para expansión de características
             incluir_andes_raw: Si False, omite andes_table_raw para mayor velocidad
+            respuestas_xhr: Payloads JSON interceptados por CapturadorRespuestas (opcional)
         """
         print("🚀 EXTRACCIÓN HÍBRIDA ULTRA AVANZADA 2025")
         print("=" * 60)
@@ -202,16 +201,36 @@ class ExtractorHibridoOptimizado:
         datos = {}
         
         try:
+            # ✅ 0. CAPTURA DEL DOM + ESTADO EMBEBIDO (JSON-LD, preloaded state, XHR)
+            payload = await self._obtener_payload(page)
+            estado = extraer_estado_embebido(payload.get('scripts'), respuestas_xhr, extraer_ml_id(page.url))
+            if estado['fuentes']:
+                print(f"   🧬 Estado embebido encontrado en: {', '.join(estado['fuentes'])}")
+            
+            # Reason: la expansión solo hace falta si el estado embebido no trae los
+            # atributos o si se pide andes_table_raw completo
+            if not isinstance(page, DocumentoHTML):
+                if incluir_andes_raw or not estado_es_suficiente(estado):
+                    print("🧭 Expandiendo características y recapturando DOM...")
+                    await self._expandir_caracteristicas(page, navigator)
+                    await self.esperas.esperar_filas_estables(
+                        page, 'filas_specs_completo' if incluir_andes_raw else 'filas_specs_optimizado',
+                        SELECTOR_FILAS_SPECS
+                    )
+                    payload = await self._obtener_payload(page)
+                else:
+                    print("   ⚡ Estado embebido suficiente - se omite expansión de características")
+            
             # ✅ 1. METADATOS UNIVERSALES
             print("📋 Extrayendo metadatos universales...")
-            await self._extraer_metadatos_universales(page, datos)
+            self._extraer_metadatos_universales(payload, page.url, datos)
             
             # ✅ 2. CAMPOS ESTRUCTURADOS BÁSICOS
             print("🔢 Extrayendo campos estructurados...")
-            await self._extraer_precio_y_moneda(page, datos)
-            await self._extraer_tipo_propiedad_y_operacion(page, datos)
-            await self._extraer_vendedor(page, datos)
-            await self._extraer_direccion(page, datos)
+            self._extraer_precio_y_moneda(payload, datos)
+            self._extraer_tipo_propiedad_y_operacion(payload, datos)
+            self._extraer_vendedor(payload, datos)
+            self._extraer_direccion(payload, datos)
             
             # Parsear ubicación completa
             if datos.get('direccion'):
@@ -222,16 +241,16 @@ class ExtractorHibridoOptimizado:
             print("📦 Extrayendo categorías dinámicas...")
             
             if incluir_andes_raw:
-                # Modo completo: extraer todo el raw data (más lento)
+                # Modo completo: conservar todo el raw data
                 print("   🔄 Modo completo: extrayendo andes_table_raw completo...")
-                andes_raw = await self.extraer_andes_table_completa_json(page, navigator)
+                andes_raw = self._construir_andes_desde_payload(payload.get('tablas'))
                 categorias_json = await self._organizar_categorias_json_optimizado(andes_raw.get('categorias', {}))
                 datos['andes_table_raw'] = andes_raw if andes_raw.get('categorias') else None
                 print(f"   📋 andes_table_raw incluido para respaldo completo")
             else:
-                # Modo optimizado: solo categorías estructuradas (más rápido)
+                # Modo optimizado: solo categorías estructuradas
                 print("   ⚡ Modo optimizado: extrayendo solo categorías necesarias...")
-                categorias_raw = await self._extraer_categorias_optimizado(page, navigator)
+                categorias_raw = self._categorias_desde_payload(payload.get('tablas'))
                 categorias_json = await self._organizar_categorias_json_optimizado(categorias_raw)
                 print(f"   ⚡ andes_table_raw omitido para optimización de velocidad")
             
@@ -244,14 +263,19 @@ class ExtractorHibridoOptimizado:
             
             # ✅ 4. EXTRAER CAMPOS BÁSICOS ESTRUCTURADOS desde categorías principales
             # IMPORTANTE: Los agregamos justo después de las categorías para mejor organización
+            if estado['atributos'] and not datos.get('principales'):
+                datos['principales'] = dict(estado['atributos'])
+                print(f"   📦 Categoría 'principales' desde estado embebido con {len(estado['atributos'])} campos")
+            
             print("🔢 Extrayendo campos básicos desde categorías...")
             await self._extraer_campos_basicos_desde_categorias(datos)
+            self._aplicar_estado_embebido(estado, datos)
             
             # ✅ 5. REORGANIZAR DATOS: Mover campos básicos al inicio para mejor legibilidad
             datos_reorganizados = {}
             
             # Primero: Metadatos universales
-            campos_metadatos = ['ml_id', 'titulo', 'descripcion', 'direccion', 'pais', 'estado', 'ciudad']
+            campos_metadatos = ['ml_id', 'titulo', 'descripcion', 'direccion', 'pais', 'estado', 'ciudad', 'latitud', 'longitud']
             for campo in campos_metadatos:
                 if campo in datos:
                     datos_reorganizados[campo] = datos[campo]
@@ -298,23 +322,16 @@ class ExtractorHibridoOptimizado:
 
     # Funciones numéricas movidas a utils.py
 
-    async def _extraer_precio_y_moneda(self, page, datos):
+    def _extraer_precio_y_moneda(self, payload, datos):
         """Extrae precio y moneda"""
         try:
-            price_selectors = ['.price-tag-fraction', '.andes-money-amount__fraction', '.ui-pdp-price__fraction']
-            
-            for selector in price_selectors:
-                try:
-                    price_element = await page.query_selector(selector)
-                    if price_element:
-                        price_text = await price_element.text_content()
-                        if price_text and price_text.strip():
-                            precio_limpio = price_text.strip().replace(',', '').replace('.', '').replace('$', '')
-                            if precio_limpio.isdigit():
-                                datos['precio'] = float(precio_limpio)
-                                break
-                except:
-                    continue
+            limpiar = lambda t: t.strip().replace(',', '').replace('.', '').replace('$', '')
+            ganador = self.registro_cascadas.evaluar(
+                'precio', SELECTORES_PDP['precio'], payload.get('precio', []),
+                lambda t: bool(t.strip()) and limpiar(t).isdigit()
+            )
+            if ganador:
+                datos['precio'] = float(limpiar(ganador[1]))
             
             if datos['precio'] and not datos['moneda']:
                 datos['moneda'] = 'MXN'
@@ -322,7 +339,7 @@ class ExtractorHibridoOptimizado:
         except Exception as e:
             print(f"⚠️ Error extrayendo precio: {e}")
 
-    async def _extraer_tipo_propiedad_y_operacion(self, page, datos):
+    def _extraer_tipo_propiedad_y_operacion(self, payload, datos):
         """
         Extrae tipo de propiedad y operación desde el div ui-pdp-header__subtitle
         Estructura: <div class="ui-pdp-header__subtitle"><span class="ui-pdp-subtitle">Casa en Venta</span></div>
@@ -334,28 +351,16 @@ class ExtractorHibridoOptimizado:
         try:
             print("🏷️ Extrayendo tipo de propiedad y operación desde subtitle...")
             
-            # ===== ESTRATEGIA 1: Selector específico del subtitle =====
-            subtitle_selectors = [
-                '.ui-pdp-subtitle',                              # 1. Simple y directo
-                '.ui-pdp-header__subtitle .ui-pdp-subtitle',     # 2. Específico por contexto  
-                '.ui-pdp-header__subtitle span',                 # 3. Por tipo de elemento
-                'span.ui-pdp-subtitle'                           # 4. Por elemento + clase
-            ]
-            
+            # ===== ESTRATEGIA 1: Cascada de selectores del subtitle =====
             subtitle_text = None
             
-            for selector in subtitle_selectors:
-                try:
-                    subtitle_element = await page.query_selector(selector)
-                    if subtitle_element:
-                        subtitle_text = await subtitle_element.text_content()
-                        if subtitle_text and len(subtitle_text.strip()) > 3:
-                            subtitle_text = subtitle_text.strip()
-                            print(f"  🎯 Subtitle encontrado con '{selector}': '{subtitle_text}'")
-                            break
-                except Exception as e:
-                    print(f"     ⚠️ Error con selector {selector}: {e}")
-                    continue
+            ganador = self.registro_cascadas.evaluar(
+                'subtitulo', SELECTORES_PDP['subtitulo'], payload.get('subtitulo', []),
+                lambda t: len(t.strip()) > 3
+            )
+            if ganador:
+                subtitle_text = ganador[1].strip()
+                print(f"  🎯 Subtitle encontrado con '{ganador[0]}': '{subtitle_text}'")
             
             # ===== PARSEAR TIPO DE PROPIEDAD Y OPERACIÓN =====
             if subtitle_text:
@@ -385,32 +390,26 @@ class ExtractorHibridoOptimizado:
             if not datos['tipo_propiedad'] or not datos['tipo_operacion']:
                 print("  🔄 Aplicando estrategia fallback desde título...")
                 
-                try:
-                    title_element = await page.query_selector('h1')
-                    if title_element:
-                        title_text = await title_element.text_content()
-                        if title_text:
-                            title_lower = title_text.lower()
-                            
-                            # Solo completar campos faltantes
-                            if not datos['tipo_propiedad']:
-                                if any(word in title_lower for word in ['casa', 'casas']):
-                                    datos['tipo_propiedad'] = 'casa'
-                                elif any(word in title_lower for word in ['departamento', 'departamentos', 'depto']):
-                                    datos['tipo_propiedad'] = 'departamento'
-                                elif any(word in title_lower for word in ['terreno', 'terrenos']):
-                                    datos['tipo_propiedad'] = 'terreno'
-                            
-                            if not datos['tipo_operacion']:
-                                if any(word in title_lower for word in ['venta', 'ventas', 'remate']):
-                                    datos['tipo_operacion'] = 'venta'
-                                elif any(word in title_lower for word in ['renta', 'rentas', 'alquiler']):
-                                    datos['tipo_operacion'] = 'renta'
-                            
-                            print(f"  🔄 Fallback desde título: tipo_propiedad='{datos['tipo_propiedad']}', tipo_operacion='{datos['tipo_operacion']}'")
-                            
-                except Exception as e:
-                    print(f"     ⚠️ Error en fallback desde título: {e}")
+                title_text = payload.get('titulo_texto')
+                if title_text:
+                    title_lower = title_text.lower()
+                    
+                    # Solo completar campos faltantes
+                    if not datos['tipo_propiedad']:
+                        if any(word in title_lower for word in ['casa', 'casas']):
+                            datos['tipo_propiedad'] = 'casa'
+                        elif any(word in title_lower for word in ['departamento', 'departamentos', 'depto']):
+                            datos['tipo_propiedad'] = 'departamento'
+                        elif any(word in title_lower for word in ['terreno', 'terrenos']):
+                            datos['tipo_propiedad'] = 'terreno'
+                    
+                    if not datos['tipo_operacion']:
+                        if any(word in title_lower for word in ['venta', 'ventas', 'remate']):
+                            datos['tipo_operacion'] = 'venta'
+                        elif any(word in title_lower for word in ['renta', 'rentas', 'alquiler']):
+                            datos['tipo_operacion'] = 'renta'
+                    
+                    print(f"  🔄 Fallback desde título: tipo_propiedad='{datos['tipo_propiedad']}', tipo_operacion='{datos['tipo_operacion']}'")
             
             # ===== VALORES POR DEFECTO FINALES =====
             if not datos['tipo_propiedad']:
@@ -430,7 +429,7 @@ class ExtractorHibridoOptimizado:
             datos['tipo_operacion'] = datos.get('tipo_operacion') or 'venta'
             print(f"🆘 Fallbacks de emergencia aplicados: '{datos['tipo_propiedad']}' en '{datos['tipo_operacion']}'")
 
-    async def _extraer_vendedor(self, page, datos):
+    def _extraer_vendedor(self, payload, datos):
         """
         Extrae información del vendedor desde el div ui-vip-profile-info__info-container
         Estructura: <div class="ui-vip-profile-info__info-container">
@@ -445,28 +444,16 @@ class ExtractorHibridoOptimizado:
         try:
             print("👤 Extrayendo información del vendedor...")
             
-            # ===== ESTRATEGIA 1: Selectores CSS cascada para el vendedor =====
-            vendedor_selectors = [
-                '.ui-vip-profile-info__info-container .ui-vip-profile-info__info-link h3',  # 1. Selector completo específico
-                '.ui-vip-profile-info__info-container h3',                                  # 2. Selector directo al h3
-                '.ui-vip-profile-info__info-link h3',                                       # 3. Desde el link directo
-                'h3.ui-pdp-color--BLACK.ui-pdp-size--XSMALL.ui-pdp-family--REGULAR'        # 4. Por clases específicas del h3
-            ]
-            
+            # ===== ESTRATEGIA 1: Cascada de selectores CSS para el vendedor =====
             vendedor_text = None
             
-            for selector in vendedor_selectors:
-                try:
-                    vendedor_element = await page.query_selector(selector)
-                    if vendedor_element:
-                        vendedor_text = await vendedor_element.text_content()
-                        if vendedor_text and len(vendedor_text.strip()) > 1:
-                            vendedor_text = vendedor_text.strip()
-                            print(f"  🎯 Vendedor encontrado con '{selector}': '{vendedor_text}'")
-                            break
-                except Exception as e:
-                    print(f"     ⚠️ Error con selector {selector}: {e}")
-                    continue
+            ganador = self.registro_cascadas.evaluar(
+                'vendedor', SELECTORES_PDP['vendedor'], payload.get('vendedor', []),
+                lambda t: len(t.strip()) > 1
+            )
+            if ganador:
+                vendedor_text = ganador[1].strip()
+                print(f"  🎯 Vendedor encontrado con '{ganador[0]}': '{vendedor_text}'")
             
             # ===== ASIGNAR RESULTADO =====
             if vendedor_text:
@@ -481,69 +468,34 @@ class ExtractorHibridoOptimizado:
             # Garantizar valor por defecto en caso de error
             datos['vendedor'] = "Error en extracción"
 
-    async def _extraer_direccion(self, page, datos):
+    def _extraer_direccion(self, payload, datos):
         """Extrae dirección usando múltiples estrategias mejoradas"""
         try:
             print("🔍 Iniciando extracción mejorada de dirección...")
+            candidatos = payload.get('direccion') or {}
             
             # ===== ESTRATEGIA 1: Selector original =====
-            try:
-                print("   📍 Estrategia 1: Selector específico original...")
-                address_elements = await page.query_selector_all('p.ui-pdp-color--BLACK.ui-pdp-size--SMALL.ui-pdp-family--REGULAR.ui-pdp-media__title')
-                
-                for address_element in address_elements:
-                    address_text = await address_element.text_content()
-                    if address_text and es_probable_direccion(address_text.strip()):
-                        datos['direccion'] = address_text.strip()
-                        print(f"  📍 Dirección encontrada (E1): {datos['direccion']}")
-                        return
-                        
-            except Exception as e:
-                print(f"     ⚠️ Error en estrategia 1: {e}")
+            for address_text in candidatos.get('especifica', []):
+                if address_text and es_probable_direccion(address_text.strip()):
+                    datos['direccion'] = address_text.strip()
+                    print(f"  📍 Dirección encontrada (E1): {datos['direccion']}")
+                    return
 
             # ===== ESTRATEGIA 2: Selectores más generales =====
-            try:
-                print("   📍 Estrategia 2: Selectores generales...")
-                
-                selectors = [
-                    'p[class*="ui-pdp"]',
-                    'span[class*="ui-pdp"]',
-                    '.ui-pdp-container p',
-                    '.ui-pdp-media__title',
-                    'p.ui-pdp-color--BLACK'
-                ]
-                
-                for selector in selectors:
-                    elements = await page.query_selector_all(selector)
-                    
-                    for element in elements:
-                        text = await element.text_content()
-                        if text and es_probable_direccion(text.strip()):
-                            datos['direccion'] = text.strip()
-                            print(f"  📍 Dirección encontrada (E2): {datos['direccion']}")
-                            return
-                            
-            except Exception as e:
-                print(f"     ⚠️ Error en estrategia 2: {e}")
+            for selector, textos in candidatos.get('general', []):
+                for text in textos:
+                    if text and es_probable_direccion(text.strip()):
+                        datos['direccion'] = text.strip()
+                        print(f"  📍 Dirección encontrada (E2): {datos['direccion']}")
+                        return
 
             # ===== ESTRATEGIA 3: Buscar en todo el texto visible =====
-            try:
-                print("   📍 Estrategia 3: Búsqueda en texto completo...")
-                
-                page_text = await page.evaluate("() => document.body.innerText")
-                
-                if page_text:
-                    lines = page_text.split('\n')
-                    
-                    for line in lines:
-                        line_clean = line.strip()
-                        if es_probable_direccion(line_clean):
-                            datos['direccion'] = line_clean
-                            print(f"  📍 Dirección encontrada (E3): {datos['direccion']}")
-                            return
-                        
-            except Exception as e:
-                print(f"     ⚠️ Error en estrategia 3: {e}")
+            lineas = [line.strip() for line in candidatos.get('lineas', [])]
+            for line_clean, es_direccion in zip(lineas, clasificar_direcciones(lineas)):
+                if es_direccion:
+                    datos['direccion'] = line_clean
+                    print(f"  📍 Dirección encontrada (E3): {datos['direccion']}")
+                    return
 
             print("  ❌ No se pudo extraer dirección con ninguna estrategia")
                         
@@ -552,28 +504,23 @@ class ExtractorHibridoOptimizado:
 
     # Funciones de dirección movidas a direccion_utils.py
 
-    async def _extraer_metadatos_universales(self, page, datos):
+    def _extraer_metadatos_universales(self, payload, current_url, datos):
         """Extrae metadatos universales"""
         try:
             # ML ID
-            current_url = page.url
-            ml_id_match = re.search(r'(MLM-[\d]+)', current_url)
-            if ml_id_match:
-                datos['ml_id'] = ml_id_match.group(1)
+            ml_id = extraer_ml_id(current_url)
+            if ml_id:
+                datos['ml_id'] = ml_id
             
             # Título
-            title_element = await page.query_selector('h1')
-            if title_element:
-                title_text = await title_element.inner_text()
-                if title_text and len(title_text.strip()) > 5:
-                    datos['titulo'] = title_text.strip()
+            title_text = payload.get('titulo_inner')
+            if title_text and len(title_text.strip()) > 5:
+                datos['titulo'] = title_text.strip()
             
             # Descripción
-            desc_element = await page.query_selector('[data-testid="content"]')
-            if desc_element:
-                desc_text = await desc_element.inner_text()
-                if desc_text and len(desc_text.strip()) > 20:
-                    datos['descripcion'] = desc_text.strip()
+            desc_text = payload.get('descripcion')
+            if desc_text and len(desc_text.strip()) > 20:
+                datos['descripcion'] = desc_text.strip()
             
             datos['url'] = current_url
             
@@ -617,7 +564,8 @@ class ExtractorHibridoOptimizado:
                         if is_visible:
                             print(f"🖱️ Fallback: Haciendo click en: '{button_text}'")
                             await expand_button.click()
-                            await page.wait_for_timeout(3000)
+                            await self.esperas.esperar_elemento(expand_button, 'boton_expansion_oculto')
+                            await self.esperas.esperar_filas_estables(page, 'filas_tras_expansion', SELECTOR_FILAS_SPECS)
                             print("✅ Fallback: Tablas expandidas correctamente")
                             return True
                     except Exception as e:
@@ -639,35 +587,13 @@ class ExtractorHibridoOptimizado:
         categorias_finales = {}
         
         try:
-            # Mapeo de nombres de categorías conocidas
-            mapeo_categorias = {
-                'principales': ['principales', 'caracteristicas principales', 'caracteristicas_principales'],
-                'servicios': ['servicios', 'servicio'],
-                'ambientes': ['ambientes', 'ambiente'],
-                'seguridad': ['seguridad', 'proteccion'],
-                'comodidades_y_equipamiento': ['comodidades', 'equipamiento', 'comodidades y equipamiento']
-            }
-            
             # Procesar cada categoría encontrada
             for categoria_original, datos in categorias_raw.items():
                 if not isinstance(datos, dict) or not datos:
                     continue
                 
-                categoria_normalizada = categoria_original.lower().strip()
-                categoria_final = None
-                
-                # Buscar mapeo conocido
-                for categoria_estandar, variantes in mapeo_categorias.items():
-                    for variante in variantes:
-                        if variante in categoria_normalizada:
-                            categoria_final = categoria_estandar
-                            break
-                    if categoria_final:
-                        break
-                
-                # Si no encuentra mapeo, usar nombre normalizado
-                if not categoria_final:
-                    categoria_final = categoria_normalizada.replace(' ', '_').replace('ñ', 'n')
+                # Mapeo conocido (mapeo_campos.CATEGORIAS_ESTANDAR) o nombre normalizado
+                categoria_final = categoria_estandar(categoria_original)
                 
                 # Evitar duplicados combinando datos
                 if categoria_final in categorias_finales:
@@ -703,45 +629,10 @@ class ExtractorHibridoOptimizado:
             if 'principales' in datos and isinstance(datos['principales'], dict):
                 principales = datos['principales']
                 
-                # Recámaras
-                for key, value in principales.items():
-                    key_lower = key.lower()
-                    if 'recámara' in key_lower or 'recamara' in key_lower:
-                        datos['recamaras'] = parse_numeric(value)
-                        print(f"   ✅ Recámaras encontradas: {datos['recamaras']}")
-                        break
-                
-                # Baños
-                for key, value in principales.items():
-                    key_lower = key.lower()
-                    if 'baño' in key_lower or 'bano' in key_lower:
-                        datos['banos'] = parse_numeric(value)
-                        print(f"   ✅ Baños encontrados: {datos['banos']}")
-                        break
-                
-                # Superficie construida
-                for key, value in principales.items():
-                    key_lower = key.lower()
-                    if 'superficie construida' in key_lower or 'construida' in key_lower:
-                        datos['construccion'] = parse_numeric(value)
-                        print(f"   ✅ Construcción encontrada: {datos['construccion']} m²")
-                        break
-                
-                # Superficie total/terreno
-                for key, value in principales.items():
-                    key_lower = key.lower()
-                    if 'superficie total' in key_lower or 'terreno' in key_lower:
-                        datos['terreno'] = parse_numeric(value)
-                        print(f"   ✅ Terreno encontrado: {datos['terreno']} m²")
-                        break
-                
-                # Estacionamiento
-                for key, value in principales.items():
-                    key_lower = key.lower()
-                    if 'estacionamiento' in key_lower or 'garage' in key_lower or 'cochera' in key_lower:
-                        datos['estacionamiento'] = parse_numeric(value)
-                        print(f"   ✅ Estacionamiento encontrado: {datos['estacionamiento']}")
-                        break
+                # Reason: una sola pasada; cada campo toma la primera clave que lo menciona
+                for campo, (mapeo, value) in campos_basicos(principales).items():
+                    datos[campo] = mapeo.parser(value)
+                    print(f"   ✅ {mapeo.mensaje.format(datos[campo])}")
             
             # Si no hay precio pero hay moneda, eliminar moneda
             if not datos.get('precio') and datos.get('moneda'):
@@ -750,76 +641,33 @@ class ExtractorHibridoOptimizado:
         except Exception as e:
             print(f"⚠️ Error extrayendo campos básicos: {e}")
 
-    async def _extraer_categorias_optimizado(self, page, navigator=None) -> dict:
-        """Extrae SOLO categorías de forma optimizada sin metadatos completos"""
+    def _categorias_desde_payload(self, tablas) -> dict:
+        """Arma SOLO categorías de forma optimizada sin metadatos completos"""
         try:
             print("   🚀 Extracción ultra-ligera de categorías...")
             
-            # Expansión rápida
-            if navigator and hasattr(navigator, 'click_expand_characteristics_button'):
-                await navigator.click_expand_characteristics_button(page)
-            else:
-                await self._expand_characteristics_fallback(page)
-            
-            await page.wait_for_timeout(500)  # Reducido de 1000ms
-            
-            # Buscar contenedor principal
-            main_container = await page.query_selector('.ui-pdp-container__row.ui-pdp-container__row--technical-specifications')
-            if not main_container:
-                return {}
-            
-            # Extraer solo categorías sin metadatos
-            category_tables = await main_container.query_selector_all('.ui-vpp-striped-specs__table')
-            if not category_tables:
+            if not tablas:
                 return {}
             
             categorias = {}
             
-            for i, tabla in enumerate(category_tables):
-                try:
-                    # Nombre de categoría simplificado
-                    categoria_nombre = f"categoria_{i+1}"
-                    
-                    # Buscar título rápido
-                    for selector in ['h3', 'h4', '.ui-vpp-striped-specs__header']:
-                        titulo_element = await tabla.query_selector(selector)
-                        if titulo_element:
-                            titulo_text = await titulo_element.text_content()
-                            if titulo_text and len(titulo_text.strip()) > 0:
-                                categoria_nombre = titulo_text.strip().lower().replace(' ', '_').replace('ñ', 'n').replace(':', '').replace('-', '_')
-                                break
-                    
-                    # Extraer datos de filas (simplificado)
-                    categoria_data = {}
-                    filas = await tabla.query_selector_all('tr')
-                    
-                    for fila in filas:
-                        try:
-                            cells = await fila.query_selector_all('th, td')
-                            if len(cells) >= 2:
-                                key = await cells[0].text_content()
-                                value = await cells[1].text_content()
-                                
-                                if key and value:
-                                    key_clean = key.strip()
-                                    value_clean = value.strip()
-                                    
-                                    if (key_clean and value_clean and 
-                                        key_clean != value_clean and 
-                                        len(key_clean) > 1):
-                                        categoria_data[key_clean] = value_clean
-                        except:
-                            continue
-                    
-                    if categoria_data:
-                        categorias[categoria_nombre] = categoria_data
+            for i, tabla in enumerate(tablas):
+                # Nombre de categoría simplificado
+                categoria_nombre = self._nombre_categoria(
+                    tabla.get('titulos', []), ['h3', 'h4', '.ui-vpp-striped-specs__header']
+                ) or f"categoria_{i+1}"
                 
-                except Exception as e:
-                    continue
+                # Datos de filas desde las dos primeras celdas genéricas (simplificado)
+                categoria_data = {}
+                for _, _, key, value in tabla.get('filas', []):
+                    self._agregar_campo_tabla(categoria_data, key, value)
+                
+                if categoria_data:
+                    categorias[categoria_nombre] = categoria_data
             
             print(f"   ⚡ {len(categorias)} categorías extraídas (modo optimizado)")
             return categorias
             
         except Exception as e:
             print(f"⚠️ Error en extracción optimizada: {e}")
-            return {} 
\ No newline at end of file
+            return {}
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+FRONTERA DE URLs - SCRAPER MERCADOLIBRE
+=======================================
+
+Deduplicación de URLs de propiedades por ml_id canónico antes de pagar una
+visita de browser. Variantes de host (casa./inmuebles./articulo.), parámetros
+de tracking y fragmentos colapsan al mismo 'MLM-...'.
+
+Usa un set exacto mientras la ejecución es pequeña y migra automáticamente a
+un filtro de Bloom de memoria acotada al superar el umbral configurado.
+"""
+
+import hashlib
+import math
+from typing import Dict, Optional
+
+from utils import extraer_ml_id
+
+
+def clave_canonica(url: str) -> str:
+    """
+    Clave de deduplicación: ml_id si existe, si no la URL sin query ni fragmento.
+
+    Examples:
+        >>> clave_canonica("https://inmuebles.mercadolibre.com.mx/MLM-123-casa-_JM?tracking_id=abc")
+        'MLM-123'
+        >>> clave_canonica("https://Listado.mercadolibre.com.mx/casas/?orden=1#top")
+        'https://listado.mercadolibre.com.mx/casas'
+    """
+    ml_id = extraer_ml_id(url)
+    if ml_id:
+        return ml_id
+    return url.split('#')[0].split('?')[0].rstrip('/').lower()
+
+
+class FiltroBloom:
+    """
+    Filtro de Bloom con doble hashing sobre blake2b.
+
+    Examples:
+        >>> filtro = FiltroBloom(capacidad=1000, tasa_falsos_positivos=0.01)
+        >>> filtro.agregar('MLM-1'), filtro.agregar('MLM-1'), 'MLM-2' in filtro
+        (True, False, False)
+    """
+
+    def __init__(self, capacidad: int, tasa_falsos_positivos: float = 0.001):
+        """
+        Args:
+            capacidad (int): Elementos esperados
+            tasa_falsos_positivos (float): Probabilidad de falso positivo a capacidad llena
+        """
+        self.num_bits = max(8, int(-capacidad * math.log(tasa_falsos_positivos) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacidad * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.elementos = 0
+
+    def _posiciones(self, clave: str):
+        digest = hashlib.blake2b(clave.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def __contains__(self, clave: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._posiciones(clave))
+
+    def agregar(self, clave: str) -> bool:
+        """
+        Agrega clave al filtro.
+
+        Returns:
+            bool: True si la clave era nueva (algún bit estaba apagado)
+        """
+        nueva = False
+        for p in self._posiciones(clave):
+            mascara = 1 << (p & 7)
+            if not self.bits[p >> 3] & mascara:
+                self.bits[p >> 3] |= mascara
+                nueva = True
+        if nueva:
+            self.elementos += 1
+        return nueva
+
+
+class FronteraURLs:
+    """
+    Frontera de deduplicación por ml_id con set exacto → filtro de Bloom.
+
+    Examples:
+        >>> frontera = FronteraURLs()
+        >>> frontera.agregar("https://casa.mercadolibre.com.mx/MLM-1-x-_JM")
+        True
+        >>> frontera.agregar("https://inmuebles.mercadolibre.com.mx/MLM-1-x-_JM?tracking_id=y")
+        False
+    """
+
+    def __init__(self, umbral_exacto: int = 200_000, capacidad_bloom: int = 10_000_000,
+                 tasa_falsos_positivos: float = 0.001):
+        """
+        Args:
+            umbral_exacto (int): Claves en el set exacto antes de migrar a Bloom
+            capacidad_bloom (int): Capacidad del filtro de Bloom
+            tasa_falsos_positivos (float): Tasa de falsos positivos del filtro
+        """
+        self.umbral_exacto = umbral_exacto
+        self.capacidad_bloom = capacidad_bloom
+        self.tasa_falsos_positivos = tasa_falsos_positivos
+        self.exactas: Optional[set] = set()
+        self.bloom: Optional[FiltroBloom] = None
+        self.unicas = 0
+        self.duplicadas = 0
+
+    def __contains__(self, url: str) -> bool:
+        clave = clave_canonica(url)
+        return clave in self.exactas if self.bloom is None else clave in self.bloom
+
+    def agregar(self, url: str) -> bool:
+        """
+        Registra una URL en la frontera.
+
+        Args:
+            url (str): URL de propiedad (cualquier variante)
+
+        Returns:
+            bool: True si es la primera vez que se ve su ml_id (debe visitarse)
+        """
+        clave = clave_canonica(url)
+
+        if self.bloom is None:
+            if clave in self.exactas:
+                self.duplicadas += 1
+                return False
+            self.exactas.add(clave)
+            if len(self.exactas) > self.umbral_exacto:
+                self._migrar_a_bloom()
+        elif not self.bloom.agregar(clave):
+            self.duplicadas += 1
+            return False
+
+        self.unicas += 1
+        return True
+
+    def _migrar_a_bloom(self) -> None:
+        """Reason: el set exacto crece ~100 bytes por clave; el filtro usa ~1.8 bytes"""
+        print(f"🌸 Frontera: {len(self.exactas):,} claves - migrando a filtro de Bloom")
+        self.bloom = FiltroBloom(max(self.capacidad_bloom, len(self.exactas) * 2), self.tasa_falsos_positivos)
+        for clave in self.exactas:
+            self.bloom.agregar(clave)
+        self.exactas = None
+
+    def resumen(self) -> Dict:
+        """Métricas de la frontera para el reporte final."""
+        return {
+            'modo': 'exacto' if self.bloom is None else 'bloom',
+            'urls_unicas': self.unicas,
+            'duplicadas_descartadas': self.duplicadas,
+            'memoria_bloom_mb': round(len(self.bloom.bits) / 1_048_576, 2) if self.bloom else 0.0,
+        }
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+ÍNDICE ESPACIAL - SCRAPER MERCADOLIBRE
+======================================
+
+Consultas por radio sobre `propiedades` ("todo lo que esté a 2 km de este punto"):
+- latitud/longitud por propiedad (coordenadas de la página o centroide del
+  municipio según precision_ubicacion) y geohash para agrupar por zona
+- Tabla R*Tree (propiedades_rtree) sincronizada por triggers: la caja
+  envolvente del radio se resuelve con el índice
+- Filtro exacto por distancia (haversine) vectorizado con numpy sobre los
+  candidatos de la caja
+"""
+
+import math
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+RADIO_TIERRA_KM = 6371.0088
+
+# Valores de precision_ubicacion
+PRECISION_EXACTA = 'exacta'        # Coordenadas de la página (estado embebido / JSON-LD)
+PRECISION_MUNICIPIO = 'municipio'  # Centroide aproximado del municipio (nomenclator_mexico)
+
+_BASE32_GEOHASH = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Reason: R*Tree guarda float32 redondeado hacia afuera; el margen (~10 m) evita
+# perder puntos en el borde de la caja (el filtro exacto descarta el exceso)
+MARGEN_CAJA_GRADOS = 1e-4
+
+# Índice R*Tree (puntos: min = max) sincronizado por triggers.
+# Reason: se aplica aparte de schema.sql porque R*Tree es opcional en algunos builds de SQLite
+ESQUEMA_RTREE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS propiedades_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon);
+
+CREATE TRIGGER IF NOT EXISTS propiedades_rtree_insert AFTER INSERT ON propiedades
+WHEN new.latitud IS NOT NULL AND new.longitud IS NOT NULL BEGIN
+    INSERT OR REPLACE INTO propiedades_rtree VALUES (new.id, new.latitud, new.latitud, new.longitud, new.longitud);
+END;
+
+CREATE TRIGGER IF NOT EXISTS propiedades_rtree_update AFTER UPDATE OF latitud, longitud ON propiedades BEGIN
+    DELETE FROM propiedades_rtree WHERE id = old.id;
+    INSERT INTO propiedades_rtree SELECT new.id, new.latitud, new.latitud, new.longitud, new.longitud
+    WHERE new.latitud IS NOT NULL AND new.longitud IS NOT NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS propiedades_rtree_delete AFTER DELETE ON propiedades BEGIN
+    DELETE FROM propiedades_rtree WHERE id = old.id;
+END;
+"""
+
+# Columnas devueltas por buscar_en_radio (más distancia_km)
+COLUMNAS_RADIO = ['ml_id', 'url', 'titulo', 'precio', 'moneda', 'tipo_operacion', 'tipo_propiedad',
+                  'estado', 'ciudad', 'recamaras', 'banos', 'superficie_construida', 'superficie_total',
+                  'latitud', 'longitud', 'geohash', 'precision_ubicacion']
+
+
+def coordenadas_validas(latitud, longitud) -> Optional[Tuple[float, float]]:
+    """
+    (lat, lon) como float si son coordenadas válidas; None en otro caso.
+
+    Reason: (0, 0) es el valor por defecto de varios mapas sin ubicación
+
+    Examples:
+        >>> coordenadas_validas('18.92', -99.22), coordenadas_validas(0, 0), coordenadas_validas(91, 1)
+        ((18.92, -99.22), None, None)
+    """
+    try:
+        latitud, longitud = float(latitud), float(longitud)
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= latitud <= 90 and -180 <= longitud <= 180) or (latitud == 0 and longitud == 0):
+        return None
+    return latitud, longitud
+
+
+def codificar_geohash(latitud: float, longitud: float, precision: int = 9) -> str:
+    """
+    Geohash base32 (precisión 9 ≈ 5 m; los prefijos agrupan zonas vecinas).
+
+    Examples:
+        >>> codificar_geohash(18.9242, -99.2216, 6)
+        '9g37wj'
+    """
+    rango_lat, rango_lon = [-90.0, 90.0], [-180.0, 180.0]
+    caracteres = []
+    bits, valor, par = 0, 0, True
+    while len(caracteres) < precision:
+        rango, coordenada = (rango_lon, longitud) if par else (rango_lat, latitud)
+        medio = (rango[0] + rango[1]) / 2
+        if coordenada >= medio:
+            valor = (valor << 1) | 1
+            rango[0] = medio
+        else:
+            valor <<= 1
+            rango[1] = medio
+        par = not par
+        bits += 1
+        if bits == 5:
+            caracteres.append(_BASE32_GEOHASH[valor])
+            bits, valor = 0, 0
+    return ''.join(caracteres)
+
+
+def caja_envolvente(latitud: float, longitud: float, radio_km: float) -> Tuple[float, float, float, float]:
+    """(lat_min, lat_max, lon_min, lon_max) que contiene el círculo del radio."""
+    delta_lat = math.degrees(radio_km / RADIO_TIERRA_KM)
+    coseno = math.cos(math.radians(latitud))
+    # Reason: cerca de los polos la caja en longitud cubre todo el círculo
+    delta_lon = 180.0 if coseno < 1e-6 else min(180.0, delta_lat / coseno)
+    return latitud - delta_lat, latitud + delta_lat, longitud - delta_lon, longitud + delta_lon
+
+
+def distancias_km(latitud: float, longitud: float, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """
+    Distancia haversine (km) de un punto a arrays de puntos.
+
+    Examples:
+        >>> round(float(distancias_km(18.9242, -99.2216, np.array([18.8816]), np.array([-99.1772]))[0]), 2)
+        6.65
+    """
+    lat1, lon1 = math.radians(latitud), math.radians(longitud)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * RADIO_TIERRA_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def crear_indice_espacial(conexion: sqlite3.Connection) -> bool:
+    """
+    Crea propiedades_rtree y lo llena con las filas existentes la primera vez.
+
+    Returns:
+        bool: False si este build de SQLite no incluye R*Tree
+    """
+    existia = conexion.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'propiedades_rtree'"
+    ).fetchone() is not None
+    try:
+        conexion.executescript(ESQUEMA_RTREE)
+    except sqlite3.OperationalError as e:
+        print(f"⚠️ R*Tree no disponible, consultas por radio sin índice espacial: {e}")
+        return False
+    if not existia:
+        with conexion:
+            conexion.execute(
+                "INSERT INTO propiedades_rtree SELECT id, latitud, latitud, longitud, longitud "
+                "FROM propiedades WHERE latitud IS NOT NULL AND longitud IS NOT NULL"
+            )
+    return True
+
+
+def _tiene_rtree(conexion: sqlite3.Connection) -> bool:
+    return conexion.execute("SELECT 1 FROM sqlite_master WHERE name = 'propiedades_rtree'").fetchone() is not None
+
+
+def buscar_en_radio(conexion: sqlite3.Connection, latitud: float, longitud: float, radio_km: float,
+                    filtros: Optional[Dict] = None, solo_exactas: bool = False,
+                    limite: Optional[int] = None) -> List[Dict]:
+    """
+    Propiedades a menos de radio_km del punto, ordenadas por distancia.
+
+    Args:
+        conexion (sqlite3.Connection): Conexión a la base de propiedades
+        latitud (float): Latitud del centro
+        longitud (float): Longitud del centro
+        radio_km (float): Radio en kilómetros
+        filtros (Optional[Dict]): Igualdades adicionales (ej. {'tipo_operacion': 'venta'})
+        solo_exactas (bool): Excluir ubicaciones aproximadas por centroide de municipio
+        limite (Optional[int]): Máximo de resultados (los más cercanos)
+
+    Returns:
+        List[Dict]: Filas con COLUMNAS_RADIO más 'distancia_km'
+    """
+    lat_min, lat_max, lon_min, lon_max = caja_envolvente(latitud, longitud, radio_km)
+    lat_min, lon_min = lat_min - MARGEN_CAJA_GRADOS, lon_min - MARGEN_CAJA_GRADOS
+    lat_max, lon_max = lat_max + MARGEN_CAJA_GRADOS, lon_max + MARGEN_CAJA_GRADOS
+    columnas = ', '.join(f"p.{c}" for c in COLUMNAS_RADIO)
+    if _tiene_rtree(conexion):
+        consulta = (f"SELECT {columnas} FROM propiedades_rtree r JOIN propiedades p ON p.id = r.id "
+                    "WHERE r.min_lat >= ? AND r.max_lat <= ? AND r.min_lon >= ? AND r.max_lon <= ?")
+    else:
+        consulta = (f"SELECT {columnas} FROM propiedades p "
+                    "WHERE p.latitud BETWEEN ? AND ? AND p.longitud BETWEEN ? AND ?")
+    parametros = [lat_min, lat_max, lon_min, lon_max]
+    if solo_exactas:
+        consulta += " AND p.precision_ubicacion = ?"
+        parametros.append(PRECISION_EXACTA)
+    for columna, valor in (filtros or {}).items():
+        if columna not in COLUMNAS_RADIO:
+            raise ValueError(f"Filtro no soportado: {columna}")
+        consulta += f" AND p.{columna} = ?"
+        parametros.append(valor)
+
+    filas = conexion.execute(consulta, parametros).fetchall()
+    if not filas:
+        return []
+
+    # Reason: la caja es un superconjunto del círculo; el filtro exacto va vectorizado
+    indice_lat, indice_lon = COLUMNAS_RADIO.index('latitud'), COLUMNAS_RADIO.index('longitud')
+    latitudes = np.fromiter((f[indice_lat] for f in filas), dtype=np.float64, count=len(filas))
+    longitudes = np.fromiter((f[indice_lon] for f in filas), dtype=np.float64, count=len(filas))
+    distancias = distancias_km(latitud, longitud, latitudes, longitudes)
+    dentro = np.flatnonzero(distancias <= radio_km)
+    orden = dentro[np.argsort(distancias[dentro], kind='stable')]
+    if limite is not None:
+        orden = orden[:limite]
+
+    return [dict(zip(COLUMNAS_RADIO, filas[i]), distancia_km=round(float(distancias[i]), 3)) for i in orden]
+
+
+def estadisticas_en_radio(conexion: sqlite3.Connection, latitud: float, longitud: float, radio_km: float,
+                          filtros: Optional[Dict] = None, solo_exactas: bool = False) -> Dict:
+    """
+    Resumen de mercado alrededor de un punto (comparables).
+
+    Returns:
+        Dict: total, precio mediano/promedio y precio por m² mediano (precio > 0)
+    """
+    cercanas = buscar_en_radio(conexion, latitud, longitud, radio_km, filtros, solo_exactas)
+    precios = np.array([p['precio'] for p in cercanas if p['precio']], dtype=np.float64)
+    por_m2 = np.array([p['precio'] / p['superficie_construida'] for p in cercanas
+                       if p['precio'] and p['superficie_construida']], dtype=np.float64)
+    return {
+        'total': len(cercanas),
+        'con_precio': int(precios.size),
+        'precio_mediano': float(np.median(precios)) if precios.size else None,
+        'precio_promedio': float(precios.mean()) if precios.size else None,
+        'precio_m2_mediano': float(np.median(por_m2)) if por_m2.size else None,
+    }
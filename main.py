@@ -17,10 +17,10 @@ FUNCIONALIDADES:
 import asyncio
 import sys
 import time
-import random
 from datetime import datetime
+from pathlib import Path
 from playwright.async_api import async_playwright
-from typing import List, Dict
+from typing import Iterable, Dict, Optional
 
 # Importar módulos core directamente (arquitectura modular correcta)
 from models import ConfiguracionHibridaUltraAvanzada
@@ -28,6 +28,17 @@ from navigation import NavigatorStealth
 from extractors import ExtractorHibridoOptimizado
 from test_runner import TestRunner
 from session_stats import SessionStatsManager
+from estado_embebido import CapturadorRespuestas
+from cascada_selectores import RegistroCascadas
+from esperas import GestorEsperas
+from pool_paginas import PoolPaginas, LimitadorTasa
+from crawler_listados import CrawlerListados
+from frontera import FronteraURLs
+from cola_persistente import ColaPersistente
+from repositorio_propiedades import RepositorioPropiedades, EscritorSegundoPlano
+from sumidero_jsonl import SumideroJSONL, ResultadosJSONL
+from acumulador_reporte import ReportAccumulator
+from exportador_parquet import exportar_parquet
 
 
 class ScraperPrincipal:
@@ -35,17 +46,36 @@ class ScraperPrincipal:
     
     def __init__(self):
         self.config = ConfiguracionHibridaUltraAvanzada()
-        self.navigator = NavigatorStealth(self.config)
-        self.extractor = ExtractorHibridoOptimizado()
+        self.registro_cascadas = RegistroCascadas(self.config.ARCHIVO_ESTADISTICAS_SELECTORES)
+        self.esperas = GestorEsperas(self.config.ESPERAS_LISTO)
+        # Reason: el limitador vive en el navigator para que cada intento de navegación
+        # (listados, detalle, calentamiento y reintentos) consuma un turno global
+        self.limitador = LimitadorTasa(self.config.MAX_RPM)
+        self.navigator = NavigatorStealth(self.config, self.registro_cascadas, self.esperas, self.limitador)
+        self.extractor = ExtractorHibridoOptimizado(self.registro_cascadas, self.esperas)
         self.test_runner = TestRunner()
         self.session_manager = SessionStatsManager()
+        self.frontera = FronteraURLs(
+            self.config.FRONTERA_UMBRAL_EXACTO,
+            self.config.FRONTERA_CAPACIDAD_BLOOM,
+            self.config.FRONTERA_TASA_FALSOS_POSITIVOS,
+        )
+        self.cola = ColaPersistente(self.config.ARCHIVO_COLA_RASTREO, self.config.MAX_INTENTOS_PROPIEDAD)
+        self.ejecucion_id: Optional[str] = None
+        self.escritor_bd = EscritorSegundoPlano(
+            RepositorioPropiedades(self.config.ARCHIVO_BASE_DATOS), self.config.TAMANO_LOTE_BD
+        )
+        # Reason: el sumidero se abre por ejecución (subdirectorio propio) al iniciar el rastreo
+        self.sumidero: Optional[SumideroJSONL] = None
+        self.acumulador = ReportAccumulator()
     
-    async def scrape_propiedades_masivo(self, max_properties: int = 50) -> Dict:
+    async def scrape_propiedades_masivo(self, max_properties: int = 50, reanudar: bool = True) -> Dict:
         """
         Scraping masivo usando módulos core directamente
         
         Args:
             max_properties: Máximo número de propiedades a procesar
+            reanudar: Retomar el rastreo interrumpido si existe (False = rastreo nuevo)
             
         Returns:
             Dict con resultados y estadísticas
@@ -56,13 +86,34 @@ class ScraperPrincipal:
         print(f"📅 Inicio: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("=" * 60)
         
-        resultados_finales = []
+        # Reanudación solo de un rastreo interrumpido: leases huérfanos vuelven a
+        # pendiente y la frontera conoce lo ya encolado; si no, rastreo nuevo
+        self.ejecucion_id, reanudada = self.cola.iniciar_ejecucion(reanudar)
+        if reanudada:
+            recuperados = self.cola.recuperar_leases()
+            for url in self.cola.urls_conocidas():
+                self.frontera.agregar(url)
+            print(f"♻️ Reanudando ejecución {self.ejecucion_id}: {self.cola.resumen()} "
+                  f"({recuperados} leases recuperados)")
+        else:
+            print(f"🆕 Nueva ejecución {self.ejecucion_id}")
+        estado_cola = self.cola.resumen()
+        terminada = False
+        
+        # Reason: los JSONL de cada rastreo van en su propio subdirectorio; al reanudar,
+        # el acumulador arranca con lo ya escrito antes de la interrupción (un rastreo
+        # nuevo empieza vacío) y desde aquí se actualiza una vez por resultado
+        self._abrir_sumidero(f"ejecucion_{self.ejecucion_id}")
+        for resultado in ResultadosJSONL(self.sumidero.archivos()):
+            self.acumulador.agregar(resultado)
+        
+        self.escritor_bd.iniciar()
         
         try:
             async with async_playwright() as p:
                 # Configuración inicial del browser
                 browser = await self._setup_browser(p)
-                context, page = await self._setup_session(browser)
+                context, page, _ = await self._setup_session(browser)
                 
                 try:
                     # 1. CALENTAMIENTO MEJORADO
@@ -70,69 +121,114 @@ class ScraperPrincipal:
                     if not warming_success:
                         print("⚠️ Calentamiento falló - continuando con precaución...")
                     
-                    # 2. OBTENER URLs DE PROPIEDADES
-                    urls_propiedades = await self._get_property_urls(page, max_properties)
-                    
-                    if not urls_propiedades:
-                        print("❌ No se encontraron URLs de propiedades")
-                        return await self._generate_final_report(resultados_finales, "No URLs encontradas")
-                    
-                    print(f"✅ {len(urls_propiedades)} URLs encontradas para procesar")
-                    
-                    # 3. PROCESAMIENTO MASIVO CON MEDIDAS ANTIBLOQUEO
-                    for i, url in enumerate(urls_propiedades, 1):
-                        print(f"\n🏠 PROPIEDAD {i}/{len(urls_propiedades)}")
-                        print(f"URL: {url}")
-                        print("-" * 50)
-                        
-                        # Circuit breaker con cooldown automático integrado
-                        await self.session_manager.handle_circuit_breaker()
-                        
-                        # Control de rate limiting
-                        await self.navigator.rate_limit_control(
-                            self.session_manager.stats.requests_in_session,
-                            self.session_manager.stats.session_start_time
-                        )
-                        
-                        # Verificar si necesita rotación de sesión
-                        session_duration = self.session_manager.get_session_duration()
-                        should_rotate = await self.navigator.should_rotate_session(
-                            self.session_manager.stats.requests_in_session,
-                            session_duration
-                        )
-                        
-                        if should_rotate:
-                            print("🔄 Rotando sesión...")
-                            await context.close()
-                            context, page = await self._setup_session(browser)
-                            self.session_manager.reset_session()
-                        
-                        # Procesar propiedad individual
-                        resultado = await self._process_single_property(page, url, i)
-                        resultados_finales.append(resultado)
-                        
-                        # Actualizar estadísticas
-                        self.session_manager.update_from_result(resultado)
-                        
-                        # Detectar bloqueos solo si hay errores
-                        if resultado.get('status') != 'exitoso':
-                            blocking_detected = await self.navigator.detect_blocking_patterns(page)
-                            if any(blocking_detected.values()):
-                                print("🚨 Patrones de bloqueo detectados - activando medidas defensivas")
-                                await asyncio.sleep(random.uniform(10, 30))
-                        
-                        # Mostrar progreso
-                        self._show_progress(i, len(urls_propiedades))
+                    # 2. CRAWLER DE LISTADOS + PROCESAMIENTO CONCURRENTE EN PIPELINE
+                    # Reason: la página calentada queda dedicada a los listados; cada
+                    # trabajador de detalle abre su propia sesión y consume URLs en
+                    # cuanto se parsea cada página de resultados
+                    crawler = CrawlerListados(self.navigator, self.config, self.frontera,
+                                              progreso=self.cola)
+                    print(f"👷 Pool de {self.config.NUM_TRABAJADORES} páginas a máximo {self.config.MAX_RPM} RPM globales")
+                    # Reason: cada resultado definitivo va al sumidero JSONL en cuanto
+                    # termina; el pool no acumula resultados en memoria
+                    pool = PoolPaginas(self, browser, self.config.NUM_TRABAJADORES, self.limitador,
+                                       cola_persistente=self.cola, al_finalizar=self._registrar_resultado_final,
+                                       conservar_resultados=False)
+                    await pool.ejecutar(
+                        crawler.recorrer(page, max_properties),
+                        total_estimado=max_properties + estado_cola['pendiente']
+                    )
+                    terminada = True
                 
                 finally:
                     await browser.close()
         
         except Exception as e:
             print(f"❌ Error crítico en scraping masivo: {e}")
+        
+        finally:
+            # Reason: vaciar los lotes pendientes y hacer checkpoint antes de reportar
+            await self.escritor_bd.detener()
+            self.sumidero.cerrar()
+            # Reason: solo un rastreo que terminó sin trabajo pendiente deja de ser reanudable
+            if terminada and not self.cola.hay_trabajo_activo():
+                self.cola.terminar_ejecucion(self.ejecucion_id)
+        
+        # Reason: el reporte se genera recorriendo los archivos JSONL de este rastreo
+        # (incluye lo escrito antes de una interrupción si se reanudó)
+        resultados_finales = ResultadosJSONL(self.sumidero.archivos())
+        if not self.acumulador.total:
+            print("❌ No se encontraron URLs de propiedades")
+            return await self._generate_final_report(resultados_finales, "No URLs encontradas")
             
         # Generar reporte final
         return await self._generate_final_report(resultados_finales, "Completado")
     
+    async def monitorear_listados(self, max_properties: int = 500) -> Dict:
+        """
+        Monitoreo rápido de mercado: registros desde las tarjetas del listado
+        
+        No visita páginas de detalle ni usa la cola persistente ni el pool: cada
+        tarjeta va directo al sumidero JSONL, al acumulador del reporte y a la base
+        (que la combina con lo ya guardado desde la página de detalle).
+        
+        Args:
+            max_properties: Máximo número de tarjetas a registrar
+            
+        Returns:
+            Dict con resultados y estadísticas
+        """
+        print("🗂️ SCRAPER PRINCIPAL - MONITOREO DE LISTADOS (SOLO TARJETAS)")
+        print("=" * 60)
+        print(f"🎯 Objetivo: {max_properties} propiedades máximo")
+        print(f"📅 Inicio: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print("=" * 60)
+        
+        self._abrir_sumidero(f"monitoreo_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        self.escritor_bd.iniciar()
+        
+        try:
+            async with async_playwright() as p:
+                browser = await self._setup_browser(p)
+                context, page, _ = await self._setup_session(browser)
+                
+                try:
+                    warming_success = await self.navigator.enhanced_session_warming(page)
+                    if not warming_success:
+                        print("⚠️ Calentamiento falló - continuando con precaución...")
+                    
+                    # Reason: sin progreso persistente; un monitoreo es una foto del mercado
+                    crawler = CrawlerListados(self.navigator, self.config, self.frontera)
+                    async for registro in crawler.recorrer(page, max_properties, solo_tarjetas=True):
+                        self._registrar_resultado_final(registro)
+                        self.escritor_bd.encolar(registro)
+                
+                finally:
+                    await browser.close()
+        
+        except Exception as e:
+            print(f"❌ Error crítico en monitoreo de listados: {e}")
+        
+        finally:
+            await self.escritor_bd.detener()
+            self.sumidero.cerrar()
+        
+        resultados_finales = ResultadosJSONL(self.sumidero.archivos())
+        if not self.acumulador.total:
+            print("❌ No se encontraron tarjetas de propiedades")
+            return await self._generate_final_report(resultados_finales, "No tarjetas encontradas",
+                                                     prefijo="monitoreo_listados")
+        return await self._generate_final_report(resultados_finales, "Completado", prefijo="monitoreo_listados")
+    
+    def _abrir_sumidero(self, nombre: str) -> None:
+        """Sumidero JSONL en su propio subdirectorio y acumulador del reporte vacío"""
+        self.sumidero = SumideroJSONL(
+            str(Path(self.config.DIRECTORIO_RESULTADOS_JSONL) / nombre),
+            max_bytes=self.config.JSONL_MAX_BYTES,
+            max_segundos=self.config.JSONL_MAX_SEGUNDOS,
+            fsync_cada=self.config.JSONL_FSYNC_CADA,
+        )
+        self.acumulador = ReportAccumulator()
+    
     async def _setup_browser(self, p):
         """Configura browser con medidas antibloqueo"""
         print("🔧 Configurando browser con medidas antibloqueo...")
@@ -187,29 +283,18 @@ class ScraperPrincipal:
         page = await context.new_page()
         await self.navigator.setup_stealth_page(page)
         
+        # Interceptar XHR JSON para extracción desde estado estructurado (uno por página)
+        capturador = CapturadorRespuestas()
+        capturador.registrar(page)
+        
         print(f"✅ Sesión configurada - UA: {user_agent[:50]}...")
         print(f"🌐 Red: {proxy_info}")
         
-        return context, page
+        return context, page, capturador
     
-    async def _get_property_urls(self, page, max_properties: int) -> List[str]:
-        """Obtiene URLs de propiedades"""
-        print("🔍 Obteniendo URLs de propiedades...")
-        
-        search_url = "https://inmuebles.mercadolibre.com.mx/casas/venta/cuernavaca/"
-        
-        success = await self.navigator.navigate_safely(page, search_url)
-        if not success:
-            print("❌ No se pudo acceder a la página de búsqueda")
-            return []
-        
-        await self.navigator.handle_popup_and_cookies(page)
-        urls = await self.navigator.extract_property_urls_from_listing(page, max_properties)
-        
-        return urls
-    
-    async def _process_single_property(self, page, url: str, property_number: int) -> Dict:
-        """Procesa una propiedad individual con extracción híbrida"""
+    async def _process_single_property(self, page, url: str, property_number: int,
+                                       capturador: CapturadorRespuestas) -> Dict:
+        """Procesa una propiedad individual con extracción híbrida en la página de un trabajador"""
         resultado = {
             'url': url,
             'property_number': property_number,
@@ -222,6 +307,7 @@ class ScraperPrincipal:
         start_time = time.time()
         
         try:
+            capturador.limpiar()
             success = await self.navigator.navigate_safely(page, url)
             if not success:
                 resultado['status'] = 'error_navigation'
@@ -234,7 +320,8 @@ class ScraperPrincipal:
             datos_extraidos = await self.extractor.extraer_datos_hibrido(
                 page, 
                 navigator=self.navigator,
-                incluir_andes_raw=False  # Modo optimizado
+                incluir_andes_raw=False,  # Modo optimizado
+                respuestas_xhr=await capturador.obtener_respuestas()
             )
             
             # Agregar metadatos
@@ -246,6 +333,9 @@ class ScraperPrincipal:
             resultado.update(datos_extraidos)
             print(f"✅ Propiedad {property_number} procesada exitosamente")
             
+            # Escritura SQLite en segundo plano (no bloquea al trabajador)
+            self.escritor_bd.encolar(resultado)
+            
         except Exception as e:
             print(f"❌ Error procesando propiedad {property_number}: {e}")
             resultado['status'] = 'error_extraction'
@@ -256,6 +346,11 @@ class ScraperPrincipal:
         
         return resultado
     
+    def _registrar_resultado_final(self, resultado: Dict) -> None:
+        """Resultado definitivo → sumidero JSONL y acumulador del reporte"""
+        self.sumidero.escribir(resultado)
+        self.acumulador.agregar(resultado)
+    
     def _show_progress(self, current: int, total: int) -> None:
         """Muestra progreso del scraping"""
         progress_data = self.session_manager.get_progress_summary(current, total)
@@ -264,23 +359,53 @@ class ScraperPrincipal:
         print(f"✅ Exitosas: {progress_data['successful']}")
         print(f"❌ Falladas: {progress_data['failed']}")
         print(f"📈 Tasa éxito: {progress_data['success_rate']:.1f}%")
+        cobertura = self.acumulador.resumen_progreso()
+        print("🧮 Cobertura: " + ", ".join(f"{campo} {pct:.0f}%" for campo, pct in cobertura.items()))
     
-    async def _generate_final_report(self, resultados: List[Dict], status: str) -> Dict:
-        """Genera reporte final del scraping masivo"""
+    async def _generate_final_report(self, resultados: Iterable[Dict], status: str,
+                                     prefijo: str = "scraping_masivo") -> Dict:
+        """
+        Genera reporte final del scraping masivo
+        
+        Reason: el monitoreo usa otro prefijo para que backfill_historico (que carga
+        scraping_masivo_*.json) no tome registros de tarjeta como filas completas
+        """
         print("\n" + "=" * 60)
         print("📊 GENERANDO REPORTE FINAL")
         print("=" * 60)
         
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"scraping_masivo_{timestamp}.json"
+        filename = f"{prefijo}_{timestamp}.json"
         
-        reporte = self.test_runner.generar_reporte_hibrido(resultados, filename)
+        self.registro_cascadas.guardar()
+        reporte = self.test_runner.generar_reporte_hibrido(
+            resultados, filename,
+            estadisticas_extra={
+                'cascadas_selectores': self.registro_cascadas.resumen(),
+                'esperas_condicion': self.esperas.resumen(),
+                'limitador_tasa': self.limitador.resumen(),
+                'frontera_urls': self.frontera.resumen(),
+                'cola_rastreo': self.cola.resumen(),
+                'base_datos': self.escritor_bd.resumen(),
+                'resultados_jsonl': self.sumidero.resumen(),
+            },
+            acumulador=self.acumulador
+        )
         
-        stats_data = self.session_manager.get_final_report_data(len(resultados))
+        stats_data = self.session_manager.get_final_report_data(self.acumulador.total)
         stats_data['status_final'] = status
         reporte['scraping_masivo_stats'] = stats_data
         
         print(f"✅ Reporte guardado: {filename}")
+        
+        # Exportación columnar para análisis (Arrow/Parquet)
+        if self.config.EXPORTAR_PARQUET and self.acumulador.total:
+            try:
+                exportacion = exportar_parquet(resultados, self.config.DIRECTORIO_PARQUET,
+                                               self.config.TAMANO_LOTE_PARQUET)
+                print(f"🗂️ Dataset Parquet: {exportacion['filas']} filas en {exportacion['directorio']}")
+            except Exception as e:
+                print(f"⚠️ Error exportando Parquet: {e}")
         return reporte
 
 
@@ -290,42 +415,68 @@ def mostrar_menu():
     print("🏠 MERCADOLIBRE SCRAPER - MENÚ PRINCIPAL")
     print("=" * 60)
     print("1. 🚀 Scraping Masivo de Propiedades")
-    print("2. 🔧 Configuración Avanzada")
-    print("3. 📊 Ver Estadísticas del Sistema")
-    print("4. ❌ Salir")
+    print("2. 🗂️ Monitoreo Rápido de Listados (solo tarjetas)")
+    print("3. 🔧 Configuración Avanzada")
+    print("4. 📊 Ver Estadísticas del Sistema")
+    print("5. ❌ Salir")
     print("=" * 60)
 
 
-async def ejecutar_scraping_masivo():
-    """Ejecuta el scraping masivo con configuración del usuario"""
-    print("\n🚀 CONFIGURACIÓN DE SCRAPING MASIVO")
-    print("-" * 40)
-    
-    # Configurar número de propiedades
+def pedir_maximo_propiedades(default: int) -> int:
+    """Pide al usuario el número máximo de propiedades (entero positivo)"""
     while True:
         try:
-            max_props = input("Número máximo de propiedades (default: 20): ").strip()
+            max_props = input(f"Número máximo de propiedades (default: {default}): ").strip()
             if not max_props:
-                max_props = 20
-                break
+                return default
             max_props = int(max_props)
             if max_props > 0:
-                break
+                return max_props
             else:
                 print("❌ Debe ser un número mayor a 0")
         except ValueError:
             print("❌ Ingrese un número válido")
+
+
+async def ejecutar_scraping_masivo():
+    """Ejecuta el scraping masivo con configuración del usuario"""
+    print("\n🚀 CONFIGURACIÓN DE SCRAPING MASIVO")
+    print("-" * 40)
     
+    # Configurar número de propiedades
+    max_props = pedir_maximo_propiedades(20)
     print(f"🎯 Configurado para {max_props} propiedades")
     
+    scraper = ScraperPrincipal()
+    
+    # Rastreo interrumpido: reanudarlo o empezar uno nuevo
+    reanudar = True
+    pendiente = scraper.cola.ejecucion_pendiente()
+    if pendiente:
+        respuesta = input(f"♻️ Hay una ejecución interrumpida ({pendiente}). ¿Reanudarla? (S/n): ").strip().lower()
+        reanudar = respuesta not in ('n', 'no')
+    
     # Ejecutar scraping usando módulos core directamente
     print("\n🔄 Iniciando scraping...")
-    scraper = ScraperPrincipal()
-    resultado = await scraper.scrape_propiedades_masivo(max_properties=max_props)
+    resultado = await scraper.scrape_propiedades_masivo(max_properties=max_props, reanudar=reanudar)
     
     return resultado
 
 
+async def ejecutar_monitoreo_listados():
+    """Ejecuta el monitoreo rápido de listados (solo tarjetas) con configuración del usuario"""
+    print("\n🗂️ CONFIGURACIÓN DE MONITOREO DE LISTADOS")
+    print("-" * 40)
+    print("ℹ️ Precio, ubicación, m² y recámaras desde las tarjetas; sin descripción, vendedor ni categorías")
+    
+    max_props = pedir_maximo_propiedades(ConfiguracionHibridaUltraAvanzada.MAX_TARJETAS_MONITOREO)
+    print(f"🎯 Configurado para {max_props} propiedades")
+    
+    scraper = ScraperPrincipal()
+    print("\n🔄 Iniciando monitoreo...")
+    return await scraper.monitorear_listados(max_properties=max_props)
+
+
 def mostrar_estadisticas():
     """Muestra estadísticas del sistema"""
     print("\n📊 ESTADÍSTICAS DEL SISTEMA")
@@ -362,26 +513,30 @@ async def main():
     while True:
         try:
             mostrar_menu()
-            opcion = input("Seleccione una opción (1-4): ").strip()
+            opcion = input("Seleccione una opción (1-5): ").strip()
             
             if opcion == "1":
                 await ejecutar_scraping_masivo()
                 input("\n📋 Presione Enter para continuar...")
                 
             elif opcion == "2":
-                mostrar_configuracion()
+                await ejecutar_monitoreo_listados()
                 input("\n📋 Presione Enter para continuar...")
                 
             elif opcion == "3":
-                mostrar_estadisticas()
+                mostrar_configuracion()
                 input("\n📋 Presione Enter para continuar...")
                 
             elif opcion == "4":
+                mostrar_estadisticas()
+                input("\n📋 Presione Enter para continuar...")
+                
+            elif opcion == "5":
                 print("\n👋 ¡Hasta luego!")
                 break
                 
             else:
-                print("❌ Opción inválida. Seleccione 1-4.")
+                print("❌ Opción inválida. Seleccione 1-5.")
                 
         except KeyboardInterrupt:
             print("\n\n⚠️ Operación cancelada por el usuario")
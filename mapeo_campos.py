@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+MAPEO DE CAMPOS - SCRAPER MERCADOLIBRE
+======================================
+
+Tablas precompiladas (construidas una vez al importar) que traducen claves de
+la página a campos del proyecto:
+- CAMPOS_BASICOS: clave de 'principales' ("Recámaras", "Superficie
+  construida", ...) → campo universal + parser
+- CATEGORIAS_ESTANDAR: nombre de tabla ("Características principales",
+  "Servicios", ...) → categoría estándar
+
+La normalización de cada clave se memoriza, de modo que las claves ya vistas
+(casi todas, se repiten entre publicaciones) se resuelven en O(1). Nuevas
+variantes en español se agregan solo en estas tablas.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Tuple
+
+from utils import parse_numeric
+
+
+@dataclass(frozen=True)
+class MapeoCampo:
+    """Campo universal que se llena desde la primera clave que contenga alguna variante."""
+    campo: str
+    variantes: Tuple[str, ...]
+    parser: Callable
+    mensaje: str = ''  # Plantilla del log al encontrarlo ({} = valor)
+
+
+# ✅ CLAVES DE 'principales' → CAMPOS UNIVERSALES (variantes en minúsculas, por subcadena)
+CAMPOS_BASICOS = (
+    MapeoCampo('recamaras', ('recámara', 'recamara'), parse_numeric, 'Recámaras encontradas: {}'),
+    MapeoCampo('banos', ('baño', 'bano'), parse_numeric, 'Baños encontrados: {}'),
+    MapeoCampo('construccion', ('superficie construida', 'construida'), parse_numeric, 'Construcción encontrada: {} m²'),
+    MapeoCampo('terreno', ('superficie total', 'terreno'), parse_numeric, 'Terreno encontrado: {} m²'),
+    MapeoCampo('estacionamiento', ('estacionamiento', 'garage', 'cochera'), parse_numeric,
+               'Estacionamiento encontrado: {}'),
+)
+
+# ✅ NOMBRES DE TABLA → CATEGORÍAS ESTÁNDAR (la primera categoría con variante contenida gana)
+CATEGORIAS_ESTANDAR = {
+    'principales': ('principales', 'caracteristicas principales', 'caracteristicas_principales'),
+    'servicios': ('servicios', 'servicio'),
+    'ambientes': ('ambientes', 'ambiente'),
+    'seguridad': ('seguridad', 'proteccion'),
+    'comodidades_y_equipamiento': ('comodidades', 'equipamiento', 'comodidades y equipamiento'),
+}
+
+# Claves distintas recordadas (nombres de atributo y de tabla)
+TAMANO_CACHE_CLAVES = 4096
+
+
+@lru_cache(maxsize=TAMANO_CACHE_CLAVES)
+def mapeos_de_clave(clave: str) -> Tuple[MapeoCampo, ...]:
+    """
+    Mapeos de CAMPOS_BASICOS cuyas variantes aparecen en la clave.
+
+    Examples:
+        >>> [m.campo for m in mapeos_de_clave('Superficie construida en terreno')]
+        ['construccion', 'terreno']
+        >>> mapeos_de_clave('Antigüedad')
+        ()
+    """
+    clave_lower = clave.lower()
+    return tuple(m for m in CAMPOS_BASICOS if any(v in clave_lower for v in m.variantes))
+
+
+def campos_basicos(principales: Dict) -> Dict[str, Tuple[MapeoCampo, object]]:
+    """
+    Valor crudo de cada campo básico en una sola pasada sobre 'principales'.
+
+    Cada campo toma la primera clave (en orden del dict) que lo menciona,
+    aunque esa clave también llene otro campo.
+
+    Args:
+        principales (Dict): Categoría 'principales' ({"Recámaras": "3", ...})
+
+    Returns:
+        Dict[str, Tuple[MapeoCampo, object]]: campo → (mapeo, valor sin parsear),
+        en el orden de CAMPOS_BASICOS
+
+    Examples:
+        >>> encontrados = campos_basicos({'Baños': '2', 'Recámaras': '3', 'Medios baños': '1'})
+        >>> {campo: valor for campo, (_, valor) in encontrados.items()}
+        {'recamaras': '3', 'banos': '2'}
+    """
+    primeros: Dict[str, object] = {}
+    for clave, valor in principales.items():
+        for mapeo in mapeos_de_clave(clave):
+            if mapeo.campo not in primeros:
+                primeros[mapeo.campo] = valor
+        if len(primeros) == len(CAMPOS_BASICOS):
+            break
+    return {m.campo: (m, primeros[m.campo]) for m in CAMPOS_BASICOS if m.campo in primeros}
+
+
+@lru_cache(maxsize=TAMANO_CACHE_CLAVES)
+def categoria_estandar(nombre: str) -> str:
+    """
+    Categoría estándar de un nombre de tabla (o el nombre normalizado si no hay mapeo).
+
+    Examples:
+        >>> categoria_estandar('Características principales'), categoria_estandar(' Servicios ')
+        ('principales', 'servicios')
+        >>> categoria_estandar('Diseño Interior')
+        'diseno_interior'
+    """
+    nombre_normalizado = nombre.lower().strip()
+    for estandar, variantes in CATEGORIAS_ESTANDAR.items():
+        if any(v in nombre_normalizado for v in variantes):
+            return estandar
+    return nombre_normalizado.replace(' ', '_').replace('ñ', 'n')
@@ -53,6 +53,19 @@ class ConfiguracionHibridaUltraAvanzada:
         "https://inmuebles.mercadolibre.com.mx/casas/venta/jiutepec/",
     ]
     
+    # Paginación de listados: cuota de URLs por semilla y límite de páginas
+    CUOTA_POR_SEMILLA = 500
+    MAX_PAGINAS_POR_SEMILLA = 42      # MercadoLibre no pagina más allá de ~2000 resultados
+    RESULTADOS_POR_PAGINA = 48
+    
+    # Monitoreo de listados (solo tarjetas): default de propiedades por corrida
+    MAX_TARJETAS_MONITOREO = 500
+    
+    # Frontera de URLs: set exacto hasta el umbral, luego filtro de Bloom
+    FRONTERA_UMBRAL_EXACTO = 200_000
+    FRONTERA_CAPACIDAD_BLOOM = 10_000_000
+    FRONTERA_TASA_FALSOS_POSITIVOS = 0.001
+    
     # ✅ User-Agents DESKTOP específicos (2025 actualizados)
     USER_AGENTS_WINDOWS = [
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
@@ -84,6 +97,44 @@ class ConfiguracionHibridaUltraAvanzada:
         'between_properties': (1.0, 2.0),  # Reducido de (2.0, 4.0)
     }
     
+    # Presupuesto global de requests y páginas concurrentes del pool
+    MAX_RPM = 10
+    NUM_TRABAJADORES = 3
+    
+    # Cola de rastreo persistente (reanudable tras caídas)
+    ARCHIVO_COLA_RASTREO = "crawl_queue.db"
+    MAX_INTENTOS_PROPIEDAD = 3
+    
+    # Persistencia SQLite de propiedades (schema.sql)
+    ARCHIVO_BASE_DATOS = "propiedades.db"
+    TAMANO_LOTE_BD = 500
+    
+    # Resultados incrementales en JSON Lines (fsync por lote + rotación)
+    DIRECTORIO_RESULTADOS_JSONL = "resultados_jsonl"  # Un subdirectorio ejecucion_<id> por rastreo
+    JSONL_MAX_BYTES = 100_000_000
+    JSONL_MAX_SEGUNDOS = 3600
+    JSONL_FSYNC_CADA = 50
+    
+    # Exportación columnar Parquet particionada (fecha/estado/ciudad)
+    EXPORTAR_PARQUET = True
+    DIRECTORIO_PARQUET = "dataset_parquet"
+    TAMANO_LOTE_PARQUET = 10_000
+    
+    # Esperas por condición: nombre → (sleep fijo anterior ms, límite superior ms)
+    ESPERAS_LISTO = {
+        'carga_pagina': (2250, 3000),            # Antes: page_load_wait tras domcontentloaded
+        'popups': (2000, 2000),                  # Antes: sleep de 2 s; el tope no baja de ahí (popups tardíos)
+        'contenedor_specs': (2000, 2000),        # Antes: espera previa a buscar el botón
+        'boton_expansion_oculto': (3000, 3000),  # Antes: espera tras click en expansión
+        'filas_tras_expansion': (0, 1500),       # Incluida en la espera anterior
+        'filas_specs_completo': (1000, 1000),    # Antes: 1000 ms antes de recapturar (modo completo)
+        'filas_specs_optimizado': (500, 1000),   # Antes: 500 ms antes de recapturar (modo optimizado)
+        'resultados_listado': (2250, 3000),      # Antes: page_load_wait en listado
+    }
+    
+    # Persistencia de estadísticas de cascadas de selectores entre ejecuciones
+    ARCHIVO_ESTADISTICAS_SELECTORES = "selector_stats.json"
+    
     # URLs de entrada graduales
     ENTRY_URLS = [
         "https://www.mercadolibre.com.mx/",
@@ -117,6 +168,8 @@ class ResultadoPropiedad:
     pais: Optional[str] = 'México'
     estado: Optional[str] = None
     ciudad: Optional[str] = None
+    latitud: Optional[float] = None       # Coordenadas de la página (estado embebido / JSON-LD)
+    longitud: Optional[float] = None
     
     # 🔄 CAMPOS JSON FLEXIBLES (máxima flexibilidad)
     caracteristicas_principales: Optional[dict] = None  # Antigüedad, orientación, mantenimiento, etc.
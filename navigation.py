@@ -9,17 +9,32 @@ Modularizado para cumplir reglas de <500 líneas.
 
 import random
 import asyncio
+import time
+from datetime import datetime
 from typing import Optional, Dict
 from playwright.async_api import BrowserContext, Page
 from models import ConfiguracionHibridaUltraAvanzada, ProxyConfig
+from cascada_selectores import RegistroCascadas, obtener_registro_cascadas
+from frontera import clave_canonica
+from tarjetas_listado import (SCRIPT_TARJETAS_LISTADO, SELECTORES_TARJETA, argumentos_script_tarjetas,
+                              normalizar_href_listado, resultado_desde_tarjeta)
+from esperas import (GestorEsperas, obtener_gestor_esperas, SELECTOR_CONTENEDOR_SPECS,
+                     SELECTOR_FILAS_SPECS, SELECTOR_RESULTADOS_LISTADO)
 
 
 class NavigatorStealth:
     """Navegador con características stealth y anti-detección"""
     
-    def __init__(self, config: ConfiguracionHibridaUltraAvanzada):
-        """Inicializa navigator con configuración"""
+    def __init__(self, config: ConfiguracionHibridaUltraAvanzada, registro_cascadas: Optional[RegistroCascadas] = None,
+                 esperas: Optional[GestorEsperas] = None, limitador=None):
+        """
+        Inicializa navigator con configuración, registro de cascadas, gestor de esperas
+        por condición y LimitadorTasa global (opcional; sin él no se limita la tasa)
+        """
         self.config = config
+        self.registro_cascadas = registro_cascadas or obtener_registro_cascadas()
+        self.esperas = esperas or obtener_gestor_esperas()
+        self.limitador = limitador
         
     def get_random_user_agent(self) -> str:
         """Obtiene user agent aleatorio"""
@@ -206,8 +221,8 @@ class NavigatorStealth:
         try:
             print("🔍 Buscando botón 'Ver todas las características'...")
             
-            # Esperar un momento para que la página cargue completamente
-            await page.wait_for_timeout(2000)
+            # Esperar a que el contenedor de especificaciones técnicas esté en el DOM
+            await self.esperas.esperar_selector(page, 'contenedor_specs', SELECTOR_CONTENEDOR_SPECS)
             
             # Verificar qué tipo de interfaz estamos viendo
             product_interface = await page.query_selector('text="Características del producto"')
@@ -264,8 +279,9 @@ class NavigatorStealth:
                         print(f"🖱️ Haciendo click en botón: '{button_text.strip()}'")
                         await expand_button.click()
                         
-                        # Esperar a que las tablas se expandan
-                        await page.wait_for_timeout(3000)
+                        # Esperar a que el botón desaparezca y las filas dejen de crecer
+                        await self.esperas.esperar_elemento(expand_button, 'boton_expansion_oculto')
+                        await self.esperas.esperar_filas_estables(page, 'filas_tras_expansion', SELECTOR_FILAS_SPECS)
                         
                         # Verificar que las tablas se expandieron
                         tables = await page.query_selector_all('.andes-table')
@@ -340,9 +356,13 @@ class NavigatorStealth:
             print(f"⚠️ Error en scroll natural: {e}")
     
     async def navigate_safely(self, page: Page, url: str, max_retries: int = 3) -> bool:
-        """Navega a URL de forma segura con reintentos"""
+        """Navega a URL de forma segura con reintentos (cada intento consume un turno del limitador)"""
         for attempt in range(max_retries):
             try:
+                # Reason: cada page.goto es un request al sitio, también los reintentos
+                if self.limitador:
+                    await self.limitador.adquirir()
+                
                 print(f"🔗 Navegando a: {url} (intento {attempt + 1}/{max_retries})")
                 
                 # Delay antes de navegar
@@ -357,8 +377,8 @@ class NavigatorStealth:
                 if response and response.status < 400:
                     print(f"✅ Navegación exitosa: {response.status}")
                     
-                    # Esperar carga completa
-                    await self.human_delay('page_load_wait')
+                    # Esperar evento load (acotado) en lugar de un delay fijo
+                    await self.esperas.esperar_carga(page, 'carga_pagina')
                     
                     # Verificar que no sea página de error
                     page_title = await page.title()
@@ -425,9 +445,6 @@ class NavigatorStealth:
     async def handle_popup_and_cookies(self, page: Page) -> None:
         """Maneja popups y cookies automáticamente"""
         try:
-            # Esperar un momento para que aparezcan popups
-            await asyncio.sleep(2)
-            
             # Selectores comunes de popups/cookies
             popup_selectors = [
                 'button[data-testid="action:understood"]',  # MercadoLibre cookies
@@ -441,6 +458,10 @@ class NavigatorStealth:
                 '.modal-close'
             ]
             
+            # Esperar a que aparezca cualquier popup; si no aparece no hay nada que cerrar
+            if not await self.esperas.esperar_selector(page, 'popups', ', '.join(popup_selectors), estado='visible'):
+                return
+            
             for selector in popup_selectors:
                 try:
                     popup_button = await page.query_selector(selector)
@@ -461,14 +482,23 @@ class NavigatorStealth:
     # Reemplazada por enhanced_session_warming (más optimizada)
     # Ver línea 618 para la versión actual optimizada
     
-    async def extract_property_urls_from_listing(self, page: Page, max_properties: int = 10) -> list:
-        """Extrae URLs de propiedades desde página de listado"""
+    async def extract_property_urls_from_listing(self, page: Page, max_properties: int = 10,
+                                                 solo_tarjetas: bool = False) -> list:
+        """
+        Extrae URLs de propiedades desde página de listado
+        
+        Con solo_tarjetas=True devuelve registros con forma de ResultadoPropiedad
+        leídos de las tarjetas (un solo evaluate, sin visitar páginas de detalle).
+        """
         try:
-            print(f"🔍 Buscando URLs de propiedades (máximo: {max_properties})...")
+            print(f"🔍 Buscando {'tarjetas' if solo_tarjetas else 'URLs'} de propiedades (máximo: {max_properties})...")
             
             # Esperar a que carguen los resultados
             await page.wait_for_selector('.ui-search-results', timeout=15000)
-            await self.human_delay('page_load_wait')
+            await self.esperas.esperar_filas_estables(page, 'resultados_listado', SELECTOR_RESULTADOS_LISTADO)
+            
+            if solo_tarjetas:
+                return await self._extraer_tarjetas_listado(page, max_properties)
             
             # Selectores para enlaces de propiedades
             property_selectors = [
@@ -478,26 +508,32 @@ class NavigatorStealth:
                 '.ui-search-link[href*="MLM-"]'
             ]
             
-            urls_encontradas = set()
+            # Reason: clave canónica (ml_id) para no repetir variantes de la misma publicación
+            urls_encontradas = {}
             
-            for selector in property_selectors:
+            # Cascada adaptativa: el selector que históricamente aporta URLs va primero
+            for selector in self.registro_cascadas.ordenar('propiedades_listado', property_selectors):
                 try:
+                    inicio = time.perf_counter()
+                    urls_previas = len(urls_encontradas)
                     links = await page.query_selector_all(selector)
                     
                     for link in links:
                         href = await link.get_attribute('href')
                         if href and 'MLM-' in href:
-                            # Normalizar URL
-                            if href.startswith('/'):
-                                href = f"https://casa.mercadolibre.com.mx{href}"
-                            elif not href.startswith('http'):
-                                href = f"https://casa.mercadolibre.com.mx/{href}"
+                            href = normalizar_href_listado(href)
                             
-                            urls_encontradas.add(href)
+                            urls_encontradas.setdefault(clave_canonica(href), href)
                             
                             if len(urls_encontradas) >= max_properties:
                                 break
                     
+                    self.registro_cascadas.registrar(
+                        'propiedades_listado', [selector],
+                        ganador=selector if len(urls_encontradas) > urls_previas else None,
+                        latencias_ms={selector: (time.perf_counter() - inicio) * 1000}
+                    )
+                    
                     if len(urls_encontradas) >= max_properties:
                         break
                         
@@ -505,7 +541,7 @@ class NavigatorStealth:
                     print(f"⚠️ Error con selector {selector}: {e}")
                     continue
             
-            urls_lista = list(urls_encontradas)[:max_properties]
+            urls_lista = list(urls_encontradas.values())[:max_properties]
             print(f"✅ Encontradas {len(urls_lista)} URLs de propiedades")
             
             return urls_lista
@@ -514,6 +550,30 @@ class NavigatorStealth:
             print(f"❌ Error extrayendo URLs: {e}")
             return []
 
+    async def _extraer_tarjetas_listado(self, page: Page, max_properties: int) -> list:
+        """Registros de las tarjetas del listado en un solo page.evaluate (modo monitoreo)"""
+        selectores = self.registro_cascadas.ordenar('tarjetas_listado', SELECTORES_TARJETA['tarjeta'])
+        inicio = time.perf_counter()
+        payload = await page.evaluate(SCRIPT_TARJETAS_LISTADO, argumentos_script_tarjetas(selectores, max_properties))
+        ganador = payload.get('selector')
+        probados = selectores[:selectores.index(ganador) + 1] if ganador else selectores
+        self.registro_cascadas.registrar(
+            'tarjetas_listado', probados, ganador,
+            latencias_ms={ganador: (time.perf_counter() - inicio) * 1000} if ganador else None
+        )
+        
+        # Reason: misma deduplicación por ml_id que el modo de URLs
+        timestamp = datetime.now().isoformat()
+        registros = {}
+        for tarjeta in payload.get('tarjetas', []):
+            registro = resultado_desde_tarjeta(tarjeta, timestamp)
+            if registro:
+                registros.setdefault(clave_canonica(registro['url']), registro)
+        
+        registros_lista = list(registros.values())[:max_properties]
+        print(f"✅ {len(registros_lista)} propiedades leídas de tarjetas ({payload.get('tiempo_ms', 0):.0f} ms en página)")
+        return registros_lista
+
     # ===== NUEVAS FUNCIONES PARA SCRAPING MASIVO =====
     
     async def rate_limit_control(self, request_count: int, session_start_time: float) -> None:
@@ -529,7 +589,7 @@ class NavigatorStealth:
                 rpm_actual = (request_count * 60) / elapsed_time
                 
                 # Rate limit: máximo 10 requests por minuto (menos conservador)
-                max_rpm = 10  # Aumentado de 8 a 10
+                max_rpm = self.config.MAX_RPM
                 
                 if rpm_actual > max_rpm:
                     # Calcular delay necesario
@@ -0,0 +1,790 @@
+#!/usr/bin/env python3
+"""
+NOMENCLÁTOR DE MÉXICO - SCRAPER MERCADOLIBRE
+============================================
+
+Catálogo geográfico offline para resolver estado y ciudad (municipio o
+alcaldía) de direcciones sin servicios de geocodificación:
+- 32 entidades federativas con abreviaturas y nombres oficiales largos
+- Municipios por estado (incluido completo para Morelos, CDMX y Estado de
+  México; principales municipios del resto) con alias de localidades
+  conocidas (Cancún → Benito Juárez, Villahermosa → Centro, ...)
+- Colonias frecuentes asociadas a su municipio
+- Centroides aproximados de los municipios más poblados (ubicación de respaldo
+  para el índice espacial cuando la página no trae coordenadas)
+
+Todos los nombres se compilan en un autómata Aho-Corasick, de modo que una
+dirección se resuelve con un solo recorrido lineal del texto normalizado.
+El catálogo completo de INEGI (AGEEML, columnas NOM_ENT/NOM_MUN) se agrega
+automáticamente si existe municipios_inegi.csv junto a este módulo.
+"""
+
+import csv
+import re
+import unicodedata
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+
+RUTA_CATALOGO_INEGI = Path(__file__).with_name("municipios_inegi.csv")
+
+# Direcciones distintas recordadas por resolver_ubicacion
+TAMANO_CACHE_UBICACIONES = 65_536
+
+# ✅ ENTIDADES FEDERATIVAS: nombre canónico → alias (se normalizan al compilar)
+ESTADOS = {
+    'Aguascalientes': ('ags',),
+    'Baja California': ('bc', 'b c'),
+    'Baja California Sur': ('bcs', 'b c s'),
+    'Campeche': ('camp',),
+    'Chiapas': ('chis',),
+    'Chihuahua': ('chih',),
+    'Ciudad de México': ('cdmx', 'cd mx', 'cd de mexico', 'df', 'd f', 'distrito federal', 'mexico df', 'mexico d f'),
+    'Coahuila': ('coah', 'coahuila de zaragoza'),
+    'Colima': (),
+    'Durango': ('dgo',),
+    'Estado de México': ('edomex', 'edo mex', 'edo de mex', 'edo de mexico', 'edo mexico', 'estado de mex'),
+    'Guanajuato': ('gto',),
+    'Guerrero': ('gro',),
+    'Hidalgo': ('hgo',),
+    'Jalisco': ('jal',),
+    'Michoacán': ('mich', 'michoacan de ocampo'),
+    'Morelos': ('mor',),
+    'Nayarit': ('nay',),
+    'Nuevo León': ('nl', 'n l'),
+    'Oaxaca': ('oax',),
+    'Puebla': ('pue',),
+    'Querétaro': ('qro', 'queretaro de arteaga'),
+    'Quintana Roo': ('q roo', 'qroo'),
+    'San Luis Potosí': ('slp', 's l p'),
+    'Sinaloa': (),
+    'Sonora': (),
+    'Tabasco': ('tab',),
+    'Tamaulipas': ('tamps',),
+    'Tlaxcala': ('tlax',),
+    'Veracruz': ('ver', 'veracruz de ignacio de la llave'),
+    'Yucatán': ('yuc',),
+    'Zacatecas': ('zac',),
+}
+
+# Reason: "México" suele ser el país al final de la dirección; solo cuenta como
+# Estado de México si no aparece ninguna otra entidad
+ALIAS_ESTADO_DEBILES = {'mexico': 'Estado de México', 'mex': 'Estado de México'}
+
+# ✅ MUNICIPIOS Y ALCALDÍAS: estado → nombres canónicos
+MUNICIPIOS = {
+    'Aguascalientes': (
+        'Aguascalientes', 'Asientos', 'Calvillo', 'Cosío', 'Jesús María', 'Pabellón de Arteaga',
+        'Rincón de Romos', 'San José de Gracia', 'Tepezalá', 'El Llano', 'San Francisco de los Romo',
+    ),
+    'Baja California': (
+        'Ensenada', 'Mexicali', 'Tecate', 'Tijuana', 'Playas de Rosarito', 'San Quintín', 'San Felipe',
+    ),
+    'Baja California Sur': ('Comondú', 'Mulegé', 'La Paz', 'Los Cabos', 'Loreto'),
+    'Campeche': (
+        'Calakmul', 'Calkiní', 'Campeche', 'Candelaria', 'Carmen', 'Champotón', 'Escárcega',
+        'Hecelchakán', 'Hopelchén', 'Palizada', 'Tenabo', 'Seybaplaya', 'Dzitbalché',
+    ),
+    'Chiapas': (
+        'Tuxtla Gutiérrez', 'Tapachula', 'San Cristóbal de las Casas', 'Comitán de Domínguez', 'Palenque',
+        'Chiapa de Corzo', 'Tonalá', 'Ocosingo', 'Villaflores', 'Berriozábal', 'Cintalapa', 'Huixtla', 'Arriaga',
+    ),
+    'Chihuahua': (
+        'Chihuahua', 'Juárez', 'Cuauhtémoc', 'Delicias', 'Hidalgo del Parral', 'Nuevo Casas Grandes',
+        'Meoqui', 'Ojinaga',
+    ),
+    'Ciudad de México': (
+        'Álvaro Obregón', 'Azcapotzalco', 'Benito Juárez', 'Coyoacán', 'Cuajimalpa de Morelos', 'Cuauhtémoc',
+        'Gustavo A. Madero', 'Iztacalco', 'Iztapalapa', 'La Magdalena Contreras', 'Miguel Hidalgo',
+        'Milpa Alta', 'Tláhuac', 'Tlalpan', 'Venustiano Carranza', 'Xochimilco',
+    ),
+    'Coahuila': (
+        'Saltillo', 'Torreón', 'Monclova', 'Piedras Negras', 'Acuña', 'Ramos Arizpe', 'Sabinas',
+        'Matamoros', 'Parras', 'Arteaga', 'Francisco I. Madero', 'Castaños',
+    ),
+    'Colima': (
+        'Armería', 'Colima', 'Comala', 'Coquimatlán', 'Cuauhtémoc', 'Ixtlahuacán', 'Manzanillo',
+        'Minatitlán', 'Tecomán', 'Villa de Álvarez',
+    ),
+    'Durango': (
+        'Durango', 'Gómez Palacio', 'Lerdo', 'Santiago Papasquiaro', 'Pueblo Nuevo', 'Canatlán',
+        'Guadalupe Victoria', 'Mapimí', 'Nombre de Dios',
+    ),
+    'Estado de México': (
+        'Acambay', 'Acolman', 'Aculco', 'Almoloya de Alquisiras', 'Almoloya de Juárez', 'Almoloya del Río',
+        'Amanalco', 'Amatepec', 'Amecameca', 'Apaxco', 'Atenco', 'Atizapán', 'Atizapán de Zaragoza',
+        'Atlacomulco', 'Atlautla', 'Axapusco', 'Ayapango', 'Calimaya', 'Capulhuac', 'Coacalco de Berriozábal',
+        'Coatepec Harinas', 'Cocotitlán', 'Coyotepec', 'Cuautitlán', 'Cuautitlán Izcalli', 'Chalco',
+        'Chapa de Mota', 'Chapultepec', 'Chiautla', 'Chicoloapan', 'Chiconcuac', 'Chimalhuacán',
+        'Donato Guerra', 'Ecatepec de Morelos', 'Ecatzingo', 'El Oro', 'Huehuetoca', 'Hueypoxtla',
+        'Huixquilucan', 'Isidro Fabela', 'Ixtapaluca', 'Ixtapan de la Sal', 'Ixtapan del Oro', 'Ixtlahuaca',
+        'Jaltenco', 'Jilotepec', 'Jilotzingo', 'Jiquipilco', 'Jocotitlán', 'Joquicingo', 'Juchitepec',
+        'La Paz', 'Lerma', 'Luvianos', 'Malinalco', 'Melchor Ocampo', 'Metepec', 'Mexicaltzingo', 'Morelos',
+        'Naucalpan de Juárez', 'Nextlalpan', 'Nezahualcóyotl', 'Nicolás Romero', 'Nopaltepec', 'Ocoyoacac',
+        'Ocuilan', 'Otumba', 'Otzoloapan', 'Otzolotepec', 'Ozumba', 'Papalotla', 'Polotitlán', 'Rayón',
+        'San Antonio la Isla', 'San Felipe del Progreso', 'San José del Rincón', 'San Martín de las Pirámides',
+        'San Mateo Atenco', 'San Simón de Guerrero', 'Santo Tomás', 'Soyaniquilpan de Juárez', 'Sultepec',
+        'Tecámac', 'Tejupilco', 'Temamatla', 'Temascalapa', 'Temascalcingo', 'Temascaltepec', 'Temoaya',
+        'Tenancingo', 'Tenango del Aire', 'Tenango del Valle', 'Teoloyucan', 'Teotihuacán', 'Tepetlaoxtoc',
+        'Tepetlixpa', 'Tepotzotlán', 'Tequixquiac', 'Texcaltitlán', 'Texcalyacac', 'Texcoco', 'Tezoyuca',
+        'Tianguistenco', 'Timilpan', 'Tlalmanalco', 'Tlalnepantla de Baz', 'Tlatlaya', 'Toluca', 'Tonanitla',
+        'Tonatico', 'Tultepec', 'Tultitlán', 'Valle de Bravo', 'Valle de Chalco Solidaridad', 'Villa de Allende',
+        'Villa del Carbón', 'Villa Guerrero', 'Villa Victoria', 'Xalatlaco', 'Xonacatlán', 'Zacazonapan',
+        'Zacualpan', 'Zinacantepec', 'Zumpahuacán', 'Zumpango',
+    ),
+    'Guanajuato': (
+        'León', 'Irapuato', 'Celaya', 'Salamanca', 'Guanajuato', 'Silao de la Victoria', 'San Miguel de Allende',
+        'Dolores Hidalgo Cuna de la Independencia Nacional', 'Pénjamo', 'Valle de Santiago', 'Acámbaro',
+        'San Francisco del Rincón', 'Cortazar', 'Moroleón', 'Uriangato', 'Salvatierra', 'Apaseo el Grande',
+        'Apaseo el Alto', 'Villagrán', 'San Luis de la Paz', 'Purísima del Rincón', 'Comonfort', 'Abasolo',
+    ),
+    'Guerrero': (
+        'Acapulco de Juárez', 'Chilpancingo de los Bravo', 'Iguala de la Independencia', 'Zihuatanejo de Azueta',
+        'Taxco de Alarcón', 'Tlapa de Comonfort', 'Coyuca de Benítez', 'Chilapa de Álvarez', 'Petatlán',
+        'Atoyac de Álvarez', 'Ometepec', 'Tecpan de Galeana', 'Teloloapan', 'Huitzuco de los Figueroa',
+        'Pungarabato',
+    ),
+    'Hidalgo': (
+        'Pachuca de Soto', 'Mineral de la Reforma', 'Tulancingo de Bravo', 'Tula de Allende', 'Tizayuca',
+        'Huejutla de Reyes', 'Ixmiquilpan', 'Actopan', 'Tepeji del Río de Ocampo', 'Apan', 'Tepeapulco',
+        'Zempoala', 'Mineral del Chico', 'Huasca de Ocampo', 'Atotonilco de Tula', 'Tlaxcoapan', 'Zimapán',
+    ),
+    'Jalisco': (
+        'Guadalajara', 'Zapopan', 'San Pedro Tlaquepaque', 'Tonalá', 'Tlajomulco de Zúñiga', 'El Salto',
+        'Puerto Vallarta', 'Lagos de Moreno', 'Tepatitlán de Morelos', 'Zapotlán el Grande', 'Ocotlán',
+        'Arandas', 'Chapala', 'Tala', 'Zapotlanejo', 'Ameca', 'Autlán de Navarro', 'Juanacatlán',
+        'Ixtlahuacán de los Membrillos', 'Poncitlán', 'Jocotepec', 'Tequila', 'Cihuatlán', 'La Barca',
+        'San Juan de los Lagos', 'Encarnación de Díaz', 'Tamazula de Gordiano', 'Sayula',
+    ),
+    'Michoacán': (
+        'Morelia', 'Uruapan', 'Zamora', 'Lázaro Cárdenas', 'Zitácuaro', 'Apatzingán', 'Pátzcuaro', 'Hidalgo',
+        'La Piedad', 'Sahuayo', 'Jacona', 'Tarímbaro', 'Maravatío', 'Puruándiro', 'Zacapu', 'Los Reyes',
+        'Huetamo', 'Tacámbaro', 'Quiroga',
+    ),
+    'Morelos': (
+        'Amacuzac', 'Atlatlahucan', 'Axochiapan', 'Ayala', 'Coatetelco', 'Coatlán del Río', 'Cuautla',
+        'Cuernavaca', 'Emiliano Zapata', 'Hueyapan', 'Huitzilac', 'Jantetelco', 'Jiutepec',
+        'Jojutla', 'Jonacatepec de Leandro Valle', 'Mazatepec', 'Miacatlán', 'Ocuituco', 'Puente de Ixtla',
+        'Temixco', 'Temoac', 'Tepalcingo', 'Tepoztlán', 'Tetecala', 'Tetela del Volcán', 'Tlalnepantla',
+        'Tlaltizapán de Zapata', 'Tlaquiltenango', 'Tlayacapan', 'Totolapan', 'Xochitepec', 'Xoxocotla',
+        'Yautepec', 'Yecapixtla', 'Zacatepec', 'Zacualpan de Amilpas',
+    ),
+    'Nayarit': (
+        'Tepic', 'Bahía de Banderas', 'Compostela', 'Santiago Ixcuintla', 'Tuxpan', 'Xalisco', 'San Blas',
+        'Acaponeta', 'Tecuala', 'Ixtlán del Río', 'Rosamorada',
+    ),
+    'Nuevo León': (
+        'Monterrey', 'Guadalupe', 'San Nicolás de los Garza', 'Apodaca', 'General Escobedo', 'Santa Catarina',
+        'San Pedro Garza García', 'Juárez', 'García', 'Santiago', 'Cadereyta Jiménez', 'Salinas Victoria',
+        'Pesquería', 'Linares', 'Montemorelos', 'Ciénega de Flores', 'General Zuazua', 'Sabinas Hidalgo',
+    ),
+    'Oaxaca': (
+        'Oaxaca de Juárez', 'Santa Cruz Xoxocotlán', 'San Juan Bautista Tuxtepec', 'Salina Cruz',
+        'Juchitán de Zaragoza', 'Santo Domingo Tehuantepec', 'Santa Lucía del Camino', 'Santa María Huatulco',
+        'San Pedro Pochutla', 'Santa María Colotepec', 'San Pedro Mixtepec', 'Heroica Ciudad de Huajuapan de León',
+        'Santiago Pinotepa Nacional', 'Matías Romero Avendaño', 'Villa de Zaachila', 'San Antonio de la Cal',
+        'Tlacolula de Matamoros', 'Miahuatlán de Porfirio Díaz',
+    ),
+    'Puebla': (
+        'Puebla', 'San Andrés Cholula', 'San Pedro Cholula', 'Tehuacán', 'Atlixco', 'San Martín Texmelucan',
+        'Amozoc', 'Cuautlancingo', 'Teziutlán', 'Huauchinango', 'Izúcar de Matamoros', 'Zacatlán',
+        'Cuetzalan del Progreso', 'Tepeaca', 'Coronango', 'Ocoyucan', 'Acatzingo', 'Chignahuapan', 'Xicotepec',
+    ),
+    'Querétaro': (
+        'Querétaro', 'Corregidora', 'El Marqués', 'San Juan del Río', 'Tequisquiapan', 'Ezequiel Montes',
+        'Colón', 'Pedro Escobedo', 'Huimilpan', 'Amealco de Bonfil', 'Cadereyta de Montes', 'Jalpan de Serra',
+        'Pinal de Amoles', 'Tolimán',
+    ),
+    'Quintana Roo': (
+        'Benito Juárez', 'Solidaridad', 'Tulum', 'Cozumel', 'Othón P. Blanco', 'Felipe Carrillo Puerto',
+        'Isla Mujeres', 'Lázaro Cárdenas', 'Bacalar', 'José María Morelos', 'Puerto Morelos',
+    ),
+    'San Luis Potosí': (
+        'San Luis Potosí', 'Soledad de Graciano Sánchez', 'Ciudad Valles', 'Matehuala', 'Rioverde',
+        'Ciudad Fernández', 'Tamazunchale', 'Cerro de San Pedro', 'Xilitla', 'Aquismón', 'Tamuín', 'Ébano',
+    ),
+    'Sinaloa': (
+        'Culiacán', 'Mazatlán', 'Ahome', 'Guasave', 'Navolato', 'Salvador Alvarado', 'El Fuerte', 'Escuinapa',
+        'Elota', 'Mocorito', 'Cosalá', 'Badiraguato', 'Choix', 'Eldorado', 'Juan José Ríos',
+    ),
+    'Sonora': (
+        'Hermosillo', 'Cajeme', 'Nogales', 'San Luis Río Colorado', 'Navojoa', 'Guaymas', 'Empalme',
+        'Agua Prieta', 'Caborca', 'Puerto Peñasco', 'Huatabampo', 'Cananea', 'Etchojoa', 'Álamos',
+    ),
+    'Tabasco': (
+        'Centro', 'Cárdenas', 'Comalcalco', 'Huimanguillo', 'Macuspana', 'Cunduacán', 'Paraíso', 'Nacajuca',
+        'Tenosique', 'Jalpa de Méndez', 'Teapa', 'Balancán', 'Emiliano Zapata', 'Jalapa', 'Centla', 'Jonuta',
+        'Tacotalpa',
+    ),
+    'Tamaulipas': (
+        'Reynosa', 'Matamoros', 'Nuevo Laredo', 'Victoria', 'Tampico', 'Ciudad Madero', 'Altamira', 'El Mante',
+        'Río Bravo', 'Valle Hermoso', 'San Fernando', 'Soto la Marina',
+    ),
+    'Tlaxcala': (
+        'Tlaxcala', 'Apizaco', 'Huamantla', 'Chiautempan', 'Calpulalpan', 'Zacatelco', 'Tlaxco',
+        'Tetla de la Solidaridad', 'San Pablo del Monte', 'Papalotla de Xicohténcatl', 'Contla de Juan Cuamatzi',
+        'Yauhquemehcan', 'Xaloztoc', 'Totolac', 'Ixtacuixtla de Mariano Matamoros',
+    ),
+    'Veracruz': (
+        'Veracruz', 'Boca del Río', 'Xalapa', 'Coatzacoalcos', 'Córdoba', 'Orizaba', 'Poza Rica de Hidalgo',
+        'Minatitlán', 'Tuxpan', 'Papantla', 'San Andrés Tuxtla', 'Martínez de la Torre', 'Alvarado',
+        'Tierra Blanca', 'Coatepec', 'Medellín de Bravo', 'Banderilla', 'Emiliano Zapata', 'Fortín',
+        'Cosoleacaque', 'Pánuco', 'Tantoyuca', 'Catemaco', 'Alto Lucero', 'Actopan', 'Perote', 'Acayucan',
+    ),
+    'Yucatán': (
+        'Mérida', 'Kanasín', 'Valladolid', 'Progreso', 'Tizimín', 'Umán', 'Motul', 'Ticul', 'Tekax', 'Izamal',
+        'Conkal', 'Hunucmá', 'Oxkutzcab', 'Peto', 'Chicxulub Pueblo', 'Ucú', 'Tixkokob', 'Tixpéhual',
+    ),
+    'Zacatecas': (
+        'Zacatecas', 'Fresnillo', 'Guadalupe', 'Jerez', 'Río Grande', 'Sombrerete', 'Calera', 'Jalpa',
+        'Ojocaliente', 'Pinos', 'Tlaltenango de Sánchez Román', 'Valparaíso', 'Nochistlán de Mejía',
+    ),
+}
+
+# Reason: nombres de municipio que en una dirección casi siempre son otra cosa
+# ("Col. Centro", "Calle Morelos", "Av. Hidalgo"); solo se reconocen por alias
+MUNICIPIOS_NO_BUSCABLES = {'Centro', 'Carmen', 'Morelos', 'Hidalgo', 'Victoria', 'García', 'Santiago', 'Colón'}
+
+# (estado, alias) → municipio canónico (localidades, cabeceras y nombres cortos)
+ALIAS_MUNICIPIOS = {
+    ('Baja California Sur', 'Cabo San Lucas'): 'Los Cabos',
+    ('Baja California Sur', 'San José del Cabo'): 'Los Cabos',
+    ('Baja California', 'Rosarito'): 'Playas de Rosarito',
+    ('Campeche', 'Ciudad del Carmen'): 'Carmen',
+    ('Chiapas', 'San Cristóbal'): 'San Cristóbal de las Casas',
+    ('Chiapas', 'Comitán'): 'Comitán de Domínguez',
+    ('Chihuahua', 'Ciudad Juárez'): 'Juárez',
+    ('Chihuahua', 'Parral'): 'Hidalgo del Parral',
+    ('Ciudad de México', 'Cuajimalpa'): 'Cuajimalpa de Morelos',
+    ('Ciudad de México', 'Magdalena Contreras'): 'La Magdalena Contreras',
+    ('Ciudad de México', 'GAM'): 'Gustavo A. Madero',
+    ('Coahuila', 'Ciudad Acuña'): 'Acuña',
+    ('Durango', 'Victoria de Durango'): 'Durango',
+    ('Durango', 'Ciudad Lerdo'): 'Lerdo',
+    ('Estado de México', 'Ecatepec'): 'Ecatepec de Morelos',
+    ('Estado de México', 'Naucalpan'): 'Naucalpan de Juárez',
+    ('Estado de México', 'Coacalco'): 'Coacalco de Berriozábal',
+    ('Estado de México', 'Ciudad Nezahualcóyotl'): 'Nezahualcóyotl',
+    ('Estado de México', 'Neza'): 'Nezahualcóyotl',
+    ('Estado de México', 'Toluca de Lerdo'): 'Toluca',
+    ('Estado de México', 'Valle de Chalco'): 'Valle de Chalco Solidaridad',
+    ('Estado de México', 'Tlalnepantla'): 'Tlalnepantla de Baz',
+    ('Estado de México', 'Interlomas'): 'Huixquilucan',
+    ('Estado de México', 'Ciudad Satélite'): 'Naucalpan de Juárez',
+    ('Guanajuato', 'Silao'): 'Silao de la Victoria',
+    ('Guanajuato', 'San Miguel Allende'): 'San Miguel de Allende',
+    ('Guanajuato', 'Dolores Hidalgo'): 'Dolores Hidalgo Cuna de la Independencia Nacional',
+    ('Guerrero', 'Acapulco'): 'Acapulco de Juárez',
+    ('Guerrero', 'Chilpancingo'): 'Chilpancingo de los Bravo',
+    ('Guerrero', 'Iguala'): 'Iguala de la Independencia',
+    ('Guerrero', 'Zihuatanejo'): 'Zihuatanejo de Azueta',
+    ('Guerrero', 'Ixtapa Zihuatanejo'): 'Zihuatanejo de Azueta',
+    ('Guerrero', 'Taxco'): 'Taxco de Alarcón',
+    ('Guerrero', 'Tlapa'): 'Tlapa de Comonfort',
+    ('Hidalgo', 'Pachuca'): 'Pachuca de Soto',
+    ('Hidalgo', 'Tulancingo'): 'Tulancingo de Bravo',
+    ('Hidalgo', 'Tepeji del Río'): 'Tepeji del Río de Ocampo',
+    ('Hidalgo', 'Huejutla'): 'Huejutla de Reyes',
+    ('Hidalgo', 'Ciudad Sahagún'): 'Tepeapulco',
+    ('Jalisco', 'Tlaquepaque'): 'San Pedro Tlaquepaque',
+    ('Jalisco', 'Tlajomulco'): 'Tlajomulco de Zúñiga',
+    ('Jalisco', 'Tepatitlán'): 'Tepatitlán de Morelos',
+    ('Jalisco', 'Ciudad Guzmán'): 'Zapotlán el Grande',
+    ('Jalisco', 'Autlán'): 'Autlán de Navarro',
+    ('Jalisco', 'Ajijic'): 'Chapala',
+    ('Michoacán', 'Ciudad Hidalgo'): 'Hidalgo',
+    ('Michoacán', 'Zamora de Hidalgo'): 'Zamora',
+    ('Michoacán', 'Heroica Zitácuaro'): 'Zitácuaro',
+    ('Morelos', 'Jonacatepec'): 'Jonacatepec de Leandro Valle',
+    ('Morelos', 'Tlaltizapán'): 'Tlaltizapán de Zapata',
+    ('Morelos', 'Zacualpan'): 'Zacualpan de Amilpas',
+    ('Morelos', 'Yautepec de Zaragoza'): 'Yautepec',
+    ('Morelos', 'Zacatepec de Hidalgo'): 'Zacatepec',
+    ('Morelos', 'Oaxtepec'): 'Yautepec',
+    ('Morelos', 'Tequesquitengo'): 'Jojutla',
+    ('Nayarit', 'Nuevo Vallarta'): 'Bahía de Banderas',
+    ('Nayarit', 'Bucerías'): 'Bahía de Banderas',
+    ('Nayarit', 'Sayulita'): 'Bahía de Banderas',
+    ('Nuevo León', 'San Nicolás'): 'San Nicolás de los Garza',
+    ('Nuevo León', 'Escobedo'): 'General Escobedo',
+    ('Nuevo León', 'Cadereyta'): 'Cadereyta Jiménez',
+    ('Oaxaca', 'Xoxocotlán'): 'Santa Cruz Xoxocotlán',
+    ('Oaxaca', 'Tuxtepec'): 'San Juan Bautista Tuxtepec',
+    ('Oaxaca', 'Juchitán'): 'Juchitán de Zaragoza',
+    ('Oaxaca', 'Tehuantepec'): 'Santo Domingo Tehuantepec',
+    ('Oaxaca', 'Huatulco'): 'Santa María Huatulco',
+    ('Oaxaca', 'Puerto Escondido'): 'San Pedro Mixtepec',
+    ('Oaxaca', 'Pochutla'): 'San Pedro Pochutla',
+    ('Oaxaca', 'Huajuapan de León'): 'Heroica Ciudad de Huajuapan de León',
+    ('Oaxaca', 'Pinotepa Nacional'): 'Santiago Pinotepa Nacional',
+    ('Oaxaca', 'Zaachila'): 'Villa de Zaachila',
+    ('Puebla', 'Cholula'): 'San Pedro Cholula',
+    ('Puebla', 'Texmelucan'): 'San Martín Texmelucan',
+    ('Puebla', 'Izúcar'): 'Izúcar de Matamoros',
+    ('Puebla', 'Cuetzalan'): 'Cuetzalan del Progreso',
+    ('Puebla', 'Puebla de Zaragoza'): 'Puebla',
+    ('Querétaro', 'Santiago de Querétaro'): 'Querétaro',
+    ('Querétaro', 'El Pueblito'): 'Corregidora',
+    ('Quintana Roo', 'Cancún'): 'Benito Juárez',
+    ('Quintana Roo', 'Playa del Carmen'): 'Solidaridad',
+    ('Quintana Roo', 'Chetumal'): 'Othón P. Blanco',
+    ('San Luis Potosí', 'Río Verde'): 'Rioverde',
+    ('Sinaloa', 'Los Mochis'): 'Ahome',
+    ('Sinaloa', 'Guamúchil'): 'Salvador Alvarado',
+    ('Sinaloa', 'Culiacán Rosales'): 'Culiacán',
+    ('Sonora', 'Ciudad Obregón'): 'Cajeme',
+    ('Sonora', 'Heroica Nogales'): 'Nogales',
+    ('Sonora', 'San Carlos Nuevo Guaymas'): 'Guaymas',
+    ('Tabasco', 'Villahermosa'): 'Centro',
+    ('Tamaulipas', 'Ciudad Victoria'): 'Victoria',
+    ('Tamaulipas', 'Ciudad Mante'): 'El Mante',
+    ('Tlaxcala', 'Santa Ana Chiautempan'): 'Chiautempan',
+    ('Veracruz', 'Xalapa Enríquez'): 'Xalapa',
+    ('Veracruz', 'Poza Rica'): 'Poza Rica de Hidalgo',
+}
+
+# ✅ COLONIAS FRECUENTES: (estado, municipio) → colonias (solo sin municipio explícito)
+COLONIAS = {
+    ('Ciudad de México', 'Benito Juárez'): (
+        'Del Valle', 'Narvarte', 'Nápoles', 'Portales', 'Mixcoac', 'Insurgentes Mixcoac', 'Letrán Valle', 'Xoco',
+        'Santa Cruz Atoyac', 'Álamos',
+    ),
+    ('Ciudad de México', 'Cuauhtémoc'): (
+        'Roma Norte', 'Roma Sur', 'Condesa', 'Hipódromo Condesa', 'Doctores', 'Santa María la Ribera',
+        'San Rafael', 'Tabacalera',
+    ),
+    ('Ciudad de México', 'Miguel Hidalgo'): (
+        'Polanco', 'Lomas de Chapultepec', 'Anzures', 'Granada', 'Tacubaya', 'Escandón', 'Irrigación',
+    ),
+    ('Ciudad de México', 'Coyoacán'): ('Copilco', 'Romero de Terreros', 'Ciudad Universitaria'),
+    ('Ciudad de México', 'Álvaro Obregón'): ('San Ángel', 'Jardines del Pedregal', 'Guadalupe Inn', 'Las Águilas'),
+    ('Morelos', 'Cuernavaca'): (
+        'Vista Hermosa', 'Rancho Cortés', 'Lomas de Cortés', 'Delicias', 'Palmira', 'Chapultepec', 'Tlaltenango',
+        'Ahuatepec', 'Ocotepec', 'Chamilpa', 'Acapantzingo', 'Lomas de la Selva', 'Jardines de Cuernavaca',
+    ),
+    ('Morelos', 'Jiutepec'): ('Tejalpa', 'Civac'),
+    ('Morelos', 'Temixco'): ('Burgos', 'Burgos Bugambilias', 'Acatlipa'),
+    ('Jalisco', 'Zapopan'): ('Puerta de Hierro', 'Valle Real', 'Ciudad Granja'),
+    ('Jalisco', 'Guadalajara'): ('Providencia', 'Americana', 'Lafayette'),
+    ('Nuevo León', 'San Pedro Garza García'): ('Del Valle', 'Valle Oriente'),
+    ('Nuevo León', 'Monterrey'): ('Cumbres', 'Contry'),
+    ('Querétaro', 'Querétaro'): ('Juriquilla', 'Milenio III'),
+    ('Yucatán', 'Mérida'): ('Altabrisa', 'Montes de Amé', 'Temozón Norte', 'Cholul'),
+}
+
+# ✅ CENTROIDES APROXIMADOS (cabecera municipal, ±2 km): (estado, municipio) → (lat, lon)
+# Reason: ubicación de respaldo para propiedades sin coordenadas en la página
+CENTROIDES_MUNICIPIOS = {
+    # Morelos
+    ('Morelos', 'Cuernavaca'): (18.9242, -99.2216),
+    ('Morelos', 'Jiutepec'): (18.8816, -99.1772),
+    ('Morelos', 'Temixco'): (18.8497, -99.2275),
+    ('Morelos', 'Emiliano Zapata'): (18.8400, -99.1830),
+    ('Morelos', 'Xochitepec'): (18.7800, -99.2320),
+    ('Morelos', 'Cuautla'): (18.8122, -98.9549),
+    ('Morelos', 'Yautepec'): (18.8833, -99.0667),
+    ('Morelos', 'Tepoztlán'): (18.9856, -99.0997),
+    ('Morelos', 'Jojutla'): (18.6150, -99.1800),
+    ('Morelos', 'Zacatepec'): (18.6545, -99.1897),
+    ('Morelos', 'Puente de Ixtla'): (18.6167, -99.3167),
+    ('Morelos', 'Yecapixtla'): (18.8833, -98.8667),
+    ('Morelos', 'Ayala'): (18.7667, -98.9833),
+    ('Morelos', 'Huitzilac'): (19.0283, -99.2672),
+    ('Morelos', 'Tlayacapan'): (18.9556, -98.9811),
+    ('Morelos', 'Atlatlahucan'): (18.9333, -98.9000),
+    ('Morelos', 'Tlaltizapán de Zapata'): (18.6833, -99.1167),
+    ('Morelos', 'Tlaquiltenango'): (18.6333, -99.1667),
+    # Ciudad de México
+    ('Ciudad de México', 'Álvaro Obregón'): (19.3590, -99.2030),
+    ('Ciudad de México', 'Azcapotzalco'): (19.4870, -99.1840),
+    ('Ciudad de México', 'Benito Juárez'): (19.3720, -99.1570),
+    ('Ciudad de México', 'Coyoacán'): (19.3500, -99.1620),
+    ('Ciudad de México', 'Cuajimalpa de Morelos'): (19.3570, -99.2990),
+    ('Ciudad de México', 'Cuauhtémoc'): (19.4330, -99.1450),
+    ('Ciudad de México', 'Gustavo A. Madero'): (19.4820, -99.1130),
+    ('Ciudad de México', 'Iztacalco'): (19.3950, -99.0970),
+    ('Ciudad de México', 'Iztapalapa'): (19.3570, -99.0600),
+    ('Ciudad de México', 'La Magdalena Contreras'): (19.3040, -99.2410),
+    ('Ciudad de México', 'Miguel Hidalgo'): (19.4280, -99.2040),
+    ('Ciudad de México', 'Milpa Alta'): (19.1920, -99.0230),
+    ('Ciudad de México', 'Tláhuac'): (19.2860, -99.0050),
+    ('Ciudad de México', 'Tlalpan'): (19.2940, -99.1710),
+    ('Ciudad de México', 'Venustiano Carranza'): (19.4300, -99.1000),
+    ('Ciudad de México', 'Xochimilco'): (19.2570, -99.1030),
+    # Estado de México
+    ('Estado de México', 'Toluca'): (19.2826, -99.6557),
+    ('Estado de México', 'Metepec'): (19.2510, -99.6050),
+    ('Estado de México', 'Zinacantepec'): (19.2840, -99.7330),
+    ('Estado de México', 'Lerma'): (19.2850, -99.5110),
+    ('Estado de México', 'Naucalpan de Juárez'): (19.4785, -99.2396),
+    ('Estado de México', 'Tlalnepantla de Baz'): (19.5400, -99.1950),
+    ('Estado de México', 'Ecatepec de Morelos'): (19.6010, -99.0500),
+    ('Estado de México', 'Nezahualcóyotl'): (19.4000, -99.0150),
+    ('Estado de México', 'Huixquilucan'): (19.3600, -99.3500),
+    ('Estado de México', 'Atizapán de Zaragoza'): (19.5560, -99.2670),
+    ('Estado de México', 'Cuautitlán Izcalli'): (19.6470, -99.2460),
+    ('Estado de México', 'Coacalco de Berriozábal'): (19.6310, -99.1100),
+    ('Estado de México', 'Tultitlán'): (19.6450, -99.1690),
+    ('Estado de México', 'Nicolás Romero'): (19.6220, -99.3130),
+    ('Estado de México', 'Chimalhuacán'): (19.4210, -98.9540),
+    ('Estado de México', 'Tecámac'): (19.7130, -98.9680),
+    ('Estado de México', 'Texcoco'): (19.5110, -98.8830),
+    ('Estado de México', 'Ixtapaluca'): (19.3180, -98.8820),
+    ('Estado de México', 'Chalco'): (19.2640, -98.8970),
+    ('Estado de México', 'Valle de Bravo'): (19.1950, -100.1310),
+    # Capitales y principales municipios del resto del país
+    ('Aguascalientes', 'Aguascalientes'): (21.8818, -102.2916),
+    ('Baja California', 'Mexicali'): (32.6245, -115.4523),
+    ('Baja California', 'Tijuana'): (32.5149, -117.0382),
+    ('Baja California', 'Ensenada'): (31.8667, -116.5964),
+    ('Baja California Sur', 'La Paz'): (24.1426, -110.3128),
+    ('Baja California Sur', 'Los Cabos'): (23.0590, -109.6970),
+    ('Campeche', 'Campeche'): (19.8301, -90.5349),
+    ('Chiapas', 'Tuxtla Gutiérrez'): (16.7528, -93.1152),
+    ('Chihuahua', 'Chihuahua'): (28.6320, -106.0691),
+    ('Chihuahua', 'Juárez'): (31.6904, -106.4245),
+    ('Coahuila', 'Saltillo'): (25.4232, -101.0053),
+    ('Coahuila', 'Torreón'): (25.5428, -103.4068),
+    ('Colima', 'Colima'): (19.2433, -103.7250),
+    ('Durango', 'Durango'): (24.0277, -104.6532),
+    ('Guanajuato', 'Guanajuato'): (21.0190, -101.2574),
+    ('Guanajuato', 'León'): (21.1250, -101.6860),
+    ('Guanajuato', 'Irapuato'): (20.6767, -101.3563),
+    ('Guanajuato', 'Celaya'): (20.5233, -100.8157),
+    ('Guanajuato', 'San Miguel de Allende'): (20.9144, -100.7452),
+    ('Guerrero', 'Chilpancingo de los Bravo'): (17.5506, -99.5058),
+    ('Guerrero', 'Acapulco de Juárez'): (16.8531, -99.8237),
+    ('Hidalgo', 'Pachuca de Soto'): (20.1011, -98.7591),
+    ('Jalisco', 'Guadalajara'): (20.6597, -103.3496),
+    ('Jalisco', 'Zapopan'): (20.7214, -103.3918),
+    ('Jalisco', 'San Pedro Tlaquepaque'): (20.6409, -103.2933),
+    ('Jalisco', 'Tlajomulco de Zúñiga'): (20.4735, -103.4433),
+    ('Jalisco', 'Puerto Vallarta'): (20.6534, -105.2253),
+    ('Michoacán', 'Morelia'): (19.7060, -101.1950),
+    ('Nayarit', 'Tepic'): (21.5042, -104.8946),
+    ('Nuevo León', 'Monterrey'): (25.6866, -100.3161),
+    ('Nuevo León', 'San Pedro Garza García'): (25.6573, -100.4028),
+    ('Nuevo León', 'San Nicolás de los Garza'): (25.7417, -100.3022),
+    ('Nuevo León', 'Guadalupe'): (25.6775, -100.2597),
+    ('Nuevo León', 'Apodaca'): (25.7817, -100.1886),
+    ('Oaxaca', 'Oaxaca de Juárez'): (17.0732, -96.7266),
+    ('Puebla', 'Puebla'): (19.0414, -98.2063),
+    ('Puebla', 'San Andrés Cholula'): (19.0510, -98.2980),
+    ('Querétaro', 'Querétaro'): (20.5888, -100.3899),
+    ('Quintana Roo', 'Benito Juárez'): (21.1619, -86.8515),
+    ('Quintana Roo', 'Solidaridad'): (20.6296, -87.0739),
+    ('Quintana Roo', 'Tulum'): (20.2114, -87.4654),
+    ('Quintana Roo', 'Othón P. Blanco'): (18.5001, -88.2961),
+    ('San Luis Potosí', 'San Luis Potosí'): (22.1565, -100.9855),
+    ('Sinaloa', 'Culiacán'): (24.8091, -107.3940),
+    ('Sinaloa', 'Mazatlán'): (23.2494, -106.4111),
+    ('Sonora', 'Hermosillo'): (29.0729, -110.9559),
+    ('Tabasco', 'Centro'): (17.9895, -92.9475),
+    ('Tamaulipas', 'Victoria'): (23.7369, -99.1411),
+    ('Tamaulipas', 'Reynosa'): (26.0508, -98.2279),
+    ('Tamaulipas', 'Tampico'): (22.2553, -97.8686),
+    ('Tlaxcala', 'Tlaxcala'): (19.3182, -98.2375),
+    ('Veracruz', 'Xalapa'): (19.5438, -96.9102),
+    ('Veracruz', 'Veracruz'): (19.1738, -96.1342),
+    ('Veracruz', 'Boca del Río'): (19.1056, -96.1053),
+    ('Yucatán', 'Mérida'): (20.9674, -89.5926),
+    ('Zacatecas', 'Zacatecas'): (22.7709, -102.5832),
+}
+
+# Tipos de coincidencia del autómata
+ESTADO, ESTADO_DEBIL, MUNICIPIO, COLONIA = 'estado', 'estado_debil', 'municipio', 'colonia'
+
+
+def normalizar_nombre(texto: str) -> str:
+    """
+    Minúsculas sin acentos, solo letras/dígitos/comas y espacios simples.
+
+    Examples:
+        >>> normalizar_nombre("  Gustavo A. Madero,CDMX ")
+        'gustavo a madero , cdmx'
+    """
+    sin_acentos = ''.join(c for c in unicodedata.normalize('NFKD', texto.lower())
+                          if not unicodedata.combining(c))
+    return ' '.join(_NO_ALFANUMERICO.sub(' ', sin_acentos.replace(',', ' , ')).split())
+
+
+_NO_ALFANUMERICO = re.compile(r'[^a-z0-9,]+')
+
+
+class AutomataAhoCorasick:
+    """
+    Búsqueda simultánea de muchos patrones en un recorrido lineal del texto.
+
+    Examples:
+        >>> automata = AutomataAhoCorasick()
+        >>> automata.agregar('he', 1); automata.agregar('she', 2); automata.agregar('hers', 3)
+        >>> automata.construir()
+        >>> sorted((inicio, fin, valores) for inicio, fin, valores in automata.buscar('ushers'))
+        [(1, 4, [2]), (2, 4, [1]), (2, 6, [3])]
+    """
+
+    def __init__(self):
+        self.transiciones: List[Dict[str, int]] = [{}]
+        self.fallos: List[int] = [0]
+        # nodo → [(longitud del patrón, valores)] terminados en ese nodo (incluye sufijos)
+        self.salidas: List[List[Tuple[int, list]]] = [[]]
+
+    def agregar(self, patron: str, valor) -> None:
+        """Agrega un valor al patrón (un patrón puede tener varios valores)."""
+        nodo = 0
+        for caracter in patron:
+            siguiente = self.transiciones[nodo].get(caracter)
+            if siguiente is None:
+                siguiente = len(self.transiciones)
+                self.transiciones[nodo][caracter] = siguiente
+                self.transiciones.append({})
+                self.fallos.append(0)
+                self.salidas.append([])
+            nodo = siguiente
+        if self.salidas[nodo] and self.salidas[nodo][0][0] == len(patron):
+            self.salidas[nodo][0][1].append(valor)
+        else:
+            self.salidas[nodo].insert(0, (len(patron), [valor]))
+
+    def construir(self) -> None:
+        """Calcula los enlaces de fallo (BFS); llamar después de agregar todos los patrones."""
+        cola = deque(self.transiciones[0].values())
+        while cola:
+            nodo = cola.popleft()
+            for caracter, hijo in self.transiciones[nodo].items():
+                cola.append(hijo)
+                fallo = self.fallos[nodo]
+                while fallo and caracter not in self.transiciones[fallo]:
+                    fallo = self.fallos[fallo]
+                destino = self.transiciones[fallo].get(caracter, 0)
+                self.fallos[hijo] = destino if destino != hijo else 0
+                self.salidas[hijo] = self.salidas[hijo] + self.salidas[self.fallos[hijo]]
+
+    def buscar(self, texto: str) -> Iterator[Tuple[int, int, list]]:
+        """
+        Yields:
+            Tuple[int, int, list]: (inicio, fin exclusivo, valores) de cada coincidencia
+        """
+        transiciones, fallos, salidas = self.transiciones, self.fallos, self.salidas
+        nodo = 0
+        for posicion, caracter in enumerate(texto):
+            while nodo and caracter not in transiciones[nodo]:
+                nodo = fallos[nodo]
+            nodo = transiciones[nodo].get(caracter, 0)
+            for longitud, valores in salidas[nodo]:
+                yield posicion + 1 - longitud, posicion + 1, valores
+
+
+def _cargar_catalogo_inegi(ruta: Path) -> Iterator[Tuple[str, str]]:
+    """(estado canónico, municipio) del catálogo AGEEML de INEGI (CSV con NOM_ENT/NOM_MUN)."""
+    with open(ruta, encoding='utf-8-sig', newline='') as f:
+        for fila in csv.DictReader(f):
+            estado = _ALIAS_ESTADOS.get(normalizar_nombre(fila.get('NOM_ENT') or ''))
+            # Reason: INEGI nombra "México" al Estado de México
+            if estado is None and normalizar_nombre(fila.get('NOM_ENT') or '') == 'mexico':
+                estado = 'Estado de México'
+            if estado and fila.get('NOM_MUN'):
+                yield estado, fila['NOM_MUN'].strip()
+
+
+_ALIAS_ESTADOS: Dict[str, str] = {}
+for _estado, _alias in ESTADOS.items():
+    _ALIAS_ESTADOS[normalizar_nombre(_estado)] = _estado
+    for _nombre in _alias:
+        _ALIAS_ESTADOS[normalizar_nombre(_nombre)] = _estado
+# Reason: "Estado de Morelos", "Edo. de Jalisco", ...
+for _estado in ESTADOS:
+    _ALIAS_ESTADOS.setdefault(f"estado de {normalizar_nombre(_estado)}", _estado)
+    _ALIAS_ESTADOS.setdefault(f"edo de {normalizar_nombre(_estado)}", _estado)
+
+
+def estado_canonico(nombre: str) -> Optional[str]:
+    """
+    Nombre canónico de una entidad a partir de cualquier alias conocido.
+
+    Examples:
+        >>> estado_canonico("Edo. de Méx."), estado_canonico("Q. Roo"), estado_canonico("Springfield")
+        ('Estado de México', 'Quintana Roo', None)
+    """
+    normalizado = normalizar_nombre(nombre)
+    return _ALIAS_ESTADOS.get(normalizado) or ALIAS_ESTADO_DEBILES.get(normalizado)
+
+
+_automata: Optional[AutomataAhoCorasick] = None
+
+
+def _automata_nomenclator() -> AutomataAhoCorasick:
+    """Compila (una vez) estados, municipios, alias y colonias en el autómata."""
+    global _automata
+    if _automata is not None:
+        return _automata
+
+    automata = AutomataAhoCorasick()
+
+    def agregar(nombre: str, valor: tuple) -> None:
+        # Reason: espacios alrededor del patrón = coincidencia de palabras completas
+        automata.agregar(f" {normalizar_nombre(nombre)} ", valor)
+
+    for alias, estado in _ALIAS_ESTADOS.items():
+        agregar(alias, (ESTADO, estado, None))
+    for alias, estado in ALIAS_ESTADO_DEBILES.items():
+        agregar(alias, (ESTADO_DEBIL, estado, None))
+
+    municipios: Set[Tuple[str, str]] = {(estado, m) for estado, nombres in MUNICIPIOS.items() for m in nombres}
+    if RUTA_CATALOGO_INEGI.exists():
+        municipios.update(_cargar_catalogo_inegi(RUTA_CATALOGO_INEGI))
+    for estado, municipio in municipios:
+        if municipio not in MUNICIPIOS_NO_BUSCABLES:
+            agregar(municipio, (MUNICIPIO, estado, municipio))
+    for (estado, alias), municipio in ALIAS_MUNICIPIOS.items():
+        agregar(alias, (MUNICIPIO, estado, municipio))
+    for (estado, municipio), colonias in COLONIAS.items():
+        for colonia in colonias:
+            agregar(colonia, (COLONIA, estado, municipio))
+
+    automata.construir()
+    _automata = automata
+    return automata
+
+
+class UbicacionResuelta(NamedTuple):
+    estado: Optional[str]
+    ciudad: Optional[str]
+    # Índice del segmento (separado por comas) donde se encontró el estado
+    segmento_estado: Optional[int]
+
+
+# Palabras (normalizadas) que introducen el nombre de una vía: "Av. Guerrero", "Calle Sonora"
+PALABRAS_VIA = {
+    'calle', 'c', 'av', 'ave', 'avenida', 'blvd', 'boulevard', 'bulevar', 'privada', 'priv', 'cerrada',
+    'carretera', 'carr', 'calzada', 'calz', 'prolongacion', 'prol', 'andador', 'circuito', 'retorno',
+}
+# Conectores entre la palabra de vía y el nombre ("Calle de Guerrero")
+CONECTORES_VIA = {'de', 'del', 'la', 'las', 'los', 'el'}
+
+
+def _sigue_a_via(texto: str, inicio: int) -> bool:
+    """True si la coincidencia que empieza en `inicio` es el nombre de una vía."""
+    anteriores = texto[:inicio].split()
+    while anteriores and anteriores[-1] in CONECTORES_VIA:
+        anteriores.pop()
+    return bool(anteriores) and anteriores[-1] in PALABRAS_VIA
+
+
+def _coincidencias(texto_normalizado: str) -> List[Tuple[int, int, int, tuple]]:
+    """
+    Coincidencias (segmento, inicio, fin, valor) sin las contenidas en otra más larga.
+
+    Descarta nombres de vía ("Av. Hidalgo") y estados dentro del primer segmento
+    cuando este no es solo el estado (calle y número: "Guerrero 33, ...").
+    """
+    texto = f" {texto_normalizado} "
+    encontrados = [(inicio, fin, valores) for inicio, fin, valores in _automata_nomenclator().buscar(texto)]
+    # Reason: "Miguel Hidalgo" no es el estado Hidalgo ni "Ciudad de México" el Estado de México
+    maximales = [(inicio, fin, valores) for inicio, fin, valores in encontrados
+                 if not any(i <= inicio and fin <= f and (f - i) > (fin - inicio) for i, f, _ in encontrados)]
+
+    primera_coma = texto.find(',')
+    primer_segmento = texto[:primera_coma] if primera_coma >= 0 else None
+    coincidencias = []
+    for inicio, fin, valores in maximales:
+        if _sigue_a_via(texto, inicio):
+            continue
+        segmento = texto.count(',', 0, inicio)
+        for valor in valores:
+            # Reason: en "Calle 5, Col. X, Ciudad" el primer segmento es la vía; solo cuenta
+            # como estado si es únicamente el nombre ("Morelos, México")
+            if (valor[0] in (ESTADO, ESTADO_DEBIL) and segmento == 0 and primer_segmento is not None
+                    and primer_segmento.strip() != texto[inicio:fin].strip()):
+                continue
+            coincidencias.append((segmento, inicio, fin, valor))
+    return coincidencias
+
+
+@lru_cache(maxsize=TAMANO_CACHE_UBICACIONES)
+def resolver_ubicacion(direccion: str) -> UbicacionResuelta:
+    """
+    Resuelve estado y municipio de una dirección con el nomenclátor.
+
+    Prioriza la entidad más a la derecha y el municipio más a la derecha que
+    pertenezca a esa entidad; sin entidad explícita (o si un municipio posterior
+    la contradice), la infiere del municipio si este existe en un solo estado.
+    Los nombres de vía ("Av. Guerrero") no cuentan como entidad ni municipio.
+
+    Args:
+        direccion (str): Dirección libre
+
+    Returns:
+        UbicacionResuelta: estado/ciudad canónicos (None si no se reconocen)
+
+    Examples:
+        >>> resolver_ubicacion("Av. Emiliano Zapata 10, Col. Centro, Cuernavaca, Morelos, México")
+        UbicacionResuelta(estado='Morelos', ciudad='Cuernavaca', segmento_estado=3)
+        >>> resolver_ubicacion("Polanco, Miguel Hidalgo, CDMX")
+        UbicacionResuelta(estado='Ciudad de México', ciudad='Miguel Hidalgo', segmento_estado=2)
+        >>> resolver_ubicacion("Supermanzana 15, Cancún")
+        UbicacionResuelta(estado='Quintana Roo', ciudad='Benito Juárez', segmento_estado=None)
+        >>> resolver_ubicacion("Av. Guerrero 33, Col. Centro, Cuernavaca")
+        UbicacionResuelta(estado='Morelos', ciudad='Cuernavaca', segmento_estado=None)
+        >>> resolver_ubicacion("Calle Sonora 10, Roma Norte, Cuauhtémoc")
+        UbicacionResuelta(estado='Ciudad de México', ciudad='Cuauhtémoc', segmento_estado=None)
+        >>> resolver_ubicacion("Av. Hidalgo 45, Jiutepec")
+        UbicacionResuelta(estado='Morelos', ciudad='Jiutepec', segmento_estado=None)
+        >>> resolver_ubicacion("Calle Morelos 5, Col. Centro, Toluca")
+        UbicacionResuelta(estado='Estado de México', ciudad='Toluca', segmento_estado=None)
+        >>> resolver_ubicacion("Carretera Mexico-Cuernavaca km 5, Tlalpan")
+        UbicacionResuelta(estado='Ciudad de México', ciudad='Tlalpan', segmento_estado=None)
+        >>> resolver_ubicacion("Morelos, México")
+        UbicacionResuelta(estado='Morelos', ciudad=None, segmento_estado=0)
+    """
+    coincidencias = _coincidencias(normalizar_nombre(direccion))
+
+    estados = [c for c in coincidencias if c[3][0] == ESTADO] or \
+              [c for c in coincidencias if c[3][0] == ESTADO_DEBIL]
+    elegido = max(estados, key=lambda c: (c[0], c[1])) if estados else None
+    estado = elegido[3][1] if elegido else None
+
+    # Reason: un municipio reconocido en un segmento posterior al estado y de otra
+    # entidad ("..., Morelos, Toluca") pesa más que el estado; este se infiere del municipio
+    if elegido:
+        posteriores = [c for c in coincidencias if c[3][0] == MUNICIPIO and c[0] > elegido[0]]
+        if posteriores and not any(c[3][1] == estado for c in posteriores):
+            elegido, estado = None, None
+
+    for tipo in (MUNICIPIO, COLONIA):
+        # Reason: el tramo del estado ("Puebla, Puebla") no cuenta también como ciudad
+        candidatos = [c for c in coincidencias if c[3][0] == tipo
+                      and not (elegido and (c[1], c[2]) == (elegido[1], elegido[2]))]
+        if estado:
+            candidatos = [c for c in candidatos if c[3][1] == estado]
+        if not candidatos:
+            continue
+        mejor = max(candidatos, key=lambda c: (c[0], c[1]))
+        if estado:
+            return UbicacionResuelta(estado, mejor[3][2], elegido[0])
+        # Sin entidad explícita: el estado solo se infiere si el nombre existe en uno
+        mismos = sorted({c[3][1:] for c in candidatos if (c[1], c[2]) == (mejor[1], mejor[2])})
+        if len(mismos) > 1:
+            # Reason: una colonia conocida desempata el homónimo ("Roma Norte, Cuauhtémoc")
+            colonias = {c[3][1:] for c in coincidencias if c[3][0] == COLONIA}
+            mismos = [m for m in mismos if m in colonias] or mismos
+        if len(mismos) == 1:
+            return UbicacionResuelta(mismos[0][0], mismos[0][1], None)
+        return UbicacionResuelta(None, mismos[0][1], None)
+
+    return UbicacionResuelta(estado, None, elegido[0] if elegido else None)
+
+
+def centroide(estado: Optional[str], ciudad: Optional[str]) -> Optional[Tuple[float, float]]:
+    """
+    Coordenadas aproximadas del municipio (None si no está en CENTROIDES_MUNICIPIOS).
+
+    Examples:
+        >>> centroide('Morelos', 'Cuernavaca')
+        (18.9242, -99.2216)
+        >>> centroide('Morelos', 'No especificada') is None
+        True
+    """
+    return CENTROIDES_MUNICIPIOS.get((estado, ciudad))
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+POOL DE PÁGINAS CONCURRENTES - SCRAPER MERCADOLIBRE
+===================================================
+
+N trabajadores (cada uno con su propio contexto, página y CapturadorRespuestas)
+consumen una cola asíncrona de URLs o, si se provee, arriendan items de una
+ColaPersistente en SQLite (reanudable). Todos piden turno a un único LimitadorTasa,
+de modo que la tasa total de requests al sitio no supera MAX_RPM sin importar
+cuántas páginas haya abiertas: mientras una página espera red o render, otra
+extrae.
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterable, Callable, Dict, Iterable, List, Optional, Union
+
+
+class LimitadorTasa:
+    """
+    Token bucket global (capacidad 1) compartido por todos los trabajadores.
+
+    Reason: capacidad 1 evita ráfagas al iniciar N trabajadores a la vez; el
+    intervalo mínimo entre requests es 60 / max_rpm más un jitter aleatorio.
+    """
+
+    def __init__(self, max_rpm: float = 10, jitter_max: float = 1.0):
+        """
+        Args:
+            max_rpm (float): Requests por minuto máximos para todo el pool
+            jitter_max (float): Segundos aleatorios extra entre turnos (patrón no periódico)
+        """
+        self.intervalo = 60.0 / max_rpm
+        self.jitter_max = jitter_max
+        self._proximo_turno = 0.0
+        self._lock = asyncio.Lock()
+        self.turnos_otorgados = 0
+        self.espera_total = 0.0
+
+    async def adquirir(self) -> float:
+        """
+        Espera el siguiente turno global.
+
+        Returns:
+            float: Segundos esperados por este trabajador
+        """
+        async with self._lock:
+            ahora = time.monotonic()
+            espera = max(0.0, self._proximo_turno - ahora)
+            if espera > 0:
+                await asyncio.sleep(espera)
+            self._proximo_turno = time.monotonic() + self.intervalo + random.uniform(0, self.jitter_max)
+            self.turnos_otorgados += 1
+            self.espera_total += espera
+            return espera
+
+    def pausar(self, segundos: float) -> None:
+        """Retrasa el siguiente turno de todos los trabajadores (ej. bloqueo detectado)."""
+        self._proximo_turno = max(self._proximo_turno, time.monotonic() + segundos)
+
+    def resumen(self) -> Dict:
+        """Métricas del limitador para el reporte final."""
+        return {
+            'max_rpm': round(60.0 / self.intervalo, 2),
+            'turnos_otorgados': self.turnos_otorgados,
+            'espera_total_s': round(self.espera_total, 2),
+        }
+
+
+@dataclass
+class SesionTrabajador:
+    """
+    Estado de sesión de un trabajador del pool.
+
+    Attributes:
+        trabajador_id: Índice del trabajador
+        context: BrowserContext propio
+        page: Página propia
+        capturador: CapturadorRespuestas registrado en la página
+        peticiones: Requests en la sesión actual (para rotación)
+        inicio: Inicio de la sesión actual
+    """
+    trabajador_id: int
+    context: Any
+    page: Any
+    capturador: Any
+    peticiones: int = 0
+    inicio: float = field(default_factory=time.time)
+
+
+class PoolPaginas:
+    """Pool de trabajadores Playwright sobre una cola compartida de URLs"""
+
+    # Reason: intervalo de sondeo de la cola persistente cuando no hay items listos
+    INTERVALO_SONDEO_S = 0.5
+
+    def __init__(self, scraper, browser, num_trabajadores: int, limitador: LimitadorTasa,
+                 cola_persistente=None, al_finalizar: Optional[Callable[[Dict], None]] = None,
+                 conservar_resultados: bool = True):
+        """
+        Args:
+            scraper: ScraperPrincipal (navigator, extractor, session_manager y helpers de sesión)
+            browser: Browser de Playwright compartido
+            num_trabajadores (int): Páginas concurrentes
+            limitador (LimitadorTasa): Presupuesto global de requests (el mismo del navigator,
+                que pide un turno por intento de navegación; aquí solo se pausa)
+            cola_persistente: ColaPersistente con leases en SQLite (opcional)
+            al_finalizar: Callback por resultado definitivo (éxito o reintentos agotados)
+            conservar_resultados (bool): False para no acumular resultados en memoria
+        """
+        self.scraper = scraper
+        self.browser = browser
+        self.num_trabajadores = max(1, num_trabajadores)
+        self.limitador = limitador
+        self.cola_persistente = cola_persistente
+        self.al_finalizar = al_finalizar
+        self.conservar_resultados = conservar_resultados
+        self.completadas = 0
+        self.total_estimado = 0
+        self._productor_terminado = False
+
+    async def ejecutar(self, urls: Union[Iterable[str], AsyncIterable[str]],
+                       sesion_inicial: Optional[SesionTrabajador] = None,
+                       total_estimado: int = 0) -> List[Dict]:
+        """
+        Procesa todas las URLs con N trabajadores concurrentes.
+
+        Args:
+            urls: URLs a procesar (iterable o generador asíncrono que alimenta la cola)
+            sesion_inicial (Optional[SesionTrabajador]): Sesión ya calentada para el trabajador 0
+            total_estimado (int): Total para mostrar progreso (0 si se desconoce)
+
+        Returns:
+            List[Dict]: Resultados ordenados por property_number (vacía si conservar_resultados=False)
+        """
+        cola: asyncio.Queue = asyncio.Queue(maxsize=self.num_trabajadores * 2)
+        resultados: List[Dict] = []
+        self.total_estimado = total_estimado
+        self._productor_terminado = False
+
+        productor = asyncio.create_task(self._alimentar_cola(urls, cola))
+        trabajadores = [
+            asyncio.create_task(self._trabajador(i, cola, resultados, sesion_inicial if i == 0 else None))
+            for i in range(self.num_trabajadores)
+        ]
+
+        try:
+            await asyncio.gather(*trabajadores)
+        finally:
+            # Reason: si todos los trabajadores terminan antes (error), el productor
+            # quedaría bloqueado en una cola llena
+            productor.cancel()
+            await asyncio.gather(productor, return_exceptions=True)
+
+        return sorted(resultados, key=lambda r: r.get('property_number', 0))
+
+    async def _alimentar_cola(self, urls, cola: asyncio.Queue) -> None:
+        """Encola URLs numeradas y un centinela por trabajador al terminar."""
+        numero = 0
+        try:
+            if hasattr(urls, '__aiter__'):
+                async for url in urls:
+                    numero += 1
+                    await self._encolar(cola, numero, url)
+            else:
+                for url in urls:
+                    numero += 1
+                    await self._encolar(cola, numero, url)
+        except Exception as e:
+            print(f"⚠️ Error alimentando cola de URLs: {e}")
+
+        self._productor_terminado = True
+        if self.cola_persistente is None:
+            for _ in range(self.num_trabajadores):
+                await cola.put(None)
+
+    async def _encolar(self, cola: asyncio.Queue, numero: int, url: str) -> None:
+        """Encola en memoria o en SQLite con backpressure equivalente."""
+        if self.cola_persistente is None:
+            await cola.put((numero, url))
+            return
+        self.cola_persistente.encolar(url)
+        while self.cola_persistente.listos() >= self.num_trabajadores * 2:
+            await asyncio.sleep(self.INTERVALO_SONDEO_S)
+
+    async def _obtener_item(self, trabajador_id: int, cola: asyncio.Queue) -> Optional[tuple]:
+        """
+        Siguiente (numero, url, ml_id) para el trabajador o None si no queda trabajo.
+        """
+        if self.cola_persistente is None:
+            item = await cola.get()
+            return None if item is None else (item[0], item[1], None)
+
+        while True:
+            arrendado = self.cola_persistente.arrendar(f"trabajador-{trabajador_id}")
+            if arrendado:
+                return arrendado
+            if self._productor_terminado and not self.cola_persistente.hay_trabajo_activo():
+                return None
+            await asyncio.sleep(self.INTERVALO_SONDEO_S)
+
+    def _es_definitivo(self, ml_id: Optional[str], resultado: Dict) -> bool:
+        """True si el resultado es definitivo (éxito o último intento permitido)."""
+        if self.cola_persistente is None or ml_id is None or resultado.get('status') == 'exitoso':
+            return True
+        return self.cola_persistente.agotaria_intentos(ml_id)
+
+    def _confirmar_item(self, ml_id: Optional[str], resultado: Dict) -> None:
+        """Marca el item persistente como completado o fallido (con reintento)."""
+        if self.cola_persistente is None or ml_id is None:
+            return
+        if resultado.get('status') == 'exitoso':
+            self.cola_persistente.completar(ml_id)
+            return
+        if self.cola_persistente.fallar(ml_id, resultado) == 'pendiente':
+            print(f"🔁 {ml_id} se reintentará más tarde")
+
+    async def _trabajador(self, trabajador_id: int, cola: asyncio.Queue, resultados: List[Dict],
+                          sesion: Optional[SesionTrabajador]) -> None:
+        """
+        Bucle de un trabajador: turno global → rotación → extracción → estadísticas.
+
+        Una excepción al procesar un item solo descarta ese item (se registra como
+        fallo y se libera su lease); el trabajador termina únicamente si no puede
+        crear su sesión.
+        """
+        scraper = self.scraper
+        try:
+            if sesion is None:
+                sesion = await self._nueva_sesion(trabajador_id)
+
+            while True:
+                item = await self._obtener_item(trabajador_id, cola)
+                if item is None:
+                    break
+                numero, url, ml_id = item
+                enviado: Optional[Dict] = None
+                confirmado = False
+
+                try:
+                    print(f"\n🏠 PROPIEDAD {numero} (trabajador {trabajador_id})")
+                    print(f"URL: {url}")
+                    print("-" * 50)
+
+                    # Circuit breaker con cooldown automático integrado
+                    await scraper.session_manager.handle_circuit_breaker()
+
+                    should_rotate = await scraper.navigator.should_rotate_session(
+                        sesion.peticiones, time.time() - sesion.inicio
+                    )
+                    if should_rotate:
+                        print(f"🔄 Rotando sesión del trabajador {trabajador_id}...")
+                        anterior, sesion = sesion, None
+                        await self._cerrar_sesion(anterior)
+                        sesion = await self._nueva_sesion(trabajador_id)
+
+                    resultado = await scraper._process_single_property(sesion.page, url, numero, sesion.capturador)
+                    resultado['trabajador_id'] = trabajador_id
+                    if self.conservar_resultados:
+                        resultados.append(resultado)
+                    # Reason: primero el sumidero y después la cola; si el proceso muere entre
+                    # ambos, el item se vuelve a procesar en lugar de perderse del reporte
+                    if self.al_finalizar and self._es_definitivo(ml_id, resultado):
+                        self.al_finalizar(resultado)
+                        enviado = resultado
+                    self._confirmar_item(ml_id, resultado)
+                    confirmado = True
+                    sesion.peticiones += 1
+
+                    scraper.session_manager.update_from_result(resultado, trabajador_id)
+
+                    # Detectar bloqueos solo si hay errores
+                    if resultado.get('status') != 'exitoso':
+                        blocking_detected = await scraper.navigator.detect_blocking_patterns(sesion.page)
+                        if any(blocking_detected.values()):
+                            print("🚨 Patrones de bloqueo detectados - pausando todo el pool")
+                            scraper.session_manager.mark_blocking_detected()
+                            self.limitador.pausar(random.uniform(10, 30))
+
+                except Exception as e:
+                    print(f"❌ Error en trabajador {trabajador_id} con la propiedad {numero}: {e}")
+                    if not confirmado:
+                        self._descartar_item(trabajador_id, item, e, enviado)
+                    if sesion is None:
+                        # Reason: la rotación cerró la sesión y no se pudo crear otra
+                        print(f"❌ Trabajador {trabajador_id} sin sesión, se detiene")
+                        break
+
+                self.completadas += 1
+                scraper._show_progress(self.completadas, max(self.total_estimado, self.completadas))
+
+        except Exception as e:
+            print(f"❌ Error en trabajador {trabajador_id}: {e}")
+        finally:
+            if sesion is not None:
+                await self._cerrar_sesion(sesion)
+
+    def _descartar_item(self, trabajador_id: int, item: tuple, error: Exception,
+                        enviado: Optional[Dict] = None) -> None:
+        """
+        Registra como fallo un item cuyo procesamiento lanzó una excepción.
+
+        Args:
+            trabajador_id (int): Trabajador que lo tenía arrendado
+            item (tuple): (numero, url, ml_id)
+            error (Exception): Excepción capturada
+            enviado (Optional[Dict]): Resultado ya entregado a al_finalizar (no se duplica)
+        """
+        numero, url, ml_id = item
+        try:
+            if enviado is not None:
+                # Reason: el sumidero ya tiene el resultado; solo falta confirmarlo en la cola
+                self._confirmar_item(ml_id, enviado)
+                return
+            resultado = {
+                'url': url,
+                'ml_id': ml_id,
+                'property_number': numero,
+                'status': 'error',
+                'timestamp': datetime.now().isoformat(),
+                'processing_time_seconds': 0,
+                'error': f"{type(error).__name__}: {error}",
+                'trabajador_id': trabajador_id,
+            }
+            if self.al_finalizar and self._es_definitivo(ml_id, resultado):
+                self.al_finalizar(resultado)
+            self._confirmar_item(ml_id, resultado)
+        except Exception as e:
+            print(f"⚠️ No se pudo liberar la propiedad {numero} ({e}); su lease vencerá")
+
+    @staticmethod
+    async def _cerrar_sesion(sesion: SesionTrabajador) -> None:
+        try:
+            await sesion.context.close()
+        except Exception:
+            pass
+
+    async def _nueva_sesion(self, trabajador_id: int) -> SesionTrabajador:
+        """Crea contexto, página y capturador propios para un trabajador."""
+        context, page, capturador = await self.scraper._setup_session(self.browser)
+        return SesionTrabajador(trabajador_id, context, page, capturador)
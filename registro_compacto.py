@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+REGISTRO COMPACTO DE PROPIEDADES - SCRAPER MERCADOLIBRE
+=======================================================
+
+Representación en memoria compacta de los resultados de extracción:
+- PropiedadCompacta: clase con __slots__ sobre los campos de ResultadoPropiedad
+  (sin __dict__ por instancia; claves extra en un solo dict opcional)
+- CategoriaCompacta: los dicts de categorías ("Recámaras", "Baños", ...) se
+  guardan como tupla de claves compartida entre propiedades + tupla de valores,
+  con nombres y valores cortos internados
+- LotePropiedades: struct-of-arrays opcional; precio, superficies, recámaras,
+  etc. viven en array('d') / array('q') en lugar de objetos float/int
+
+La conversión a/desde el formato dict actual es sin pérdida: mismas claves,
+mismos valores y mismos tipos.
+"""
+
+import sys
+from array import array
+from dataclasses import fields
+from typing import Dict, Iterable, Iterator, List
+
+from models import ResultadoPropiedad
+
+
+# Reason: metadatos que main/pool agregan a cada resultado además de ResultadoPropiedad
+CAMPOS_METADATOS_EJECUCION = ('property_number', 'processing_time_seconds', 'trabajador_id', 'tiempo_total')
+
+CAMPOS_PROPIEDAD = tuple(f.name for f in fields(ResultadoPropiedad)) + CAMPOS_METADATOS_EJECUCION
+
+# Strings más largos (descripciones, URLs) no se repiten entre propiedades
+LONGITUD_MAX_INTERNADO = 64
+
+# Tuplas de claves de categoría compartidas: ('Recámaras', 'Baños') → misma tupla
+_TUPLAS_CLAVES: Dict[tuple, tuple] = {}
+
+
+def _internar(valor):
+    """Interna strings cortos (nombres de campo y valores categóricos repetidos)."""
+    if type(valor) is str and len(valor) <= LONGITUD_MAX_INTERNADO:
+        return sys.intern(valor)
+    return valor
+
+
+class CategoriaCompacta:
+    """
+    Dict de categoría como (claves compartidas, valores).
+
+    Examples:
+        >>> a = CategoriaCompacta.desde_dict({'Recámaras': '3', 'Baños': '2'})
+        >>> b = CategoriaCompacta.desde_dict({'Recámaras': '4', 'Baños': '2'})
+        >>> a.claves is b.claves, b.a_dict()
+        (True, {'Recámaras': '4', 'Baños': '2'})
+    """
+
+    __slots__ = ('claves', 'valores')
+
+    def __init__(self, claves: tuple, valores: tuple):
+        self.claves = claves
+        self.valores = valores
+
+    @classmethod
+    def desde_dict(cls, datos: Dict) -> 'CategoriaCompacta':
+        claves = tuple(_internar(k) for k in datos)
+        claves = _TUPLAS_CLAVES.setdefault(claves, claves)
+        return cls(claves, tuple(_compactar(v) for v in datos.values()))
+
+    def a_dict(self) -> Dict:
+        return {k: _expandir(v) for k, v in zip(self.claves, self.valores)}
+
+
+def _compactar(valor):
+    """Dicts → CategoriaCompacta (recursivo), strings cortos internados."""
+    if type(valor) is dict:
+        return CategoriaCompacta.desde_dict(valor)
+    if type(valor) is list:
+        return [_compactar(v) for v in valor]
+    return _internar(valor)
+
+
+def _expandir(valor):
+    """Inversa de _compactar."""
+    if type(valor) is CategoriaCompacta:
+        return valor.a_dict()
+    if type(valor) is list:
+        return [_expandir(v) for v in valor]
+    return valor
+
+
+class PropiedadCompacta:
+    """
+    Resultado de extracción con __slots__ (campos de ResultadoPropiedad).
+
+    Un slot sin asignar significa "clave ausente" en el dict original, de modo
+    que la ida y vuelta conserva exactamente las claves presentes.
+
+    Examples:
+        >>> resultado = {'url': 'https://casa.mercadolibre.com.mx/MLM-1-x', 'precio': 2550000.0,
+        ...              'principales': {'Recámaras': '3'}, 'extra': 1}
+        >>> PropiedadCompacta.desde_dict(resultado).a_dict() == resultado
+        True
+    """
+
+    # Reason: __slots__ explícito (dataclass(slots=True) requiere Python 3.10)
+    __slots__ = CAMPOS_PROPIEDAD + ('_extras',)
+
+    def __init__(self):
+        self._extras = None
+
+    @classmethod
+    def desde_dict(cls, resultado: Dict) -> 'PropiedadCompacta':
+        """
+        Args:
+            resultado (Dict): Resultado en formato dict (extraer_datos_hibrido / JSONL)
+
+        Returns:
+            PropiedadCompacta: Registro equivalente
+        """
+        registro = cls()
+        for clave, valor in resultado.items():
+            valor = _compactar(valor)
+            if clave in _CAMPOS_SLOTS:
+                setattr(registro, clave, valor)
+            else:
+                if registro._extras is None:
+                    registro._extras = {}
+                registro._extras[_internar(clave)] = valor
+        return registro
+
+    def a_dict(self) -> Dict:
+        """Dict equivalente al resultado original."""
+        resultado = {}
+        for campo in CAMPOS_PROPIEDAD:
+            try:
+                resultado[campo] = _expandir(getattr(self, campo))
+            except AttributeError:
+                continue
+        if self._extras:
+            for clave, valor in self._extras.items():
+                resultado[clave] = _expandir(valor)
+        return resultado
+
+
+_CAMPOS_SLOTS = frozenset(CAMPOS_PROPIEDAD)
+
+# Columnas numéricas del struct-of-arrays: campo → (typecode, centinela de "no está en la columna")
+COLUMNAS_NUMERICAS = {
+    'precio': ('d', float('nan')),
+    'construccion': ('d', float('nan')),
+    'terreno': ('d', float('nan')),
+    'banos': ('d', float('nan')),
+    'recamaras': ('q', -2 ** 63),
+    'estacionamiento': ('q', -2 ** 63),
+}
+
+
+class LotePropiedades:
+    """
+    Colección struct-of-arrays de propiedades compactas.
+
+    Los valores numéricos de tipo exacto (float en columnas 'd', int en 'q')
+    van a arrays contiguos; cualquier otro valor (None, str, ausente) queda en
+    el registro. Es re-iterable y tiene len(), así que sirve directamente como
+    entrada de generar_reporte_hibrido o exportar_parquet.
+
+    Examples:
+        >>> lote = LotePropiedades()
+        >>> lote.agregar({'url': 'a', 'precio': 1500000.0, 'recamaras': 3})
+        >>> lote.agregar({'url': 'b', 'precio': None, 'recamaras': '2'})
+        >>> list(lote) == [{'url': 'a', 'precio': 1500000.0, 'recamaras': 3},
+        ...                {'url': 'b', 'precio': None, 'recamaras': '2'}]
+        True
+        >>> lote.columna('precio')[0]
+        1500000.0
+    """
+
+    def __init__(self):
+        self.registros: List[PropiedadCompacta] = []
+        self.columnas = {campo: array(tipo) for campo, (tipo, _) in COLUMNAS_NUMERICAS.items()}
+
+    def agregar(self, resultado: Dict) -> None:
+        """Agrega un resultado en formato dict."""
+        registro = PropiedadCompacta.desde_dict(resultado)
+        for campo, (tipo, centinela) in COLUMNAS_NUMERICAS.items():
+            valor = getattr(registro, campo, None)
+            tipo_exacto = float if tipo == 'd' else int
+            # Reason: NaN y el centinela int marcan "valor en el registro"; ints
+            # fuera de int64 también se quedan en el registro
+            if (type(valor) is tipo_exacto and valor == valor and valor != centinela
+                    and (tipo == 'd' or -2 ** 63 < valor < 2 ** 63)):
+                self.columnas[campo].append(valor)
+                delattr(registro, campo)
+            else:
+                self.columnas[campo].append(centinela)
+        self.registros.append(registro)
+
+    def __len__(self) -> int:
+        return len(self.registros)
+
+    def __getitem__(self, indice: int) -> Dict:
+        resultado = self.registros[indice].a_dict()
+        for campo, (tipo, centinela) in COLUMNAS_NUMERICAS.items():
+            valor = self.columnas[campo][indice]
+            if (valor == valor) if tipo == 'd' else (valor != centinela):
+                resultado[campo] = valor
+        return resultado
+
+    def __iter__(self) -> Iterator[Dict]:
+        for indice in range(len(self.registros)):
+            yield self[indice]
+
+    def columna(self, campo: str) -> array:
+        """
+        Array numérico de un campo (NaN / -2**63 donde el valor no es numérico).
+
+        Útil para agregaciones sin materializar dicts (ej. numpy.frombuffer).
+        """
+        return self.columnas[campo]
+
+    def valores(self, campo: str) -> Iterator:
+        """Valores numéricos presentes de una columna."""
+        tipo, centinela = COLUMNAS_NUMERICAS[campo]
+        for valor in self.columnas[campo]:
+            if (valor == valor) if tipo == 'd' else (valor != centinela):
+                yield valor
+
+
+def compactar_resultados(resultados: Iterable[Dict]) -> LotePropiedades:
+    """Construye un LotePropiedades desde cualquier iterable de dicts."""
+    lote = LotePropiedades()
+    for resultado in resultados:
+        lote.agregar(resultado)
+    return lote
+
@@ -0,0 +1,822 @@
+#!/usr/bin/env python3
+"""
+REPOSITORIO SQLITE DE PROPIEDADES - SCRAPER MERCADOLIBRE
+========================================================
+
+Capa de persistencia que implementa schema.sql:
+- Mapea la salida de extraer_datos_hibrido a las columnas de `propiedades`
+- Upserts INSERT ... ON CONFLICT(ml_id) DO UPDATE en lotes con executemany
+- Huella de contenido por propiedad: si no cambió, solo se toca last_scraped
+- Historial por deltas: al cambiar una fila se registran solo los campos
+  modificados (precio_historial y cambios_atributos)
+- Agregados de mercado (agregados_mercado.py) actualizados por deltas en
+  la misma transacción
+- Columnas generadas sobre claves JSON, índices compuestos, FTS5 sobre
+  titulo + descripcion y almacenamiento JSONB cuando SQLite lo soporta (>= 3.45)
+- Ubicación latitud/longitud + geohash con índice R*Tree para consultas por
+  radio (indice_espacial.py)
+- SQLite en modo WAL
+- EscritorSegundoPlano: tarea asyncio que agrupa resultados y escribe en un
+  hilo para que los trabajadores de scraping nunca esperen al disco
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from agregados_mercado import DeltasAgregados, fecha_alta_actual, reconstruir_agregados
+from indice_espacial import (
+    PRECISION_EXACTA, PRECISION_MUNICIPIO, buscar_en_radio, codificar_geohash, coordenadas_validas,
+    crear_indice_espacial
+)
+from nomenclator_mexico import centroide
+from tarjetas_listado import ORIGEN_TARJETA
+from utils import extraer_ml_id
+
+
+RUTA_ESQUEMA = Path(__file__).with_name('schema.sql')
+
+# ✅ COLUMNAS JSON ← CATEGORÍAS DE extraer_datos_hibrido
+CATEGORIAS_A_COLUMNAS = {
+    'caracteristicas_principales': 'principales',
+    'servicios': 'servicios',
+    'ambientes': 'ambientes',
+    'seguridad': 'seguridad',
+    'comodidades': 'comodidades_y_equipamiento',
+}
+
+# Valores permitidos por los CHECK de schema.sql (el primero es el default)
+MONEDAS_VALIDAS = ('MXN', 'USD')
+OPERACIONES_VALIDAS = ('venta', 'renta')
+TIPOS_PROPIEDAD_VALIDOS = ('casa', 'departamento', 'terreno', 'local', 'oficina')
+
+# Reason: el extractor clasifica local/oficina/bodega como 'comercial'
+ALIAS_TIPO_PROPIEDAD = {'comercial': 'local', 'depto': 'departamento', 'dpto': 'departamento'}
+
+COLUMNAS_PROPIEDADES = [
+    'ml_id', 'url', 'titulo', 'descripcion',
+    'precio', 'moneda', 'tipo_operacion', 'tipo_propiedad',
+    'pais', 'estado', 'ciudad', 'direccion_completa',
+    'superficie_total', 'superficie_construida', 'recamaras', 'banos', 'estacionamiento',
+    'caracteristicas_principales', 'servicios', 'ambientes', 'seguridad', 'comodidades',
+    'andes_table_raw', 'latitud', 'longitud', 'geohash', 'precision_ubicacion', 'huella',
+]
+
+# Columnas JSON de `propiedades` (categorías + raw)
+COLUMNAS_JSON_BD = tuple(CATEGORIAS_A_COLUMNAS) + ('andes_table_raw',)
+
+# Reason: JSONB (binario) evita re-parsear el texto en cada json_extract; requiere SQLite >= 3.45
+USAR_JSONB = sqlite3.sqlite_version_info >= (3, 45, 0)
+
+
+def _marcador(columna: str) -> str:
+    return 'jsonb(?)' if USAR_JSONB and columna in COLUMNAS_JSON_BD else '?'
+
+
+def _seleccion(columna: str) -> str:
+    """Expresión SELECT que devuelve JSON como texto aunque se almacene como JSONB."""
+    return f"json({columna})" if columna in COLUMNAS_JSON_BD else columna
+
+
+SQL_UPSERT = (
+    f"INSERT INTO propiedades ({', '.join(COLUMNAS_PROPIEDADES)}) "
+    f"VALUES ({', '.join(_marcador(c) for c in COLUMNAS_PROPIEDADES)}) "
+    f"ON CONFLICT(ml_id) DO UPDATE SET "
+    + ', '.join(f"{c} = excluded.{c}" for c in COLUMNAS_PROPIEDADES if c != 'ml_id')
+    + ", updated_at = CURRENT_TIMESTAMP, last_scraped = CURRENT_TIMESTAMP, is_active = 1"
+)
+
+# Reason: contenido idéntico → no reescribir la fila; updated_at solo avanza con cambios reales
+SQL_TOCAR = "UPDATE propiedades SET last_scraped = CURRENT_TIMESTAMP, is_active = 1 WHERE ml_id = ?"
+
+# Reason: el centroide no entra en la huella; una fila sin cambios pero guardada sin
+# coordenadas las recibe al tocarla (el WHERE evita disparar el trigger del R*Tree)
+SQL_TOCAR_UBICACION = (
+    "UPDATE propiedades SET latitud = ?, longitud = ?, geohash = ?, precision_ubicacion = ? "
+    "WHERE ml_id = ? AND latitud IS NULL"
+)
+
+# Centroide para filas guardadas sin coordenadas (antes de la columna o de conocer el municipio)
+SQL_RELLENAR_CENTROIDE = (
+    "UPDATE propiedades SET latitud = ?, longitud = ?, geohash = ?, precision_ubicacion = ? "
+    "WHERE latitud IS NULL AND estado = ? AND ciudad = ?"
+)
+
+# Columnas comparadas para cambios_atributos (precio/moneda van a precio_historial)
+COLUMNAS_JSON = list(CATEGORIAS_A_COLUMNAS)
+COLUMNAS_HISTORIAL = [c for c in COLUMNAS_PROPIEDADES
+                      if c not in ('ml_id', 'url', 'precio', 'moneda', 'andes_table_raw', 'huella',
+                                   'latitud', 'longitud', 'geohash', 'precision_ubicacion')]
+
+SQL_PRECIO_HISTORIAL = (
+    "INSERT INTO precio_historial (ml_id, ciudad, precio_anterior, precio_nuevo, moneda_anterior, moneda_nueva) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+SQL_CAMBIO_ATRIBUTO = (
+    "INSERT INTO cambios_atributos (ml_id, ciudad, campo, valor_anterior, valor_nuevo) VALUES (?, ?, ?, ?, ?)"
+)
+
+# Columnas agregadas después de la primera versión de schema.sql.
+# Reason: CREATE TABLE IF NOT EXISTS no altera tablas existentes; deben coincidir con schema.sql
+COLUMNAS_MIGRACION = {
+    'huella': "TEXT",
+    'latitud': "REAL",
+    'longitud': "REAL",
+    'geohash': "TEXT",
+    'precision_ubicacion': "TEXT",
+    'tiene_alberca': "INTEGER GENERATED ALWAYS AS (CASE WHEN json_extract(ambientes, '$.\"Alberca\"') "
+                     "IN ('Sí', 'Si') THEN 1 ELSE 0 END) VIRTUAL",
+    'tiene_jardin': "INTEGER GENERATED ALWAYS AS (CASE WHEN json_extract(ambientes, '$.\"Jardín\"') "
+                    "IN ('Sí', 'Si') THEN 1 ELSE 0 END) VIRTUAL",
+    'tiene_vigilancia': "INTEGER GENERATED ALWAYS AS (CASE WHEN json_extract(seguridad, '$.\"Vigilancia\"') "
+                        "IN ('Sí', 'Si') THEN 1 ELSE 0 END) VIRTUAL",
+}
+
+# Índice de texto completo (external content) sincronizado por triggers.
+# Reason: se aplica aparte de schema.sql porque FTS5 es opcional en algunos builds de SQLite
+ESQUEMA_FTS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS propiedades_fts USING fts5(
+    titulo, descripcion,
+    content='propiedades', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS propiedades_fts_insert AFTER INSERT ON propiedades BEGIN
+    INSERT INTO propiedades_fts(rowid, titulo, descripcion) VALUES (new.id, new.titulo, new.descripcion);
+END;
+
+CREATE TRIGGER IF NOT EXISTS propiedades_fts_delete AFTER DELETE ON propiedades BEGIN
+    INSERT INTO propiedades_fts(propiedades_fts, rowid, titulo, descripcion)
+    VALUES ('delete', old.id, old.titulo, old.descripcion);
+END;
+
+CREATE TRIGGER IF NOT EXISTS propiedades_fts_update AFTER UPDATE OF titulo, descripcion ON propiedades BEGIN
+    INSERT INTO propiedades_fts(propiedades_fts, rowid, titulo, descripcion)
+    VALUES ('delete', old.id, old.titulo, old.descripcion);
+    INSERT INTO propiedades_fts(rowid, titulo, descripcion) VALUES (new.id, new.titulo, new.descripcion);
+END;
+"""
+
+# Consultas frecuentes → índice que deben usar (verificado con EXPLAIN QUERY PLAN)
+CONSULTAS_OBJETIVO = {
+    'busqueda_ciudad_operacion_precio_recamaras': (
+        "SELECT ml_id, precio, recamaras FROM propiedades WHERE ciudad = ? AND tipo_operacion = ? "
+        "AND precio BETWEEN ? AND ? AND recamaras >= ?",
+        ('Cuernavaca', 'venta', 1000000, 3000000, 3),
+        'COVERING INDEX idx_propiedades_busqueda',
+    ),
+    'conteo_ciudad_operacion': (
+        "SELECT COUNT(*), AVG(precio) FROM propiedades WHERE ciudad = ? AND tipo_operacion = ?",
+        ('Cuernavaca', 'venta'),
+        'COVERING INDEX idx_propiedades_busqueda',
+    ),
+    'alberca_por_ciudad': (
+        "SELECT ml_id, precio FROM propiedades WHERE ciudad = ? AND tiene_alberca = 1 AND precio <= ?",
+        ('Cuernavaca', 5000000),
+        'INDEX idx_propiedades_ciudad_alberca',
+    ),
+    'vigilancia_por_ciudad': (
+        "SELECT ml_id, precio FROM propiedades WHERE ciudad = ? AND tiene_vigilancia = 1",
+        ('Jiutepec',),
+        'INDEX idx_propiedades_ciudad_vigilancia',
+    ),
+    'radio_caja_rtree': (
+        "SELECT p.ml_id FROM propiedades_rtree r JOIN propiedades p ON p.id = r.id "
+        "WHERE r.min_lat >= ? AND r.max_lat <= ? AND r.min_lon >= ? AND r.max_lon <= ?",
+        (18.90, 18.95, -99.25, -99.20),
+        'VIRTUAL TABLE INDEX',
+    ),
+    'texto_titulo_descripcion': (
+        "SELECT p.ml_id FROM propiedades_fts f JOIN propiedades p ON p.id = f.rowid "
+        "WHERE propiedades_fts MATCH ? ORDER BY rank",
+        ('alberca',),
+        'VIRTUAL TABLE INDEX',
+    ),
+}
+
+# Columnas universales → clave del resultado de extracción (las demás se llaman igual)
+COLUMNAS_A_CLAVES = {
+    'direccion_completa': 'direccion',
+    'superficie_total': 'terreno',
+    'superficie_construida': 'construccion',
+}
+
+# Campos que un registro de tarjeta actualiza sobre una fila guardada; el resto solo llena vacíos
+CAMPOS_TARJETA_VIGENTES = ('url', 'precio', 'moneda')
+
+# Valores por defecto de fila_desde_resultado (equivalen a "sin dato")
+VALORES_VACIOS = (None, '', 0, 'Sin título', 'No especificado', 'No especificada', 'N/A')
+
+# Límite conservador de parámetros por sentencia (SQLITE_MAX_VARIABLE_NUMBER antiguo = 999)
+MAX_PARAMETROS_SQL = 900
+
+
+def _normalizar_texto(valor) -> str:
+    """Minúsculas sin acentos para comparar contra valores de CHECK."""
+    texto = unicodedata.normalize('NFKD', str(valor or '')).encode('ascii', 'ignore').decode('ascii')
+    return texto.strip().lower()
+
+
+def _coercionar(valor, validos: tuple, alias: Optional[Dict[str, str]] = None) -> str:
+    """Devuelve el valor permitido por el CHECK o el default (primer valor válido)."""
+    normalizado = _normalizar_texto(valor)
+    normalizado = (alias or {}).get(normalizado, normalizado)
+    for valido in validos:
+        if normalizado == valido.lower():
+            return valido
+    return validos[0]
+
+
+def _numero(valor, entero: bool = False):
+    """Número para columnas NOT NULL DEFAULT 0 (None o inválido → 0)."""
+    try:
+        numero = float(valor) if valor is not None else 0.0
+    except (TypeError, ValueError):
+        numero = 0.0
+    return int(numero) if entero else numero
+
+
+def _json(valor) -> Optional[str]:
+    return json.dumps(valor, ensure_ascii=False) if valor else None
+
+
+def calcular_huella(universales: tuple, categorias: List[Optional[Dict]]) -> str:
+    """
+    Hash del contenido normalizado: campos universales + categorías con claves ordenadas.
+
+    Args:
+        universales (tuple): Valores universales ya normalizados (sin url)
+        categorias (List[Optional[Dict]]): Dicts de categorías en orden de columnas
+
+    Returns:
+        str: blake2b de 128 bits en hexadecimal
+
+    Examples:
+        >>> calcular_huella((1.0, 'MXN'), [{'b': 1, 'a': 2}]) == calcular_huella((1.0, 'MXN'), [{'a': 2, 'b': 1}])
+        True
+    """
+    canonico = json.dumps([list(universales), [c or None for c in categorias]],
+                          ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.blake2b(canonico.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _texto_historial(valor) -> Optional[str]:
+    if valor is None or isinstance(valor, str):
+        return valor
+    return json.dumps(valor, ensure_ascii=False, sort_keys=True)
+
+
+def calcular_deltas(anterior: Dict, fila: tuple) -> Tuple[List[tuple], List[tuple]]:
+    """
+    Diferencias entre la fila guardada y la nueva.
+
+    Args:
+        anterior (Dict): Fila actual en la base (columna → valor)
+        fila (tuple): Fila nueva en el orden de COLUMNAS_PROPIEDADES
+
+    Returns:
+        Tuple[List[tuple], List[tuple]]: Filas para precio_historial y cambios_atributos
+
+    Examples:
+        >>> nueva = fila_desde_resultado({'url': 'https://x/MLM-1-a', 'precio': 90.0, 'recamaras': 3,
+        ...                               'servicios': {'Agua': 'Sí', 'Gas': 'Sí'}})
+        >>> previa = dict(zip(COLUMNAS_PROPIEDADES, fila_desde_resultado({'url': 'https://x/MLM-1-a', 'precio': 100.0,
+        ...                   'recamaras': 3, 'servicios': {'Agua': 'Sí'}})))
+        >>> precios, atributos = calcular_deltas(previa, nueva)
+        >>> precios, atributos
+        ([('MLM-1', 'No especificada', 100.0, 90.0, 'MXN', 'MXN')], [('MLM-1', 'No especificada', 'servicios.Gas', None, 'Sí')])
+    """
+    nueva = dict(zip(COLUMNAS_PROPIEDADES, fila))
+    ml_id, ciudad = nueva['ml_id'], nueva['ciudad']
+
+    precios = []
+    if anterior['precio'] != nueva['precio'] or anterior['moneda'] != nueva['moneda']:
+        precios.append((ml_id, ciudad, anterior['precio'], nueva['precio'], anterior['moneda'], nueva['moneda']))
+
+    atributos = []
+    for columna in COLUMNAS_HISTORIAL:
+        previo, actual = anterior[columna], nueva[columna]
+        if columna in COLUMNAS_JSON:
+            # Reason: delta por clave de categoría, no el JSON completo
+            previo_dict = json.loads(previo) if previo else {}
+            actual_dict = json.loads(actual) if actual else {}
+            for clave in list(previo_dict) + [k for k in actual_dict if k not in previo_dict]:
+                if previo_dict.get(clave) != actual_dict.get(clave):
+                    atributos.append((ml_id, ciudad, f"{columna}.{clave}",
+                                      _texto_historial(previo_dict.get(clave)),
+                                      _texto_historial(actual_dict.get(clave))))
+        elif previo != actual:
+            atributos.append((ml_id, ciudad, columna, _texto_historial(previo), _texto_historial(actual)))
+
+    return precios, atributos
+
+
+def fila_desde_resultado(resultado: Dict) -> Optional[tuple]:
+    """
+    Convierte un resultado de extraer_datos_hibrido en una fila de `propiedades`.
+
+    Args:
+        resultado (Dict): Resultado con url y campos universales/categorías
+
+    Returns:
+        Optional[tuple]: Valores en el orden de COLUMNAS_PROPIEDADES o None sin ml_id/url
+
+    Examples:
+        >>> fila = fila_desde_resultado({'url': 'https://casa.mercadolibre.com.mx/MLM-1-x', 'precio': 2550000,
+        ...                              'moneda': 'mxn', 'tipo_propiedad': 'comercial', 'tipo_operacion': 'traspaso'})
+        >>> fila[0], fila[4:8]
+        ('MLM-1', (2550000.0, 'MXN', 'venta', 'local'))
+    """
+    url = resultado.get('url')
+    ml_id = resultado.get('ml_id') or extraer_ml_id(url)
+    if not url or not ml_id:
+        return None
+
+    universales = (
+        resultado.get('titulo') or 'Sin título',
+        resultado.get('descripcion') or '',
+        _numero(resultado.get('precio')),
+        _coercionar(resultado.get('moneda'), MONEDAS_VALIDAS),
+        _coercionar(resultado.get('tipo_operacion'), OPERACIONES_VALIDAS),
+        _coercionar(resultado.get('tipo_propiedad'), TIPOS_PROPIEDAD_VALIDOS, ALIAS_TIPO_PROPIEDAD),
+        resultado.get('pais') or 'México',
+        resultado.get('estado') or 'No especificado',
+        resultado.get('ciudad') or 'No especificada',
+        resultado.get('direccion') or '',
+        _numero(resultado.get('terreno')),
+        _numero(resultado.get('construccion')),
+        _numero(resultado.get('recamaras'), entero=True),
+        _numero(resultado.get('banos')),
+        _numero(resultado.get('estacionamiento'), entero=True),
+    )
+    categorias = [resultado.get(categoria) for categoria in CATEGORIAS_A_COLUMNAS.values()]
+
+    # Coordenadas de la página o, en su defecto, centroide del municipio
+    coordenadas = coordenadas_validas(resultado.get('latitud'), resultado.get('longitud'))
+    precision = PRECISION_EXACTA if coordenadas else None
+    if coordenadas is None:
+        coordenadas = centroide(universales[7], universales[8])
+        precision = PRECISION_MUNICIPIO if coordenadas else None
+    latitud, longitud = coordenadas or (None, None)
+    geohash = codificar_geohash(latitud, longitud) if coordenadas else None
+
+    # Reason: la url no entra en la huella (variantes de tracking del mismo ml_id);
+    # solo las coordenadas exactas entran (el centroide deriva de estado/ciudad) y
+    # únicamente cuando existen, para no invalidar huellas de filas sin ubicación
+    contenido = (ml_id,) + universales + ((latitud, longitud) if precision == PRECISION_EXACTA else ())
+    return (
+        ml_id,
+        url,
+        *universales,
+        *(_json(categoria) for categoria in categorias),
+        _json(resultado.get('andes_table_raw')),
+        latitud,
+        longitud,
+        geohash,
+        precision,
+        calcular_huella(contenido, categorias),
+    )
+
+
+def resultado_desde_fila(anterior: Dict) -> Dict:
+    """
+    Fila guardada (columna → valor) en forma de resultado de extracción.
+
+    Examples:
+        >>> fila = fila_desde_resultado({'url': 'https://x/MLM-1-a', 'construccion': 180,
+        ...                              'servicios': {'Agua': 'Sí'}})
+        >>> r = resultado_desde_fila(dict(zip(COLUMNAS_PROPIEDADES, fila)))
+        >>> r['construccion'], r['servicios'], r['latitud']
+        (180.0, {'Agua': 'Sí'}, None)
+    """
+    resultado = {}
+    for columna in COLUMNAS_PROPIEDADES:
+        valor = anterior.get(columna)
+        if columna in CATEGORIAS_A_COLUMNAS:
+            resultado[CATEGORIAS_A_COLUMNAS[columna]] = json.loads(valor) if valor else None
+        elif columna == 'andes_table_raw':
+            resultado[columna] = json.loads(valor) if valor else None
+        elif columna not in ('latitud', 'longitud', 'geohash', 'precision_ubicacion', 'huella'):
+            resultado[COLUMNAS_A_CLAVES.get(columna, columna)] = valor
+    # Reason: el centroide se recalcula desde estado/ciudad; solo las coordenadas exactas se conservan
+    if anterior.get('precision_ubicacion') == PRECISION_EXACTA:
+        resultado['latitud'], resultado['longitud'] = anterior.get('latitud'), anterior.get('longitud')
+    else:
+        resultado['latitud'] = resultado['longitud'] = None
+    return resultado
+
+
+def combinar_con_guardado(parcial: Dict, anterior: Dict) -> Dict:
+    """
+    Registro de tarjeta combinado con la fila ya guardada desde la página de detalle.
+
+    Las tarjetas no traen descripción ni categorías; reescribir la fila con ellas
+    borraría esos datos y llenaría el historial de cambios falsos. La tarjeta solo
+    actualiza CAMPOS_TARJETA_VIGENTES y los campos que la fila tenía vacíos.
+
+    Args:
+        parcial (Dict): Registro de tarjeta (tarjetas_listado.resultado_desde_tarjeta)
+        anterior (Dict): Fila guardada (columna → valor)
+
+    Returns:
+        Dict: Resultado completo para fila_desde_resultado
+
+    Examples:
+        >>> guardada = dict(zip(COLUMNAS_PROPIEDADES, fila_desde_resultado({'url': 'https://x/MLM-1-a',
+        ...     'precio': 100.0, 'descripcion': 'Amplia', 'ciudad': 'Cuernavaca', 'recamaras': 0})))
+        >>> r = combinar_con_guardado({'url': 'https://x/MLM-1-a', 'precio': 90.0, 'descripcion': '',
+        ...                            'ciudad': 'Jiutepec', 'recamaras': 3}, guardada)
+        >>> r['precio'], r['descripcion'], r['ciudad'], r['recamaras']
+        (90.0, 'Amplia', 'Cuernavaca', 3)
+    """
+    combinado = resultado_desde_fila(anterior)
+    for clave, valor in parcial.items():
+        if valor in VALORES_VACIOS:
+            continue
+        if clave in CAMPOS_TARJETA_VIGENTES or combinado.get(clave) in VALORES_VACIOS:
+            combinado[clave] = valor
+    return combinado
+
+
+class RepositorioPropiedades:
+    """Acceso a la base SQLite de propiedades (esquema de schema.sql)"""
+
+    def __init__(self, ruta: str = "propiedades.db"):
+        """
+        Abre la base en modo WAL y crea el esquema si no existe.
+
+        Args:
+            ruta (str): Archivo SQLite (':memory:' para pruebas)
+        """
+        self.ruta = ruta
+        self.cambios_precio = 0
+        self.cambios_atributos = 0
+        # Reason: la conexión se usa desde el hilo del escritor en segundo plano
+        self.conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.execute("PRAGMA foreign_keys=ON")
+        self.crear_esquema()
+
+    def crear_esquema(self) -> None:
+        """Ejecuta schema.sql (idempotente), migra columnas nuevas y crea el índice FTS5."""
+        # Reason: las columnas faltantes se agregan antes de schema.sql porque sus
+        # índices compuestos las referencian; table_xinfo incluye columnas generadas
+        columnas = {fila[1] for fila in self.conexion.execute("PRAGMA table_xinfo(propiedades)")}
+        if columnas:
+            for columna, definicion in COLUMNAS_MIGRACION.items():
+                if columna not in columnas:
+                    self.conexion.execute(f"ALTER TABLE propiedades ADD COLUMN {columna} {definicion}")
+        self.conexion.executescript(RUTA_ESQUEMA.read_text(encoding='utf-8'))
+        self.crear_indice_texto()
+        crear_indice_espacial(self.conexion)
+        self.rellenar_centroides()
+
+        # Reason: bases con propiedades anteriores a los agregados se materializan una vez
+        sin_agregados = self.conexion.execute("SELECT NOT EXISTS(SELECT 1 FROM agregados_mercado)").fetchone()[0]
+        if sin_agregados and self.conexion.execute("SELECT EXISTS(SELECT 1 FROM propiedades)").fetchone()[0]:
+            reconstruir_agregados(self.conexion)
+
+    def rellenar_centroides(self) -> int:
+        """
+        Asigna el centroide del municipio a las filas sin coordenadas.
+
+        Returns:
+            int: Filas actualizadas (el índice R*Tree se sincroniza por trigger)
+
+        Examples:
+            >>> repo = RepositorioPropiedades(':memory:')
+            >>> repo.upsert_lote([{'url': 'https://x/MLM-1-a', 'estado': 'Morelos', 'ciudad': 'Jiutepec'}])
+            (1, 0)
+            >>> _ = repo.conexion.execute("UPDATE propiedades SET latitud = NULL, longitud = NULL, geohash = NULL")
+            >>> repo.rellenar_centroides()
+            1
+            >>> repo.conexion.execute("SELECT precision_ubicacion FROM propiedades").fetchone()
+            ('municipio',)
+        """
+        pares = self.conexion.execute(
+            "SELECT DISTINCT estado, ciudad FROM propiedades WHERE latitud IS NULL"
+        ).fetchall()
+        actualizaciones = []
+        for estado, ciudad in pares:
+            coordenadas = centroide(estado, ciudad)
+            if coordenadas:
+                latitud, longitud = coordenadas
+                actualizaciones.append((latitud, longitud, codificar_geohash(latitud, longitud),
+                                        PRECISION_MUNICIPIO, estado, ciudad))
+        if not actualizaciones:
+            return 0
+        with self.conexion:
+            return self.conexion.executemany(SQL_RELLENAR_CENTROIDE, actualizaciones).rowcount
+
+    def crear_indice_texto(self) -> bool:
+        """
+        Crea propiedades_fts (FTS5) y lo reconstruye si la tabla ya tenía filas.
+
+        Returns:
+            bool: False si este build de SQLite no incluye FTS5
+        """
+        existia = self.conexion.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'propiedades_fts'"
+        ).fetchone() is not None
+        try:
+            self.conexion.executescript(ESQUEMA_FTS)
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ FTS5 no disponible, búsqueda de texto deshabilitada: {e}")
+            return False
+        if not existia:
+            with self.conexion:
+                self.conexion.execute("INSERT INTO propiedades_fts(propiedades_fts) VALUES ('rebuild')")
+        return True
+
+    def verificar_planes(self) -> Dict[str, Dict]:
+        """
+        EXPLAIN QUERY PLAN de CONSULTAS_OBJETIVO: confirma que usan su índice.
+
+        Returns:
+            Dict[str, Dict]: consulta → {'plan', 'indice_esperado', 'usa_indice'}
+
+        Examples:
+            >>> repo = RepositorioPropiedades(':memory:')
+            >>> [nombre for nombre, r in repo.verificar_planes().items() if not r['usa_indice']]
+            []
+        """
+        resultados = {}
+        for nombre, (consulta, parametros, indice) in CONSULTAS_OBJETIVO.items():
+            plan = ' | '.join(fila[-1] for fila in
+                              self.conexion.execute(f"EXPLAIN QUERY PLAN {consulta}", parametros))
+            resultados[nombre] = {'plan': plan, 'indice_esperado': indice, 'usa_indice': indice in plan}
+        return resultados
+
+    def buscar_en_radio(self, latitud: float, longitud: float, radio_km: float,
+                        filtros: Optional[Dict] = None, solo_exactas: bool = False,
+                        limite: Optional[int] = None) -> List[Dict]:
+        """
+        Propiedades a menos de radio_km del punto (ver indice_espacial.buscar_en_radio).
+
+        Examples:
+            >>> repo = RepositorioPropiedades(':memory:')
+            >>> repo.upsert_lote([{'url': 'https://x/MLM-1-a', 'latitud': 18.92, 'longitud': -99.22},
+            ...                   {'url': 'https://x/MLM-2-b', 'estado': 'Morelos', 'ciudad': 'Jiutepec'}])
+            (2, 0)
+            >>> [(p['ml_id'], p['precision_ubicacion']) for p in repo.buscar_en_radio(18.92, -99.22, 10)]
+            [('MLM-1', 'exacta'), ('MLM-2', 'municipio')]
+            >>> [p['ml_id'] for p in repo.buscar_en_radio(18.92, -99.22, 2)]
+            ['MLM-1']
+        """
+        return buscar_en_radio(self.conexion, latitud, longitud, radio_km, filtros, solo_exactas, limite)
+
+    def huellas_existentes(self, ml_ids: List[str]) -> Dict[str, Optional[str]]:
+        """Huella guardada de cada ml_id ya presente en la base."""
+        return {ml_id: huella for ml_id, (huella, _) in self.estados_existentes(ml_ids).items()}
+
+    def estados_existentes(self, ml_ids: List[str]) -> Dict[str, Tuple[Optional[str], bool]]:
+        """(huella, activa) de cada ml_id ya presente en la base."""
+        estados = {}
+        for i in range(0, len(ml_ids), MAX_PARAMETROS_SQL):
+            parte = ml_ids[i:i + MAX_PARAMETROS_SQL]
+            consulta = (f"SELECT ml_id, huella, is_active FROM propiedades "
+                        f"WHERE ml_id IN ({', '.join('?' for _ in parte)})")
+            for ml_id, huella, activa in self.conexion.execute(consulta, parte):
+                estados[ml_id] = (huella, activa == 1)
+        return estados
+
+    def filas_existentes(self, ml_ids: List[str]) -> Dict[str, Dict]:
+        """Filas guardadas (columna → valor, más 'fecha_alta' y 'activa') de los ml_id indicados."""
+        filas = {}
+        columnas = ', '.join(_seleccion(c) for c in COLUMNAS_PROPIEDADES) + ', date(created_at), is_active'
+        for i in range(0, len(ml_ids), MAX_PARAMETROS_SQL):
+            parte = ml_ids[i:i + MAX_PARAMETROS_SQL]
+            consulta = f"SELECT {columnas} FROM propiedades WHERE ml_id IN ({', '.join('?' for _ in parte)})"
+            for fila in self.conexion.execute(consulta, parte):
+                filas[fila[0]] = dict(zip(COLUMNAS_PROPIEDADES, fila), fecha_alta=fila[-2], activa=fila[-1] == 1)
+        return filas
+
+    def upsert_lote(self, resultados: Iterable[Dict]) -> Tuple[int, int]:
+        """
+        Inserta o actualiza un lote de resultados en una sola transacción.
+
+        Las filas cuya huella coincide con la guardada solo actualizan last_scraped;
+        las que cambiaron registran sus deltas en precio_historial / cambios_atributos
+        y actualizan los agregados de mercado.
+
+        Args:
+            resultados (Iterable[Dict]): Resultados exitosos de extracción
+
+        Returns:
+            Tuple[int, int]: (filas escritas o con cambios, filas sin cambios)
+
+        Examples:
+            >>> repo = RepositorioPropiedades(':memory:')
+            >>> repo.upsert_lote([{'url': 'https://x/MLM-1-a', 'precio': 100.0}])
+            (1, 0)
+            >>> repo.upsert_lote([{'url': 'https://x/MLM-1-a', 'precio': 90.0},
+            ...                   {'url': 'https://x/MLM-1-a', 'precio': 100.0}])
+            (0, 1)
+            >>> repo.conexion.execute("SELECT precio FROM propiedades").fetchall(), repo.cambios_precio
+            ([(100,)], 0)
+        """
+        resultados = self._combinar_tarjetas(list(resultados))
+        # Reason: un ml_id repetido en el lote se reduce a su última versión antes de
+        # comparar huellas; si no, una copia podría tocarse y otra reescribirse
+        filas = list({f[0]: f for f in (fila_desde_resultado(r) for r in resultados) if f is not None}.values())
+        if not filas:
+            return 0, 0
+        estados = self.estados_existentes([f[0] for f in filas])
+        existentes = {ml_id: huella for ml_id, (huella, _) in estados.items()}
+        cambiadas = [f for f in filas if existentes.get(f[0]) != f[-1]]
+        sin_cambios = [(f[0],) for f in filas if existentes.get(f[0]) == f[-1]]
+        # latitud, longitud, geohash y precisión (columnas -5..-2) de las filas sin cambios
+        ubicaciones = [f[-5:-1] + (f[0],) for f in filas if existentes.get(f[0]) == f[-1] and f[-5] is not None]
+
+        # Reason: el upsert y el toque reactivan la fila; una inactiva sin cambios vuelve a los agregados
+        reactivadas = [ml_id for (ml_id,) in sin_cambios if not estados[ml_id][1]]
+
+        # Reason: solo las filas ya guardadas que cambiaron generan historial
+        precios, atributos = [], []
+        agregados = DeltasAgregados()
+        hoy = fecha_alta_actual()
+        anteriores = self.filas_existentes([f[0] for f in cambiadas if f[0] in existentes] + reactivadas)
+        for fila in cambiadas:
+            nueva = dict(zip(COLUMNAS_PROPIEDADES, fila))
+            anterior = anteriores.get(fila[0])
+            if anterior is not None:
+                delta_precio, delta_atributos = calcular_deltas(anterior, fila)
+                precios.extend(delta_precio)
+                atributos.extend(delta_atributos)
+                if anterior['activa']:
+                    agregados.restar(anterior, anterior['fecha_alta'])
+            fecha_alta = anterior['fecha_alta'] if anterior is not None else hoy
+            agregados.sumar(nueva, fecha_alta)
+        for ml_id in reactivadas:
+            agregados.sumar(anteriores[ml_id], anteriores[ml_id]['fecha_alta'])
+
+        with self.conexion:
+            if sin_cambios:
+                self.conexion.executemany(SQL_TOCAR, sin_cambios)
+            if ubicaciones:
+                self.conexion.executemany(SQL_TOCAR_UBICACION, ubicaciones)
+            if precios:
+                self.conexion.executemany(SQL_PRECIO_HISTORIAL, precios)
+            if atributos:
+                self.conexion.executemany(SQL_CAMBIO_ATRIBUTO, atributos)
+            if cambiadas:
+                self.conexion.executemany(SQL_UPSERT, cambiadas)
+            if cambiadas or reactivadas:
+                agregados.aplicar(self.conexion)
+        self.cambios_precio += len(precios)
+        self.cambios_atributos += len(atributos)
+        return len(cambiadas), len(sin_cambios)
+
+    def desactivar(self, ml_ids: List[str]) -> int:
+        """
+        Marca propiedades como inactivas (is_active = 0) y las retira de los agregados.
+
+        Reason: los agregados se mantienen por deltas; un UPDATE directo de is_active
+        los dejaría desfasados (en ese caso, reconstruir_agregados los repara)
+
+        Returns:
+            int: Filas que pasaron de activas a inactivas
+
+        Examples:
+            >>> repo = RepositorioPropiedades(':memory:')
+            >>> repo.upsert_lote([{'url': 'https://x/MLM-1-a', 'precio': 100.0, 'ciudad': 'Cuernavaca'},
+            ...                   {'url': 'https://x/MLM-2-b', 'precio': 300.0, 'ciudad': 'Cuernavaca'}])
+            (2, 0)
+            >>> repo.desactivar(['MLM-2'])
+            1
+            >>> repo.conexion.execute("SELECT total_propiedades, precio_maximo FROM estadisticas_por_ciudad").fetchall()
+            [(1, 100.0)]
+            >>> repo.upsert_lote([{'url': 'https://x/MLM-2-b', 'precio': 300.0, 'ciudad': 'Cuernavaca'}])
+            (0, 1)
+            >>> repo.conexion.execute("SELECT total_propiedades, precio_maximo FROM estadisticas_por_ciudad").fetchall()
+            [(2, 300.0)]
+        """
+        activas = [fila for fila in self.filas_existentes(list(ml_ids)).values() if fila['activa']]
+        if not activas:
+            return 0
+        agregados = DeltasAgregados()
+        for fila in activas:
+            agregados.restar(fila, fila['fecha_alta'])
+        with self.conexion:
+            self.conexion.executemany("UPDATE propiedades SET is_active = 0 WHERE ml_id = ?",
+                                      [(fila['ml_id'],) for fila in activas])
+            agregados.aplicar(self.conexion)
+        return len(activas)
+
+    def _combinar_tarjetas(self, resultados: List[Dict]) -> List[Dict]:
+        """Registros de tarjeta de propiedades ya guardadas → combinados con su fila."""
+        ml_ids = [r.get('ml_id') or extraer_ml_id(r.get('url')) if r.get('origen') == ORIGEN_TARJETA else None
+                  for r in resultados]
+        if not any(ml_ids):
+            return resultados
+        guardadas = self.filas_existentes([m for m in ml_ids if m])
+        return [combinar_con_guardado(r, guardadas[m]) if m in guardadas else r
+                for r, m in zip(resultados, ml_ids)]
+
+    def cerrar(self) -> None:
+        """Cierra la conexión."""
+        self.conexion.close()
+
+
+class EscritorSegundoPlano:
+    """
+    Escritor asíncrono por lotes sobre RepositorioPropiedades.
+
+    encolar() nunca bloquea; la tarea de fondo agrupa hasta `tamano_lote`
+    resultados (o lo acumulado tras `intervalo_s`) y ejecuta el upsert en el
+    executor por defecto del event loop.
+    """
+
+    def __init__(self, repositorio: RepositorioPropiedades, tamano_lote: int = 500, intervalo_s: float = 1.0):
+        """
+        Args:
+            repositorio (RepositorioPropiedades): Destino de las escrituras
+            tamano_lote (int): Máximo de filas por transacción
+            intervalo_s (float): Espera máxima para completar un lote
+        """
+        self.repositorio = repositorio
+        self.tamano_lote = tamano_lote
+        self.intervalo_s = intervalo_s
+        self._cola: Optional[asyncio.Queue] = None
+        self._tarea: Optional[asyncio.Task] = None
+        self.filas_escritas = 0
+        self.filas_sin_cambios = 0
+        self.lotes_escritos = 0
+        self.errores = 0
+        self.tiempo_escritura_s = 0.0
+
+    def iniciar(self) -> None:
+        """Arranca la tarea de escritura (requiere event loop activo)."""
+        if self._tarea is None:
+            # Reason: la cola se crea dentro del event loop activo (Python 3.8/3.9)
+            self._cola = asyncio.Queue()
+            self._tarea = asyncio.create_task(self._bucle())
+
+    def encolar(self, resultado: Dict) -> None:
+        """Agrega un resultado para escritura sin bloquear al trabajador."""
+        if self._tarea is None:
+            self.iniciar()
+        self._cola.put_nowait(resultado)
+
+    async def detener(self) -> None:
+        """Escribe lo pendiente y termina la tarea."""
+        if self._tarea is None:
+            return
+        await self._cola.put(None)
+        await self._tarea
+        self._tarea = None
+
+    async def _bucle(self) -> None:
+        terminar = False
+        while not terminar:
+            item = await self._cola.get()
+            if item is None:
+                break
+            lote = [item]
+            limite = time.monotonic() + self.intervalo_s
+            while len(lote) < self.tamano_lote:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._cola.get(), restante)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    terminar = True
+                    break
+                lote.append(item)
+            await self._escribir(lote)
+
+    async def _escribir(self, lote: List[Dict]) -> None:
+        inicio = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            escritas, sin_cambios = await loop.run_in_executor(None, self.repositorio.upsert_lote, lote)
+            self.filas_escritas += escritas
+            self.filas_sin_cambios += sin_cambios
+            self.lotes_escritos += 1
+        except Exception as e:
+            self.errores += 1
+            print(f"⚠️ Error escribiendo lote de {len(lote)} propiedades en SQLite: {e}")
+        finally:
+            self.tiempo_escritura_s += time.perf_counter() - inicio
+
+    def resumen(self) -> Dict:
+        """Métricas de escritura para el reporte final."""
+        return {
+            'base_datos': self.repositorio.ruta,
+            'filas_escritas': self.filas_escritas,
+            'filas_sin_cambios': self.filas_sin_cambios,
+            'cambios_precio': self.repositorio.cambios_precio,
+            'cambios_atributos': self.repositorio.cambios_atributos,
+            'lotes': self.lotes_escritos,
+            'errores': self.errores,
+            'tiempo_escritura_s': round(self.tiempo_escritura_s, 3),
+        }
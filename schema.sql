@@ -10,7 +10,7 @@
 -- TABLA PRINCIPAL: PROPIEDADES
 -- =============================================================================
 
-CREATE TABLE propiedades (
+CREATE TABLE IF NOT EXISTS propiedades (
     -- ✅ IDENTIFICACIÓN UNIVERSAL
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     ml_id TEXT UNIQUE,                               -- ID único de MercadoLibre
@@ -30,6 +30,10 @@ CREATE TABLE propiedades (
     estado TEXT NOT NULL DEFAULT 'No especificado',
     ciudad TEXT NOT NULL DEFAULT 'No especificada',
     direccion_completa TEXT DEFAULT '',              -- Dirección raw completa
+    latitud REAL,                                    -- Coordenadas (página o centroide del municipio)
+    longitud REAL,
+    geohash TEXT,                                    -- Geohash de latitud/longitud (precisión 9)
+    precision_ubicacion TEXT,                        -- 'exacta' | 'municipio' (ver indice_espacial.py)
     
     -- ✅ CARACTERÍSTICAS FÍSICAS UNIVERSALES (siempre presentes)
     superficie_total DECIMAL(10,2) NOT NULL DEFAULT 0.0,      -- Terreno/total
@@ -51,17 +55,24 @@ CREATE TABLE propiedades (
     last_scraped TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     is_active BOOLEAN DEFAULT 1,
     fuente TEXT DEFAULT 'mercadolibre',
+    huella TEXT,                                     -- Hash del contenido normalizado (detección de cambios)
     
     -- ✅ DATOS RAW COMPLETOS (backup completo)
     andes_table_raw JSON,                            -- Tabla andes completa como backup
-    html_snapshot TEXT                               -- HTML snapshot para debugging (opcional)
+    html_snapshot TEXT,                              -- HTML snapshot para debugging (opcional)
+    
+    -- 🔎 COLUMNAS GENERADAS (claves JSON consultadas con frecuencia → indexables)
+    -- Mantener sincronizadas con COLUMNAS_MIGRACION en repositorio_propiedades.py
+    tiene_alberca INTEGER GENERATED ALWAYS AS (CASE WHEN json_extract(ambientes, '$."Alberca"') IN ('Sí', 'Si') THEN 1 ELSE 0 END) VIRTUAL,
+    tiene_jardin INTEGER GENERATED ALWAYS AS (CASE WHEN json_extract(ambientes, '$."Jardín"') IN ('Sí', 'Si') THEN 1 ELSE 0 END) VIRTUAL,
+    tiene_vigilancia INTEGER GENERATED ALWAYS AS (CASE WHEN json_extract(seguridad, '$."Vigilancia"') IN ('Sí', 'Si') THEN 1 ELSE 0 END) VIRTUAL
 );
 
 -- =============================================================================
 -- TABLA DE CONTACTO (estructura tradicional - campos conocidos)
 -- =============================================================================
 
-CREATE TABLE contactos (
+CREATE TABLE IF NOT EXISTS contactos (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     propiedad_id INTEGER,
     tipo TEXT CHECK(tipo IN ('telefono', 'email', 'whatsapp')) NOT NULL,
@@ -71,25 +82,93 @@ CREATE TABLE contactos (
     FOREIGN KEY(propiedad_id) REFERENCES propiedades(id) ON DELETE CASCADE
 );
 
+-- =============================================================================
+-- HISTORIAL DE CAMBIOS (solo deltas respecto a la fila guardada)
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS precio_historial (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ml_id TEXT NOT NULL,
+    ciudad TEXT NOT NULL DEFAULT 'No especificada',  -- Ciudad al momento del cambio
+    precio_anterior DECIMAL(15,2) NOT NULL,
+    precio_nuevo DECIMAL(15,2) NOT NULL,
+    moneda_anterior TEXT,
+    moneda_nueva TEXT,
+    fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS cambios_atributos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ml_id TEXT NOT NULL,
+    ciudad TEXT NOT NULL DEFAULT 'No especificada',
+    campo TEXT NOT NULL,                             -- Columna o 'categoria.clave' para JSON
+    valor_anterior TEXT,                             -- NULL = no existía
+    valor_nuevo TEXT,                                -- NULL = se eliminó
+    fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- =============================================================================
+-- AGREGADOS DE MERCADO (mantenidos incrementalmente por agregados_mercado.py)
+-- =============================================================================
+
+-- Precio: solo propiedades con precio > 0; precio/m² con superficie_construida > 0
+CREATE TABLE IF NOT EXISTS agregados_mercado (
+    estado TEXT NOT NULL,
+    ciudad TEXT NOT NULL,
+    tipo_propiedad TEXT NOT NULL,
+    tipo_operacion TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    con_precio INTEGER NOT NULL DEFAULT 0,
+    suma_precio REAL NOT NULL DEFAULT 0,
+    min_precio REAL,
+    max_precio REAL,
+    suma_superficie_total REAL NOT NULL DEFAULT 0,
+    con_precio_m2 INTEGER NOT NULL DEFAULT 0,
+    suma_precio_m2 REAL NOT NULL DEFAULT 0,
+    actualizado_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (estado, ciudad, tipo_propiedad, tipo_operacion)
+);
+
+-- Mismo agregado por fecha de alta (date(created_at)) de la propiedad
+CREATE TABLE IF NOT EXISTS agregados_mercado_diario (
+    fecha TEXT NOT NULL,
+    estado TEXT NOT NULL,
+    ciudad TEXT NOT NULL,
+    tipo_propiedad TEXT NOT NULL,
+    tipo_operacion TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    con_precio INTEGER NOT NULL DEFAULT 0,
+    suma_precio REAL NOT NULL DEFAULT 0,
+    min_precio REAL,
+    max_precio REAL,
+    suma_superficie_total REAL NOT NULL DEFAULT 0,
+    con_precio_m2 INTEGER NOT NULL DEFAULT 0,
+    suma_precio_m2 REAL NOT NULL DEFAULT 0,
+    actualizado_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (fecha, estado, ciudad, tipo_propiedad, tipo_operacion)
+);
+
 -- =============================================================================
 -- VISTAS ÚTILES PARA CONSULTAS
 -- =============================================================================
 
 -- Vista de propiedades activas
-CREATE VIEW propiedades_activas AS
+CREATE VIEW IF NOT EXISTS propiedades_activas AS
 SELECT * FROM propiedades WHERE is_active = 1;
 
--- Vista de estadísticas por ciudad
+-- Vista de estadísticas por ciudad (lee agregados materializados, no escanea propiedades).
+-- Los agregados solo cuentan propiedades activas (is_active = 1), como la vista original
+DROP VIEW IF EXISTS estadisticas_por_ciudad;
 CREATE VIEW estadisticas_por_ciudad AS
 SELECT 
     ciudad,
-    COUNT(*) as total_propiedades,
-    AVG(precio) as precio_promedio,
-    MIN(precio) as precio_minimo,
-    MAX(precio) as precio_maximo,
-    AVG(superficie_total) as superficie_promedio
-FROM propiedades
-WHERE is_active = 1
+    SUM(total) as total_propiedades,
+    SUM(suma_precio) / NULLIF(SUM(con_precio), 0) as precio_promedio,
+    MIN(min_precio) as precio_minimo,
+    MAX(max_precio) as precio_maximo,
+    SUM(suma_superficie_total) / SUM(total) as superficie_promedio,
+    SUM(suma_precio_m2) / NULLIF(SUM(con_precio_m2), 0) as precio_m2_promedio
+FROM agregados_mercado
 GROUP BY ciudad
 ORDER BY total_propiedades DESC;
 
@@ -98,9 +177,26 @@ ORDER BY total_propiedades DESC;
 -- =============================================================================
 
 -- Índices para campos estructurados (consultas frecuentes)
-CREATE INDEX idx_propiedades_ml_id ON propiedades(ml_id);
-CREATE INDEX idx_propiedades_precio ON propiedades(precio);
-CREATE INDEX idx_propiedades_tipo_operacion ON propiedades(tipo_operacion);
-CREATE INDEX idx_propiedades_ciudad ON propiedades(ciudad);
-CREATE INDEX idx_propiedades_recamaras ON propiedades(recamaras);
-CREATE INDEX idx_contactos_propiedad_id ON contactos(propiedad_id);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_propiedades_ml_id ON propiedades(ml_id);
+CREATE INDEX IF NOT EXISTS idx_propiedades_precio ON propiedades(precio);
+CREATE INDEX IF NOT EXISTS idx_propiedades_tipo_operacion ON propiedades(tipo_operacion);
+CREATE INDEX IF NOT EXISTS idx_propiedades_ciudad ON propiedades(ciudad);
+CREATE INDEX IF NOT EXISTS idx_propiedades_recamaras ON propiedades(recamaras);
+CREATE INDEX IF NOT EXISTS idx_contactos_propiedad_id ON contactos(propiedad_id);
+
+-- Índices compuestos por forma de consulta (ver CONSULTAS_OBJETIVO en repositorio_propiedades.py)
+-- Búsqueda: ciudad + operación + rango de precio + recámaras (cubre ml_id para listados)
+CREATE INDEX IF NOT EXISTS idx_propiedades_busqueda ON propiedades(ciudad, tipo_operacion, precio, recamaras, ml_id);
+-- Amenidades en JSON vía columnas generadas
+CREATE INDEX IF NOT EXISTS idx_propiedades_ciudad_alberca ON propiedades(ciudad, tiene_alberca, precio);
+CREATE INDEX IF NOT EXISTS idx_propiedades_ciudad_jardin ON propiedades(ciudad, tiene_jardin, precio);
+CREATE INDEX IF NOT EXISTS idx_propiedades_ciudad_vigilancia ON propiedades(ciudad, tiene_vigilancia, precio);
+
+-- Zonas por prefijo de geohash (consultas por radio: propiedades_rtree en indice_espacial.py)
+CREATE INDEX IF NOT EXISTS idx_propiedades_geohash ON propiedades(geohash);
+
+-- Índices de historial ("cambios de precio esta semana en Cuernavaca")
+CREATE INDEX IF NOT EXISTS idx_precio_historial_ml_id_fecha ON precio_historial(ml_id, fecha);
+CREATE INDEX IF NOT EXISTS idx_precio_historial_ciudad_fecha ON precio_historial(ciudad, fecha);
+CREATE INDEX IF NOT EXISTS idx_cambios_atributos_ml_id_fecha ON cambios_atributos(ml_id, fecha);
+CREATE INDEX IF NOT EXISTS idx_cambios_atributos_ciudad_fecha ON cambios_atributos(ciudad, fecha);
\ No newline at end of file
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+SCRIPT DE EXTRACCIÓN EN PÁGINA - SCRAPER MERCADOLIBRE
+=====================================================
+
+Función JavaScript que recolecta en un solo `page.evaluate` todos los textos
+que necesita ExtractorHibridoOptimizado (título, descripción, precio, subtitle,
+vendedor, candidatos de dirección, tablas de especificaciones y scripts con
+estado embebido JSON-LD / __PRELOADED_STATE__).
+
+El post-procesamiento vive en Python (extractors.py); este script solo lee el
+DOM y devuelve un payload JSON compacto para evitar un round-trip IPC por
+selector, fila y celda.
+"""
+
+from typing import Dict, List, Union
+
+from estado_embebido import MARCADORES_ESTADO
+
+
+# ✅ CASCADAS DE SELECTORES (el orden define la prioridad de cada campo)
+SELECTORES_PDP: Dict[str, Union[str, List[str]]] = {
+    'titulo': 'h1',
+    'descripcion': '[data-testid="content"]',
+    'precio': [
+        '.price-tag-fraction',
+        '.andes-money-amount__fraction',
+        '.ui-pdp-price__fraction',
+    ],
+    'subtitulo': [
+        '.ui-pdp-subtitle',                              # 1. Simple y directo
+        '.ui-pdp-header__subtitle .ui-pdp-subtitle',     # 2. Específico por contexto
+        '.ui-pdp-header__subtitle span',                 # 3. Por tipo de elemento
+        'span.ui-pdp-subtitle',                          # 4. Por elemento + clase
+    ],
+    'vendedor': [
+        '.ui-vip-profile-info__info-container .ui-vip-profile-info__info-link h3',  # 1. Selector completo específico
+        '.ui-vip-profile-info__info-container h3',                                  # 2. Selector directo al h3
+        '.ui-vip-profile-info__info-link h3',                                       # 3. Desde el link directo
+        'h3.ui-pdp-color--BLACK.ui-pdp-size--XSMALL.ui-pdp-family--REGULAR',        # 4. Por clases específicas del h3
+    ],
+    'direccion_especifica': 'p.ui-pdp-color--BLACK.ui-pdp-size--SMALL.ui-pdp-family--REGULAR.ui-pdp-media__title',
+    'direccion_general': [
+        'p[class*="ui-pdp"]',
+        'span[class*="ui-pdp"]',
+        '.ui-pdp-container p',
+        '.ui-pdp-media__title',
+        'p.ui-pdp-color--BLACK',
+    ],
+    'contenedor_specs': '.ui-pdp-container__row.ui-pdp-container__row--technical-specifications',
+    'tabla_specs': '.ui-vpp-striped-specs__table',
+    'titulo_tabla': [
+        'h3', 'h4', 'h2',
+        '.ui-vpp-striped-specs__header',
+        '[class*="header"]',
+        '[class*="title"]',
+    ],
+    'json_ld': 'script[type="application/ld+json"]',
+    'estado_precargado': 'script#__PRELOADED_STATE__, script#__NEXT_DATA__',
+}
+
+# Reason: es_probable_direccion descarta textos < 15 caracteres, filtrarlos en
+# el browser reduce el payload sin cambiar el resultado
+LONGITUD_MINIMA_DIRECCION = 15
+
+
+# Cada cascada se devuelve como [selector, texto, latencia_ms] para alimentar
+# las estadísticas de RegistroCascadas (cascada_selectores.py).
+# Cada fila de tabla se devuelve como [clave_th, valor_td, celda_0, celda_1]:
+# - clave_th/valor_td: estructura específica (th > div, td > span) del modo completo
+# - celda_0/celda_1: dos primeras celdas genéricas 'th, td' del modo optimizado
+SCRIPT_EXTRACCION_PDP = r"""
+(args) => {
+    const inicio = performance.now();
+    const sel = args.selectores;
+    const minimo = args.longitud_minima_direccion;
+    const marcadores = args.marcadores_estado;
+
+    const texto = (el) => (el ? (el.textContent || '') : null);
+    const primero = (selector, raiz) => {
+        try { return (raiz || document).querySelector(selector); } catch (e) { return null; }
+    };
+    const todos = (selector, raiz) => {
+        try { return Array.from((raiz || document).querySelectorAll(selector)); } catch (e) { return []; }
+    };
+    const cascada = (selectores, raiz) => selectores.map((s) => {
+        const t0 = performance.now();
+        const valor = texto(primero(s, raiz));
+        return [s, valor, performance.now() - t0];
+    });
+    const candidatosDireccion = (selector) => todos(selector)
+        .map(texto)
+        .filter((t) => t && t.trim().length >= minimo);
+
+    const h1 = primero(sel.titulo);
+    const descripcion = primero(sel.descripcion);
+    const contenedor = primero(sel.contenedor_specs);
+
+    const tablas = contenedor ? todos(sel.tabla_specs, contenedor).map((tabla) => ({
+        titulos: cascada(sel.titulo_tabla, tabla),
+        filas: todos('tr', tabla).map((fila) => {
+            const th = fila.querySelector('th');
+            const td = fila.querySelector('td');
+            const celdas = fila.querySelectorAll('th, td');
+            const especifica = th && td;
+            const generica = celdas.length >= 2;
+            return [
+                especifica ? texto(th.querySelector('div') || th) : null,
+                especifica ? texto(td.querySelector('span') || td) : null,
+                generica ? texto(celdas[0]) : null,
+                generica ? texto(celdas[1]) : null,
+            ];
+        }),
+    })) : null;
+
+    const esEstado = (s) => !s.matches(sel.json_ld) && (
+        s.matches(sel.estado_precargado) || marcadores.some((m) => (s.textContent || '').includes(m))
+    );
+
+    const cuerpo = document.body ? (document.body.innerText || '') : '';
+
+    return {
+        titulo_inner: h1 ? h1.innerText : null,
+        titulo_texto: texto(h1),
+        descripcion: descripcion ? descripcion.innerText : null,
+        precio: cascada(sel.precio),
+        subtitulo: cascada(sel.subtitulo),
+        vendedor: cascada(sel.vendedor),
+        direccion: {
+            especifica: candidatosDireccion(sel.direccion_especifica),
+            general: sel.direccion_general.map((s) => [s, candidatosDireccion(s)]),
+            lineas: cuerpo.split('\n').map((l) => l.trim()).filter((l) => l.length >= minimo),
+        },
+        tablas: tablas,
+        scripts: {
+            json_ld: todos(sel.json_ld).map(texto),
+            estado: todos('script').filter(esEstado).map(texto),
+        },
+        tiempo_ms: performance.now() - inicio,
+    };
+}
+"""
+
+
+def argumentos_script() -> Dict:
+    """
+    Construye el argumento serializable para SCRIPT_EXTRACCION_PDP.
+
+    Returns:
+        Dict: Selectores y umbrales que consume el script en el browser
+    """
+    return {
+        'selectores': SELECTORES_PDP,
+        'longitud_minima_direccion': LONGITUD_MINIMA_DIRECCION,
+        'marcadores_estado': list(MARCADORES_ESTADO),
+    }
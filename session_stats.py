@@ -46,14 +46,17 @@ class SessionStatsManager:
     def __init__(self):
         """Inicializa gestor con estadísticas limpias."""
         self.stats = SessionStats()
+        self.stats_por_trabajador: Dict[int, SessionStats] = {}
     
-    def update_from_result(self, resultado: Dict) -> None:
+    def update_from_result(self, resultado: Dict, trabajador_id: Optional[int] = None) -> None:
         """
         Actualiza estadísticas basándose en resultado de extracción.
         
         Args:
             resultado (Dict): Diccionario con resultado de procesamiento
                             Debe contener 'status' key con valor 'exitoso' o error
+            trabajador_id (Optional[int]): Trabajador del pool que produjo el resultado;
+                            los totales globales agregan a todos los trabajadores
         
         Examples:
             >>> manager = SessionStatsManager()
@@ -62,15 +65,24 @@ class SessionStatsManager:
             >>> manager.get_success_rate()
             100.0
         """
-        self.stats.total_processed += 1
-        self.stats.requests_in_session += 1
+        self._acumular(self.stats, resultado)
+        
+        if trabajador_id is not None:
+            stats_trabajador = self.stats_por_trabajador.setdefault(trabajador_id, SessionStats())
+            self._acumular(stats_trabajador, resultado)
+    
+    @staticmethod
+    def _acumular(stats: SessionStats, resultado: Dict) -> None:
+        """Suma un resultado a un SessionStats (global o de trabajador)."""
+        stats.total_processed += 1
+        stats.requests_in_session += 1
         
         if resultado.get('status') == 'exitoso':
-            self.stats.successful_extractions += 1
-            self.stats.consecutive_failures = 0  # Reason: Reset en éxito
+            stats.successful_extractions += 1
+            stats.consecutive_failures = 0  # Reason: Reset en éxito
         else:
-            self.stats.failed_extractions += 1
-            self.stats.consecutive_failures += 1
+            stats.failed_extractions += 1
+            stats.consecutive_failures += 1
     
     def reset_session(self) -> None:
         """
@@ -207,7 +219,7 @@ class SessionStatsManager:
         """
         total_time = time.time() - self.stats.session_start_time
         
-        return {
+        reporte = {
             'duracion_total_minutos': round(total_time / 60, 2),
             'propiedades_objetivo': total_target,
             'propiedades_exitosas': self.stats.successful_extractions,
@@ -216,4 +228,16 @@ class SessionStatsManager:
             'promedio_tiempo_por_propiedad': round(self.get_avg_time_per_property(), 2),
             'requests_totales': self.stats.requests_in_session,
             'bloqueos_detectados': self.stats.blocking_detected
-        } 
\ No newline at end of file
+        }
+        
+        if self.stats_por_trabajador:
+            reporte['por_trabajador'] = {
+                trabajador_id: {
+                    'procesadas': stats.total_processed,
+                    'exitosas': stats.successful_extractions,
+                    'fallidas': stats.failed_extractions,
+                }
+                for trabajador_id, stats in sorted(self.stats_por_trabajador.items())
+            }
+        
+        return reporte 
\ No newline at end of file
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+SUMIDERO JSON LINES - SCRAPER MERCADOLIBRE
+==========================================
+
+Escritura incremental de resultados en archivos JSON Lines:
+- Una línea por propiedad en cuanto termina su procesamiento, con flush
+  inmediato (sobrevive a que el proceso muera)
+- fsync por lotes (cada N registros o cada T segundos; protege ante caídas
+  del sistema operativo)
+- Rotación por tamaño o antigüedad del archivo
+
+Tras una caída, los archivos ya escritos siguen siendo válidos; la lectura
+ignora una última línea truncada. El reporte final se genera recorriendo
+estos archivos en lugar de mantener todos los resultados en memoria.
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+class SumideroJSONL:
+    """
+    Escritor de resultados JSONL con checkpoints (fsync) por lote y rotación.
+
+    Examples:
+        >>> import tempfile
+        >>> sumidero = SumideroJSONL(tempfile.mkdtemp(), fsync_cada=2)
+        >>> sumidero.escribir({'ml_id': 'MLM-1', 'status': 'exitoso'})
+        >>> sumidero.cerrar()
+        >>> [r['ml_id'] for r in ResultadosJSONL(sumidero.archivos())]
+        ['MLM-1']
+    """
+
+    def __init__(self, directorio: str = "resultados_jsonl", prefijo: str = "resultados",
+                 max_bytes: int = 100_000_000, max_segundos: float = 3600,
+                 fsync_cada: int = 50, fsync_intervalo_s: float = 5.0):
+        """
+        Args:
+            directorio (str): Carpeta de los archivos .jsonl
+            prefijo (str): Prefijo de nombre de archivo
+            max_bytes (int): Tamaño que dispara rotación
+            max_segundos (float): Antigüedad que dispara rotación
+            fsync_cada (int): Registros entre fsync
+            fsync_intervalo_s (float): Segundos máximos entre fsync
+        """
+        self.directorio = Path(directorio)
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        self.prefijo = prefijo
+        self.max_bytes = max_bytes
+        self.max_segundos = max_segundos
+        self.fsync_cada = fsync_cada
+        self.fsync_intervalo_s = fsync_intervalo_s
+
+        self._archivo = None
+        self._ruta_actual: Optional[Path] = None
+        self._apertura = 0.0
+        self._bytes_actual = 0
+        self._pendientes = 0
+        self._ultimo_fsync = time.monotonic()
+        self._secuencia = 0
+        self.registros_escritos = 0
+        self.archivos_creados = 0
+
+    def _abrir_nuevo(self) -> None:
+        self._cerrar_actual()
+        self._secuencia += 1
+        marca = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self._ruta_actual = self.directorio / f"{self.prefijo}_{marca}_{self._secuencia:04d}.jsonl"
+        self._archivo = open(self._ruta_actual, 'a', encoding='utf-8')
+        self._apertura = time.monotonic()
+        self._bytes_actual = self._ruta_actual.stat().st_size
+        self.archivos_creados += 1
+
+    def _debe_rotar(self) -> bool:
+        return (self._archivo is None or
+                self._bytes_actual >= self.max_bytes or
+                time.monotonic() - self._apertura >= self.max_segundos)
+
+    def escribir(self, resultado: Dict) -> None:
+        """
+        Agrega un resultado como una línea JSON.
+
+        Args:
+            resultado (Dict): Resultado de _process_single_property
+        """
+        if self._debe_rotar():
+            self._abrir_nuevo()
+
+        linea = json.dumps(resultado, ensure_ascii=False, default=str) + '\n'
+        self._archivo.write(linea)
+        # Reason: flush por registro → la línea llega al sistema operativo antes de que
+        # la cola persistente marque el item como terminado; el fsync sigue por lotes
+        self._archivo.flush()
+        self._bytes_actual += len(linea.encode('utf-8'))
+        self._pendientes += 1
+        self.registros_escritos += 1
+
+        if (self._pendientes >= self.fsync_cada or
+                time.monotonic() - self._ultimo_fsync >= self.fsync_intervalo_s):
+            self.sincronizar()
+
+    def sincronizar(self) -> None:
+        """Checkpoint: flush + fsync del archivo actual."""
+        if self._archivo is None:
+            return
+        self._archivo.flush()
+        os.fsync(self._archivo.fileno())
+        self._pendientes = 0
+        self._ultimo_fsync = time.monotonic()
+
+    def _cerrar_actual(self) -> None:
+        if self._archivo is not None:
+            self.sincronizar()
+            self._archivo.close()
+            self._archivo = None
+
+    def cerrar(self) -> None:
+        """Sincroniza y cierra el archivo abierto."""
+        self._cerrar_actual()
+
+    def archivos(self) -> List[str]:
+        """Archivos JSONL del directorio en orden de creación."""
+        return sorted(str(p) for p in self.directorio.glob(f"{self.prefijo}_*.jsonl"))
+
+    def resumen(self) -> Dict:
+        """Métricas del sumidero para el reporte final."""
+        return {
+            'directorio': str(self.directorio),
+            'registros_escritos': self.registros_escritos,
+            'archivos_creados': self.archivos_creados,
+        }
+
+
+class ResultadosJSONL:
+    """
+    Vista re-iterable sobre archivos JSONL (memoria constante por recorrido).
+
+    Reason: generar_reporte_hibrido recorre los resultados varias veces; cada
+    iteración vuelve a leer los archivos en streaming.
+    """
+
+    def __init__(self, rutas: Iterable[str]):
+        self.rutas = list(rutas)
+        self._total: Optional[int] = None
+
+    def __iter__(self) -> Iterator[Dict]:
+        for ruta in self.rutas:
+            try:
+                with open(ruta, 'r', encoding='utf-8') as f:
+                    for linea in f:
+                        if not linea.strip():
+                            continue
+                        try:
+                            yield json.loads(linea)
+                        except json.JSONDecodeError:
+                            # Reason: última línea truncada por una caída
+                            continue
+            except FileNotFoundError:
+                continue
+
+    def __len__(self) -> int:
+        if self._total is None:
+            self._total = sum(1 for _ in self)
+        return self._total
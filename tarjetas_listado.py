@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+TARJETAS DE LISTADO - SCRAPER MERCADOLIBRE
+==========================================
+
+Modo rápido de monitoreo de mercado: las tarjetas de resultados de búsqueda ya
+muestran precio, moneda, ubicación, m² y recámaras, así que una página de
+listado (~48 propiedades) se convierte en registros con forma de
+ResultadoPropiedad sin visitar ninguna página de detalle.
+
+- SCRIPT_TARJETAS_LISTADO: un solo `page.evaluate` por página que devuelve los
+  textos crudos de cada tarjeta
+- resultado_desde_tarjeta: post-procesamiento en Python (ml_id, precio,
+  moneda, estado/ciudad, tipo y atributos básicos)
+
+Los registros no traen descripción, vendedor ni categorías de la página de
+detalle.
+"""
+
+import re
+from dataclasses import asdict
+from typing import Dict, List, Optional, Union
+
+from direccion_utils import parsear_ubicacion_completa
+from mapeo_campos import MapeoCampo
+from models import ResultadoPropiedad
+from utils import extraer_ml_id
+
+
+DOMINIO_LISTADO = "https://casa.mercadolibre.com.mx"
+
+# Marca de los registros de tarjeta: la base los combina con la fila ya guardada
+ORIGEN_TARJETA = 'tarjeta_listado'
+
+# ✅ CASCADAS DE SELECTORES DE TARJETA (relativos a cada tarjeta salvo 'tarjeta')
+SELECTORES_TARJETA: Dict[str, Union[str, List[str]]] = {
+    'tarjeta': [
+        'li.ui-search-layout__item',
+        '.ui-search-result__wrapper',
+        '.poly-card',
+    ],
+    'enlace': 'a[href*="MLM-"]',
+    'titulo': ['.poly-component__title', '.ui-search-item__title', 'h2', 'h3'],
+    'encabezado': ['.poly-component__headline', '.ui-search-item__subtitle', '.ui-search-item__group__element--subtitle'],
+    'precio': [
+        '.poly-price__current .andes-money-amount__fraction',
+        '.andes-money-amount__fraction',
+        '.price-tag-fraction',
+    ],
+    'moneda': [
+        '.poly-price__current .andes-money-amount__currency-symbol',
+        '.andes-money-amount__currency-symbol',
+        '.price-tag-symbol',
+    ],
+    'ubicacion': ['.poly-component__location', '.ui-search-item__location', '.ui-search-item__group__element--location'],
+    'atributos': [
+        '.poly-attributes_list__item',
+        '.poly-attributes-list__item',
+        '.ui-search-card-attributes__attribute',
+        '.ui-search-item__attributes li',
+    ],
+}
+
+# Cada tarjeta se devuelve como {href, titulo, encabezado, precio, moneda, ubicacion, atributos}.
+# Reason: 'tarjeta' llega ya ordenada por RegistroCascadas; el primer selector
+# con resultados gana y se reporta para sus estadísticas
+SCRIPT_TARJETAS_LISTADO = r"""
+(args) => {
+    const inicio = performance.now();
+    const sel = args.selectores;
+
+    const todos = (selector, raiz) => {
+        try { return Array.from((raiz || document).querySelectorAll(selector)); } catch (e) { return []; }
+    };
+    const textoDe = (raiz, selectores) => {
+        for (const s of selectores) {
+            let el = null;
+            try { el = raiz.querySelector(s); } catch (e) { el = null; }
+            const t = el ? (el.textContent || '').trim() : '';
+            if (t) return t;
+        }
+        return null;
+    };
+
+    let ganador = null;
+    let tarjetas = [];
+    for (const s of sel.tarjeta) {
+        tarjetas = todos(s);
+        if (tarjetas.length) { ganador = s; break; }
+    }
+
+    const registros = [];
+    for (const tarjeta of tarjetas.slice(0, args.maximo)) {
+        const enlace = tarjeta.querySelector(sel.enlace);
+        if (!enlace) continue;
+        let atributos = [];
+        for (const s of sel.atributos) {
+            atributos = todos(s, tarjeta).map((el) => (el.textContent || '').trim()).filter((t) => t);
+            if (atributos.length) break;
+        }
+        registros.push({
+            href: enlace.getAttribute('href'),
+            titulo: textoDe(tarjeta, sel.titulo),
+            encabezado: textoDe(tarjeta, sel.encabezado),
+            precio: textoDe(tarjeta, sel.precio),
+            moneda: textoDe(tarjeta, sel.moneda),
+            ubicacion: textoDe(tarjeta, sel.ubicacion),
+            atributos: atributos,
+        });
+    }
+    return {selector: ganador, tarjetas: registros, tiempo_ms: performance.now() - inicio};
+}
+"""
+
+PATRON_NUMERO_TARJETA = re.compile(r'\d[\d,]*(?:\.\d+)?')
+
+
+def numero_tarjeta(texto: str) -> Union[int, float, None]:
+    """
+    Primer número de un atributo de tarjeta; en tarjetas la coma siempre separa miles.
+
+    Examples:
+        >>> numero_tarjeta('3 recámaras'), numero_tarjeta('1,250 m² totales'), numero_tarjeta('2.5 baños')
+        (3, 1250, 2.5)
+    """
+    match = PATRON_NUMERO_TARJETA.search(texto or '')
+    if not match:
+        return None
+    valor = float(match.group(0).replace(',', ''))
+    return int(valor) if valor.is_integer() else valor
+
+
+# ✅ ATRIBUTOS DE TARJETA → CAMPOS UNIVERSALES ("3 recámaras", "180 m² construidos", ...)
+ATRIBUTOS_TARJETA = (
+    MapeoCampo('recamaras', ('recámara', 'recamara'), numero_tarjeta),
+    MapeoCampo('banos', ('baño', 'bano'), numero_tarjeta),
+    MapeoCampo('construccion', ('construid',), numero_tarjeta),
+    MapeoCampo('terreno', ('total', 'terreno'), numero_tarjeta),
+    MapeoCampo('estacionamiento', ('estacionamiento', 'cochera', 'garage'), numero_tarjeta),
+)
+
+# Mismas palabras que el subtitle de la página de detalle (_extraer_tipo_propiedad_y_operacion)
+TIPOS_PROPIEDAD = (
+    ('casa', ('casa',)),
+    ('departamento', ('departamento', 'depto', 'dpto')),
+    ('terreno', ('terreno', 'lote')),
+    ('comercial', ('local', 'oficina', 'bodega')),
+)
+TIPOS_OPERACION = (
+    ('venta', ('venta', 'remate')),
+    ('renta', ('renta', 'alquiler', 'alquila')),
+    ('traspaso', ('traspaso', 'cesion')),
+)
+
+
+def normalizar_href_listado(href: str) -> str:
+    """
+    URL absoluta de un enlace de listado.
+
+    Examples:
+        >>> normalizar_href_listado('/MLM-123-casa-_JM')
+        'https://casa.mercadolibre.com.mx/MLM-123-casa-_JM'
+    """
+    if href.startswith('/'):
+        return f"{DOMINIO_LISTADO}{href}"
+    if not href.startswith('http'):
+        return f"{DOMINIO_LISTADO}/{href}"
+    return href
+
+
+def _tipo(textos: List[Optional[str]], tabla: tuple) -> Optional[str]:
+    """Primer tipo de la tabla mencionado en el encabezado o, si no, en el título."""
+    for texto in textos:
+        texto_lower = (texto or '').lower()
+        for tipo, palabras in tabla:
+            if any(p in texto_lower for p in palabras):
+                return tipo
+    return None
+
+
+def resultado_desde_tarjeta(tarjeta: Dict, timestamp: str) -> Optional[Dict]:
+    """
+    Convierte una tarjeta de SCRIPT_TARJETAS_LISTADO en un registro ResultadoPropiedad.
+
+    Args:
+        tarjeta (Dict): Textos crudos de la tarjeta
+        timestamp (str): Momento de lectura del listado (ISO)
+
+    Returns:
+        Optional[Dict]: asdict(ResultadoPropiedad) con status 'exitoso' y
+        origen ORIGEN_TARJETA, o None sin ml_id
+
+    Examples:
+        >>> r = resultado_desde_tarjeta({'href': '/MLM-123-casa-_JM', 'titulo': 'Casa con jardín',
+        ...     'encabezado': 'Casa en venta', 'precio': '2,550,000', 'moneda': '$',
+        ...     'ubicacion': 'Lomas de Cortés, Cuernavaca, Morelos',
+        ...     'atributos': ['3 recámaras', '2 baños', '180 m² construidos']}, '2025-01-31T10:00:00')
+        >>> r['ml_id'], r['precio'], r['moneda'], r['ciudad'], r['recamaras'], r['construccion'], r['tipo_operacion']
+        ('MLM-123', 2550000.0, 'MXN', 'Cuernavaca', 3, 180, 'venta')
+        >>> r['origen']
+        'tarjeta_listado'
+    """
+    href = tarjeta.get('href')
+    url = normalizar_href_listado(href) if href else None
+    ml_id = extraer_ml_id(url)
+    if not ml_id:
+        return None
+
+    resultado = ResultadoPropiedad(url=url, ml_id=ml_id, status='exitoso', timestamp=timestamp)
+    resultado.titulo = tarjeta.get('titulo') or None
+
+    # Reason: misma limpieza que el precio de la página de detalle (fracción sin separadores)
+    precio = (tarjeta.get('precio') or '').strip().replace(',', '').replace('.', '').replace('$', '')
+    if precio.isdigit():
+        resultado.precio = float(precio)
+        simbolo = (tarjeta.get('moneda') or '').upper()
+        resultado.moneda = 'USD' if 'US' in simbolo else 'MXN'
+
+    direccion = (tarjeta.get('ubicacion') or '').strip()
+    if direccion:
+        resultado.direccion = direccion
+        ubicacion = parsear_ubicacion_completa(direccion)
+        resultado.estado, resultado.ciudad = ubicacion['estado'], ubicacion['ciudad']
+
+    textos_tipo = [tarjeta.get('encabezado'), tarjeta.get('titulo')]
+    resultado.tipo_propiedad = _tipo(textos_tipo, TIPOS_PROPIEDAD) or 'N/A'
+    resultado.tipo_operacion = _tipo(textos_tipo, TIPOS_OPERACION) or 'N/A'
+
+    # Reason: cada campo toma el primer atributo que lo menciona
+    for atributo in tarjeta.get('atributos') or []:
+        atributo_lower = atributo.lower()
+        for mapeo in ATRIBUTOS_TARJETA:
+            if getattr(resultado, mapeo.campo) is None and any(v in atributo_lower for v in mapeo.variantes):
+                setattr(resultado, mapeo.campo, mapeo.parser(atributo))
+
+    return dict(asdict(resultado), origen=ORIGEN_TARJETA)
+
+
+def argumentos_script_tarjetas(selectores_tarjeta: List[str], maximo: int) -> Dict:
+    """
+    Argumento serializable para SCRIPT_TARJETAS_LISTADO.
+
+    Args:
+        selectores_tarjeta (List[str]): Cascada de 'tarjeta' en el orden a probar
+        maximo (int): Máximo de tarjetas a leer
+    """
+    return {'selectores': dict(SELECTORES_TARJETA, tarjeta=selectores_tarjeta), 'maximo': maximo}
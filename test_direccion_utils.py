@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+TEST DE PARIDAD DEL CLASIFICADOR DE DIRECCIONES - SCRAPER MERCADOLIBRE
+=====================================================================
+
+Compara es_probable_direccion / clasificar_direcciones (regex precompilada +
+memoización) con la implementación anterior, congelada aquí tal cual, sobre
+líneas representativas de innerText y sobre textos generados al azar.
+
+Uso:
+    python -m pytest -q test_direccion_utils.py
+"""
+
+import random
+
+import pytest
+
+from direccion_utils import (
+    FILTROS_PROHIBIDOS, INDICADORES_UBICACION, INDICADORES_VIA, clasificar_direcciones, es_probable_direccion
+)
+
+
+def es_probable_direccion_anterior(text: str) -> bool:
+    """Versión de es_probable_direccion previa a la regex precompilada (congelada)."""
+    if not text or len(text.strip()) < 15:
+        return False
+        
+    text_lower = text.lower().strip()
+    
+    # ❌ FILTROS ESTRICTOS - No debe contener:
+    filtros_prohibidos = [
+        'mercado libre', 'mercadolibre', 'ml', 'mlm-', 'contraseña', 'pin', 
+        'whatsapp', 'email', 'características', 'publicación', 'precio', 'venta', 
+        'compra', 'casa', 'inmueble', 'metros cuadrados', 'm²', 'm2', 'recámara', 
+        'baño', 'estacionamiento', 'terreno', 'construcción', 'superficie', 'pisos'
+    ]
+    
+    if any(filtro in text_lower for filtro in filtros_prohibidos):
+        return False
+    
+    # ❌ No aceptar textos que son principalmente números
+    if len([c for c in text if c.isdigit()]) > len(text) * 0.5:
+        return False
+        
+    # ❌ No aceptar textos muy cortos sin estructura
+    if len(text.split()) < 3:
+        return False
+    
+    # ✅ INDICADORES POSITIVOS de vías
+    indicadores_via = [
+        'colonia', 'col.', 'calle', 'c.', 'avenida', 'av.', 'privada', 'priv.',
+        'boulevard', 'blvd', 'fraccionamiento', 'fracc', 'calzada', 'calz.',
+        'andador', 'circuito', 'paseo', 'plaza', 'glorieta'
+    ]
+    
+    # ✅ INDICADORES DE UBICACIÓN
+    indicadores_ubicacion = [
+        'cuernavaca', 'morelos', 'cdmx', 'ciudad de méxico', 'méxico', 'estado de méxico',
+        'nezahualcóyotl', 'nezahualcoyotl', 'tecámac', 'tecamac', 'atizapán', 'atizapan',
+        'coyoacán', 'coyoacan', 'zapopan', 'guadalajara', 'mérida', 'merida', 'yucatán',
+        'metropolitana', 'villa del real', 'mayorazgos', 'distrito federal', 'alvaro obregón', 'queretaro',
+        'oaxaca', 'chiapas', 'tuxtla gutierrez', 'tapachula', 'campeche', 'quintana roo', 'cancun',
+        'playa del carmen', 'tabasco', 'villahermosa', 'veracruz', 'xalapa', 'coatzacoalcos',
+        'puebla', 'tlaxcala', 'guerrero', 'acapulco', 'chilpancingo', 'hidalgo', 'pachuca',
+        'guanajuato', 'leon', 'irapuato', 'celaya', 'michoacan', 'morelia', 'lazaro cardenas'
+    ]
+    
+    # Debe tener AL MENOS un indicador de vía O ubicación
+    tiene_indicador_via = any(indicador in text_lower for indicador in indicadores_via)
+    tiene_ubicacion = any(ubicacion in text_lower for ubicacion in indicadores_ubicacion)
+    
+    # ✅ ESTRUCTURA de dirección (flexible)
+    tiene_estructura = (
+        (',' in text and len(text.split(',')) >= 2) or  # Separadores de dirección
+        any(char.isdigit() for char in text) or  # Algún número
+        'minutos' in text_lower  # Referencias de distancia
+    )
+    
+    # ✅ DECISIÓN FINAL: Debe cumplir criterios básicos
+    es_direccion = (tiene_indicador_via or tiene_ubicacion) and tiene_estructura
+    
+    return es_direccion
+
+
+
+# Líneas representativas de innerText de una publicación (direcciones, ruido y bordes)
+CORPUS_DIRECCIONES = [
+    "Calle Morelos 123, Centro, Cuernavaca, Morelos",
+    "Av. Universidad 1000, Col. Santa Cruz Atoyac, Benito Juárez",
+    "Privada de los Pinos 4, Fracc. Lomas",
+    "Blvd Juan Pablo II, Zona Hotelera, Cancun, Quintana Roo",
+    "Lomas de Cortés, Cuernavaca, Morelos",
+    "A 10 minutos del centro de Guadalajara",
+    "Cerca de Plaza Galerías y paseo del río",
+    "Fraccionamiento Villa del Real, Tecámac",
+    "Circuito Interior 45, Coyoacán, CDMX",
+    "Andador 7 de la glorieta, Puebla",
+    "Ciudad de México, México",
+    "Calzada de Tlalpan 3000 esq. Taxqueña",
+    "Mérida, Yucatán, México",
+    "Napoleon 12, Zona Centro",
+    "CALLE HIDALGO 45 COL. CENTRO PACHUCA",
+    "Casa en venta en Cuernavaca, Morelos",
+    "Precio de venta: $2,550,000",
+    "Estacionamiento para 2 autos, Col. Centro",
+    "Superficie total 250 m², Calle Reforma",
+    "Contáctame por WhatsApp al 777 123 4567",
+    "Publicación #MLM-123456789 en Mercado Libre",
+    "Html y Emilio Carranza 5, Morelia",
+    "Spinning room, Calle 5, Querétaro",
+    "1234567890123, calle",
+    "12345678 Calle 9",
+    "Cuernavaca,Morelos,México",
+    "Colonia   Centro   Morelos",
+    "Calle Morelos sin número Cuernavaca",
+    "Av. Morelos",
+    "   Av. Morelos 5   ",
+    "Jardín amplio con alberca y terraza",
+    "Excelente ubicación, cerca de todo",
+    "Col. Centro, 62000",
+    "Calle ²³ Morelos, Centro",
+    "Calle Benito Juárez ٣, Oaxaca",
+    "",
+]
+
+
+def _textos_aleatorios(cantidad: int, semilla: int = 20250131) -> list:
+    """Combinaciones de términos de las tablas, números, comas y palabras comunes."""
+    generador = random.Random(semilla)
+    piezas = (list(FILTROS_PROHIBIDOS) + list(INDICADORES_VIA) + list(INDICADORES_UBICACION)
+              + ['123', '4', '62000', ',', 'minutos', 'Centro', 'Lomas', 'NAPOLEON', 'Jardín', '²', '٣', '   '])
+    return [' '.join(generador.choice(piezas) for _ in range(generador.randint(1, 8))) for _ in range(cantidad)]
+
+
+@pytest.mark.parametrize('texto', CORPUS_DIRECCIONES)
+def test_corpus_igual_que_version_anterior(texto):
+    assert es_probable_direccion(texto) == es_probable_direccion_anterior(texto)
+
+
+def test_clasificar_direcciones_igual_que_version_anterior():
+    textos = CORPUS_DIRECCIONES + _textos_aleatorios(20_000)
+    assert clasificar_direcciones(textos) == [es_probable_direccion_anterior(t) for t in textos]
+
+
+def test_corpus_incluye_ambas_clases():
+    clasificados = clasificar_direcciones(CORPUS_DIRECCIONES)
+    assert 0 < sum(clasificados) < len(CORPUS_DIRECCIONES)
@@ -10,8 +10,9 @@ Modularizado para cumplir reglas de <500 líneas.
 import json
 import os
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional
 from models import ResultadoPropiedad
+from acumulador_reporte import ReportAccumulator
 
 
 class TestRunner:
@@ -39,7 +40,9 @@ class TestRunner:
         """Agrega resultado de test"""
         self.test_results.append(resultado)
     
-    def generar_reporte_hibrido(self, resultados: List[Dict], archivo_salida: str = None) -> Dict:
+    def generar_reporte_hibrido(self, resultados: Iterable[Dict], archivo_salida: str = None,
+                                estadisticas_extra: Optional[Dict] = None,
+                                acumulador: Optional[ReportAccumulator] = None) -> Dict:
         """
         🔄 Genera reporte híbrido completo con TODAS las estadísticas
         
@@ -47,6 +50,11 @@ class TestRunner:
         - Metadatos extraídos (ml_id, titulo, descripcion, ubicación)
         - JSON extraídos (categorías y andes_table_raw)
         - Estadísticas detalladas por tipo de campo
+        - Secciones adicionales (ej. cascadas_selectores) vía estadisticas_extra
+        
+        `resultados` puede ser una lista o una vista re-iterable (ej. ResultadosJSONL
+        sobre los archivos del sumidero). Si se pasa `acumulador` (ReportAccumulator
+        actualizado por resultado), las estadísticas no recorren `resultados`.
         """
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -55,121 +63,24 @@ class TestRunner:
         
         print("📊 Generando reporte híbrido completo...")
         
-        # ✅ ESTADÍSTICAS CAMPOS UNIVERSALES ESTRUCTURADOS
-        campos_universales = ['recamaras', 'banos', 'construccion', 'terreno', 'estacionamiento', 
-                             'precio', 'moneda', 'direccion', 'tipo_propiedad', 'tipo_operacion']
-        
-        stats_universales = {}
-        for campo in campos_universales:
-            valores_validos = [r for r in resultados if r.get(campo) is not None]
-            stats_universales[campo] = {
-                'extraidos': len(valores_validos),
-                'total': len(resultados),
-                'porcentaje': (len(valores_validos) / len(resultados) * 100) if resultados else 0,
-                'ejemplos': [r.get(campo) for r in valores_validos[:3]]
-            }
-        
-        # ✅ ESTADÍSTICAS METADATOS UNIVERSALES
-        metadatos_universales = ['ml_id', 'titulo', 'descripcion', 'estado', 'ciudad']
-        
-        stats_metadatos = {}
-        for campo in metadatos_universales:
-            valores_validos = [r for r in resultados if r.get(campo) is not None]
-            stats_metadatos[campo] = {
-                'extraidos': len(valores_validos),
-                'total': len(resultados),
-                'porcentaje': (len(valores_validos) / len(resultados) * 100) if resultados else 0,
-                'ejemplos': [r.get(campo) for r in valores_validos[:3]]
-            }
-        
-        # ✅ ESTADÍSTICAS JSON CATEGORÍAS - DETECCIÓN DINÁMICA
-        # Detectar automáticamente todas las categorías que existen en los resultados
-        categorias_encontradas = set()
-        campos_excluidos = {'ml_id', 'titulo', 'descripcion', 'estado', 'ciudad', 'pais', 'direccion',
-                           'precio', 'moneda', 'tipo_propiedad', 'tipo_operacion', 'recamaras', 'banos', 
-                           'construccion', 'terreno', 'estacionamiento', 'andes_table_raw', 'tiempo_total',
-                           'url', 'property_number', 'status', 'timestamp', 'processing_time_seconds', 'error',
-                           'user_agent_usado', 'proxy_usado'}
-        
-        for resultado in resultados:
-            for key, value in resultado.items():
-                if (key not in campos_excluidos and 
-                    isinstance(value, dict) and 
-                    len(value) > 0):
-                    categorias_encontradas.add(key)
-        
-        stats_json = {}
-        for categoria in categorias_encontradas:
-            categorias_con_datos = [r for r in resultados 
-                                  if r.get(categoria) and isinstance(r.get(categoria), dict) and len(r.get(categoria)) > 0]
-            
-            total_campos_categoria = sum(len(r.get(categoria, {})) for r in categorias_con_datos)
-            
-            stats_json[categoria] = {
-                'propiedades_con_datos': len(categorias_con_datos),
-                'total_propiedades': len(resultados),
-                'porcentaje_propiedades': (len(categorias_con_datos) / len(resultados) * 100) if resultados else 0,
-                'total_campos': total_campos_categoria,
-                'promedio_campos_por_propiedad': (total_campos_categoria / len(categorias_con_datos)) if categorias_con_datos else 0,
-                'ejemplo_campos': list(categorias_con_datos[0].get(categoria, {}).keys())[:5] if categorias_con_datos else []
-            }
-        
-        # ✅ ESTADÍSTICAS ANDES TABLE RAW - SOLO SI HAY DATOS
-        propiedades_con_andes_raw = [r for r in resultados 
-                                   if r.get('andes_table_raw') and isinstance(r.get('andes_table_raw'), dict)]
-        
-        stats_andes_raw = None  # Solo generar si hay datos
-        if propiedades_con_andes_raw:
-            total_categorias_andes = sum(
-                r.get('andes_table_raw', {}).get('metadata', {}).get('total_categorias', 0) 
-                for r in propiedades_con_andes_raw
-            )
-            
-            total_campos_andes = sum(
-                r.get('andes_table_raw', {}).get('metadata', {}).get('total_campos', 0) 
-                for r in propiedades_con_andes_raw
-            )
-            
-            stats_andes_raw = {
-                'propiedades_con_datos': len(propiedades_con_andes_raw),
-                'total_propiedades': len(resultados),
-                'porcentaje_propiedades': (len(propiedades_con_andes_raw) / len(resultados) * 100) if resultados else 0,
-                'total_categorias': total_categorias_andes,
-                'total_campos': total_campos_andes,
-                'promedio_categorias_por_propiedad': (total_categorias_andes / len(propiedades_con_andes_raw)) if propiedades_con_andes_raw else 0,
-                'promedio_campos_por_propiedad': (total_campos_andes / len(propiedades_con_andes_raw)) if propiedades_con_andes_raw else 0
-            }
-        
-        # ✅ ESTADÍSTICAS GENERALES
-        propiedades_exitosas = [r for r in resultados if r.get('status') != 'error']
-        propiedades_con_error = [r for r in resultados if r.get('status') == 'error']
-        
-        stats_generales = {
-            'total_propiedades_procesadas': len(resultados),
-            'propiedades_exitosas': len(propiedades_exitosas),
-            'propiedades_con_error': len(propiedades_con_error),
-            'tasa_exito': (len(propiedades_exitosas) / len(resultados) * 100) if resultados else 0,
-            'timestamp_reporte': timestamp,
-            'archivo_generado': archivo_salida
-        }
+        # ✅ ESTADÍSTICAS (campos universales, metadatos, categorías JSON, andes_table_raw)
+        # Reason: con un acumulador alimentado en vivo el reporte solo toma un
+        # snapshot; sin él se arma con una sola pasada sobre `resultados`
+        if acumulador is None:
+            acumulador = ReportAccumulator.desde_resultados(resultados)
+        total = acumulador.total
         
         # 🔄 COMPILAR REPORTE FINAL
-        estadisticas_completas = {
-            'generales': stats_generales,
-            'campos_universales_estructurados': stats_universales,
-            'metadatos_universales': stats_metadatos,
-            'categorias_json': stats_json
-        }
+        estadisticas_completas = acumulador.snapshot(timestamp, archivo_salida)
         
-        # Solo agregar andes_table_raw si hay datos
-        if stats_andes_raw:
-            estadisticas_completas['andes_table_raw'] = stats_andes_raw
+        if estadisticas_extra:
+            estadisticas_completas.update(estadisticas_extra)
         
         reporte_final = {
             'metadata_reporte': {
                 'version': '2025_hibrido_ultra_avanzado',
                 'fecha_generacion': datetime.now().isoformat(),
-                'total_propiedades': len(resultados),
+                'total_propiedades': total,
                 'archivo_salida': archivo_salida
             },
             
@@ -182,8 +93,7 @@ class TestRunner:
         
         # 💾 GUARDAR ARCHIVO
         try:
-            with open(archivo_salida, 'w', encoding='utf-8') as f:
-                json.dump(reporte_final, f, ensure_ascii=False, indent=2)
+            self._guardar_reporte(reporte_final, archivo_salida)
             
             print(f"✅ Reporte guardado: {archivo_salida}")
             
@@ -196,6 +106,25 @@ class TestRunner:
             print(f"❌ Error guardando reporte: {e}")
             return reporte_final
     
+    @staticmethod
+    def _guardar_reporte(reporte_final: Dict, archivo_salida: str) -> None:
+        """
+        Escribe el reporte emitiendo 'resultados' elemento por elemento.
+        
+        Reason: con resultados en JSONL el arreglo completo nunca se materializa;
+        el archivo sigue siendo el mismo JSON que antes.
+        """
+        cabecera = {k: v for k, v in reporte_final.items() if k != 'resultados'}
+        cuerpo = json.dumps(cabecera, ensure_ascii=False, indent=2)
+        with open(archivo_salida, 'w', encoding='utf-8') as f:
+            # Reason: cuerpo termina en "\n}"; se reabre el objeto para agregar 'resultados'
+            f.write(cuerpo[:-2] + ',\n  "resultados": [')
+            separador = '\n    '
+            for resultado in reporte_final.get('resultados', []):
+                f.write(separador + json.dumps(resultado, ensure_ascii=False, default=str))
+                separador = ',\n    '
+            f.write('\n  ]\n}\n')
+    
     def _mostrar_resumen_estadisticas(self, estadisticas: Dict) -> None:
         """Muestra resumen de estadísticas en consola"""
         
@@ -256,6 +185,21 @@ class TestRunner:
             print(f"\n🔄 ANDES TABLE RAW:")
             print(f"   📊 No incluido (modo optimizado)")
         
+        # Cascadas de selectores - SOLO SI EXISTE
+        if estadisticas.get('cascadas_selectores'):
+            print(f"\n🎯 CASCADAS DE SELECTORES:")
+            for nombre, cascada in estadisticas['cascadas_selectores'].items():
+                ganador = cascada['orden_actual'][0] if cascada['orden_actual'] else 'N/A'
+                stats = cascada['selectores'].get(ganador, {})
+                print(f"   ✅ {nombre}: '{ganador}' ({stats.get('aciertos', 0)} aciertos, {stats.get('tasa_acierto_reciente', 0):.1f}% reciente)")
+        
+        # Esperas por condición vs sleeps fijos anteriores - SOLO SI EXISTE
+        if estadisticas.get('esperas_condicion'):
+            print(f"\n⏱️ ESPERAS POR CONDICIÓN:")
+            for nombre, espera in estadisticas['esperas_condicion'].items():
+                print(f"   ⏳ {nombre}: {espera['promedio_real_ms']:.0f} ms vs {espera['sleep_fijo_anterior_ms']:.0f} ms fijos "
+                      f"({espera['condicion_cumplida']}/{espera['ejecuciones']} cumplidas, ahorro {espera['ahorro_total_s']:.1f}s)")
+        
         print("="*60)
     
     def run_single_property_debug(self, extractor, navigator, url: str) -> Dict:
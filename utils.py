@@ -3,12 +3,40 @@
 UTILIDADES NUMÉRICAS - SCRAPER MERCADOLIBRE
 ==========================================
 
-Funciones utilitarias para parsing numérico consolidadas.
+Funciones utilitarias para parsing numérico consolidadas (escalar y por
+lotes) e identificación de publicaciones (ml_id) desde URLs.
 Refactorizado desde extractors.py siguiendo principios de modularidad.
 """
 
 import re
-from typing import Union, Optional
+from typing import Iterable, Union, Optional
+
+
+# Identificador de publicación en URLs de detalle (ej. 'MLM-2345678901')
+PATRON_ML_ID = re.compile(r'(MLM-[\d]+)')
+
+
+def extraer_ml_id(url: str) -> Optional[str]:
+    """
+    Extrae el ml_id de una URL de publicación.
+    
+    Variantes de host (casa., inmuebles., articulo.), parámetros de tracking y
+    fragmentos producen el mismo ml_id.
+    
+    Args:
+        url (str): URL de detalle de MercadoLibre
+        
+    Returns:
+        Optional[str]: ml_id ('MLM-123...') o None si la URL no contiene uno
+        
+    Examples:
+        >>> extraer_ml_id("https://casa.mercadolibre.com.mx/MLM-2345678901-casa-_JM?tracking_id=x#polycard")
+        'MLM-2345678901'
+        >>> extraer_ml_id("https://www.mercadolibre.com.mx/") is None
+        True
+    """
+    match = PATRON_ML_ID.search(url or '')
+    return match.group(1) if match else None
 
 
 def parse_numeric(value: str) -> Union[int, float, None]:
@@ -69,4 +97,69 @@ def parse_numeric(value: str) -> Union[int, float, None]:
             
     except (ValueError, AttributeError):
         # Reason: En caso de error, retornar None en lugar de raising exception
-        return None 
\ No newline at end of file
+        return None
+
+
+# Patrones RE2 (pyarrow.compute) equivalentes a los de parse_numeric.
+# Reason: \p{Nd} es la clase que re usa para \d en str (dígitos Unicode)
+PATRON_NO_NUMERICO_LOTE = r'[^\p{Nd},.]+'
+# Lo que float() acepta una vez limpio: dígitos con a lo sumo un punto
+PATRON_FLOTANTE_LOTE = r'^(?:[0-9]+\.?[0-9]*|\.[0-9]+)$'
+PATRON_NO_ASCII_LOTE = r'[^0-9,.]'
+
+
+def parse_numeric_lote(valores: Iterable[Optional[str]]):
+    """
+    Versión por lotes de parse_numeric para columnas completas (backfills, re-extracción).
+    
+    Aplica la misma limpieza y el mismo criterio mexicano de comas/puntos con
+    operaciones vectorizadas de pyarrow.compute, sin llamadas Python por valor.
+    
+    Args:
+        valores (Iterable[Optional[str]]): Lista, array de numpy, pandas.Series
+            o pyarrow.Array de strings (None/NaN = vacío)
+        
+    Returns:
+        numpy.ndarray: float64 con el mismo orden; NaN donde parse_numeric
+        devuelve None. Los enteros quedan como float exacto (hasta 2**53).
+        Para pandas: pd.Series(parse_numeric_lote(serie), index=serie.index)
+        
+    Examples:
+        >>> parse_numeric_lote(["2,550,000.00", "131.5 m²", "3 baños", "2,550", "", None]).tolist()
+        [2550000.0, 131.5, 3.0, 2.55, nan, nan]
+    """
+    # Reason: import diferido; el scraper usa utils sin requerir pyarrow/numpy
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    
+    if isinstance(valores, pa.ChunkedArray):
+        valores = valores.combine_chunks()
+    if not isinstance(valores, pa.Array):
+        valores = pa.array(valores if hasattr(valores, '__len__') else list(valores),
+                           type=pa.string(), from_pandas=True)
+    
+    limpio = pc.replace_substring_regex(valores, pattern=PATRON_NO_NUMERICO_LOTE, replacement='')
+    
+    # Reason: mismo criterio que parse_numeric: solo comas → decimal ("2,550" = 2.55);
+    # comas y punto → comas de miles
+    con_coma = pc.match_substring(limpio, ',')
+    con_punto = pc.match_substring(limpio, '.')
+    limpio = pc.if_else(
+        pc.and_(con_coma, pc.invert(con_punto)), pc.replace_substring(limpio, ',', '.'),
+        pc.if_else(con_coma, pc.replace_substring(limpio, ',', ''), limpio)
+    )
+    
+    valido = pc.match_substring_regex(limpio, PATRON_FLOTANTE_LOTE)
+    numeros = pc.cast(pc.if_else(valido, limpio, pa.scalar(None, pa.string())), pa.float64())
+    resultado = numeros.to_numpy(zero_copy_only=False)
+    
+    # Reason: dígitos no ASCII ('١٢٣') los acepta float() pero no el cast de Arrow;
+    # esas filas (raras) pasan por la función escalar
+    no_ascii = pc.fill_null(pc.match_substring_regex(limpio, PATRON_NO_ASCII_LOTE), False)
+    for indice in np.flatnonzero(no_ascii.to_numpy(zero_copy_only=False)):
+        numero = parse_numeric(valores[int(indice)].as_py())
+        resultado[indice] = np.nan if numero is None else numero
+    
+    return resultado
+